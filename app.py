@@ -1,20 +1,48 @@
 # === app.py ===
-from flask import Flask, render_template, request, jsonify, redirect, url_for
-from performance_tracker import get_live_stats
-from threading import Thread
+import json
+import time
+from datetime import datetime, timezone
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for
+from performance_tracker import get_live_stats, journal_version
 from flask_cors import CORS
-from main import run_bot, stop_bot
+from bot_process import BotProcess
+from dashboard_stream import DashboardStream
+from trade_index import get_index, FILTERS, PAGE_LIMIT
+from metrics import render as render_metrics
+from equity_store import load_series, DEFAULT_POINTS
 
 app = Flask(__name__)
 CORS(app)
 
-# === Bot State ===
-bot_thread = None
-bot_status = {
-    "running": False,
-    "strategy": None,
-    "lot": None
-}
+# === Bot Process (trading runs outside the web server process) ===
+bot = BotProcess()
+
+# === Dashboard Push Stream (one publisher, shared by every viewer) ===
+stream = DashboardStream(status_source=bot.status)
+
+# === Conditional, memoized responses keyed on the journal version ===
+_rendered = {}  # endpoint -> (version, body)
+
+def journal_response(endpoint, render, mimetype):
+    """
+    Serve `render()` with an ETag/Last-Modified derived from the journal version.
+    The body is rendered once per version; clients that already have it get a 304.
+    """
+    version = journal_version()
+    cached = _rendered.get(endpoint)
+    if cached is None or cached[0] != version:
+        cached = (version, render())
+        _rendered[endpoint] = cached
+
+    response = Response(cached[1], mimetype=mimetype)
+    if version is None:
+        response.set_etag(f"{endpoint}-empty", weak=True)
+    else:
+        mtime_ns, size = version
+        response.set_etag(f"{endpoint}-{mtime_ns:x}-{size:x}", weak=True)
+        response.last_modified = datetime.fromtimestamp(mtime_ns // 1_000_000_000, tz=timezone.utc)
+    response.cache_control.no_cache = True  # always revalidate, but a 304 costs almost nothing
+    return response.make_conditional(request)
 
 # === Home Landing Page ===
 @app.route("/")
@@ -29,42 +57,104 @@ def dashboard():
 # === Start/Stop Bot Control ===
 @app.route("/dashboard", methods=["POST"])
 def control_bot():
-    global bot_thread, bot_status
     data = request.form or request.json
     action = data.get("action")
     strategy = data.get("strategy")
     lot_size = float(data.get("lot_size", 0.001))
 
-    if action == "start" and not bot_status["running"]:
-        bot_thread = Thread(target=run_bot, args=(strategy, lot_size))
-        bot_thread.start()
-        bot_status.update({
-            "running": True,
-            "strategy": strategy,
-            "lot": lot_size
-        })
-        return jsonify({"message": "Bot started"}), 200
-
-    elif action == "stop" and bot_status["running"]:
-        stop_bot()
-        bot_status.update({
-            "running": False,
-            "strategy": None,
-            "lot": None
-        })
-        return jsonify({"message": "Bot stopped"}), 200
-
-    return jsonify({"message": "No action taken"}), 400
+    if action == "start" and bot.start(strategy, lot_size):
+        message = "Bot started"
+
+    elif action == "stop" and bot.stop():
+        message = "Bot stopped"
+
+    elif action == "mode" and bot.set_mode(strategy, lot_size if data.get("lot_size") else None):
+        message = "Mode updated"
+
+    else:
+        return jsonify({"message": "No action taken"}), 400
+
+    stream.poll_once(bot.status())  # push the new state to viewers now rather than on the next refresh
+    return jsonify({"message": message}), 200
 
 # === Bot Status ===
 @app.route("/status", methods=["GET"])
 def get_status():
-    return jsonify(bot_status)
+    return jsonify(bot.status())
+
+# === Server-Sent Events for the Dashboard ===
+@app.route("/events", methods=["GET"])
+def events():
+    client = stream.start().subscribe()
+    if client is None:
+        return jsonify({"message": "Too many dashboard viewers"}), 503
+    return Response(
+        stream.events(client),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # === Live Stats Endpoint ===
 @app.route("/stats", methods=["GET"])
 def get_stats():
-    return jsonify(get_live_stats())
+    return journal_response("stats", lambda: json.dumps(get_live_stats()), "application/json")
+
+# === Trade History (paginated, filtered, NDJSON export) ===
+@app.route("/api/trades", methods=["GET"])
+def get_trades():
+    args = request.args
+    filters = {name: args.get(name).split(",") for name in FILTERS if args.get(name)}
+    filters.update(start=args.get("from"), end=args.get("to"))
+    order = args.get("order", "desc")
+    try:
+        cursor = int(args["cursor"]) if args.get("cursor") else None
+        index = get_index()
+        if args.get("format") == "ndjson" or "application/x-ndjson" in request.headers.get("Accept", ""):
+            limit = int(args["limit"]) if args.get("limit") else None
+            rows = index.stream(filters, cursor, order, limit)
+            first = next(rows, None)  # surfaces bad filters as a 400 before streaming starts
+        else:
+            trades, next_cursor = index.page(filters, cursor, int(args.get("limit", PAGE_LIMIT)), order)
+            return jsonify({"trades": trades, "next_cursor": next_cursor})
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    def generate():
+        if first is not None:
+            yield json.dumps(first) + "\n"
+        for row in rows:
+            yield json.dumps(row) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson",
+                    headers={"Content-Disposition": "attachment; filename=trades.ndjson"})
+
+# === Equity Curve (LTTB-downsampled) ===
+WINDOW_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+@app.route("/api/equity", methods=["GET"])
+def get_equity():
+    args = request.args
+    try:
+        points = max(3, min(int(args.get("points", DEFAULT_POINTS)), 5000))
+        end = float(args["to"]) if args.get("to") else None
+        start = float(args["from"]) if args.get("from") else None
+        window = args.get("window")  # e.g. 6h, 7d, 30d
+        if window and start is None:
+            start = (end or time.time()) - float(window[:-1]) * WINDOW_UNITS[window[-1]]
+    except (ValueError, KeyError):
+        return jsonify({"message": "expected points=N, from/to=epoch seconds or window=<n>m|h|d"}), 400
+    return jsonify(load_series(start=start, end=end, points=points))
+
+# === Stage Latency Histograms ===
+@app.route("/api/latency", methods=["GET"])
+def get_latency():
+    status = bot.status()
+    return jsonify({"running": status["running"], "stages_ms": status.get("latency_ms", {})})
+
+# === Prometheus Metrics (rendered from the bot's latest status snapshot) ===
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    return Response(render_metrics(bot.status()), mimetype="text/plain; version=0.0.4")
 
 # === Static Routes for Future Expansion ===
 @app.route("/about")
@@ -73,9 +163,7 @@ def about():
 
 @app.route("/journal")
 def journal():
-    from performance_tracker import get_live_stats
-    stats = get_live_stats()
-    return render_template("journal.html", stats=stats)
+    return journal_response("journal", lambda: render_template("journal.html", stats=get_live_stats()), "text/html")
 
 @app.route("/login")
 def login():
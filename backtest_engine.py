@@ -1,205 +1,416 @@
-# === VIX75 Backtest Engine (Filtered from 2025-01-01) ===
+# === backtest_engine.py (Event-Driven Backtester) ===
+#
+#     feed = CsvFeed("M15_data.csv", start="2025-01-01")
+#     result = Backtest(feed, ZoneStrategy(strategy_mode="aggressive")).run()
+#     print(result.summary())
+#
+# One bar event at a time: the simulated broker first settles stops/targets
+# against the new bar's range, then the strategy sees the closed bar and may
+# submit orders, which fill at that close (plus half the spread and seeded
+# slippage). ZoneStrategy drives the same detect_zones / format_zones /
+# select_zones / classify_trend / trade_decision_engine code the live bot uses.
+# Same feed + strategy + seed gives the same trades.
+#
+# Throughput target: >= 100k M15 bars/s for the event loop and broker alone
+# (NullStrategy; run `python backtest_engine.py --bench`). Strategy logic
+# (zone detection, pandas windows) is extra and dominates real runs.
 
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from datetime import datetime
+import argparse
 import os
-from trade_decision_engine import trade_decision_engine
-from breaker_block_detector import detect_breaker_block
-from zone_detector import detect_zones
-
-# === Disable Telegram for backtest ===
-os.environ["DISABLE_TELEGRAM"] = "True"
-
-# === Load and filter data ===
-df = pd.read_csv("M15_data.csv", sep="\t")
-df['datetime'] = pd.to_datetime(df['<DATE>'] + " " + df['<TIME>'])
-df['spread'] = df['<SPREAD>']
-df = df.rename(columns={
-    '<OPEN>': 'open', '<HIGH>': 'high', '<LOW>': 'low', '<CLOSE>': 'close'
-})
-df = df[['datetime', 'open', 'high', 'low', 'close', 'spread']].copy()
-df = df[df['datetime'] >= pd.to_datetime("2025-01-01")].reset_index(drop=True)
-
-# === Config ===
-TP_RATIO = 1.2
-SL_BUFFER = 75000
-CHECK_RANGE = 100000
-LOT_SIZE = 0.001
-MAGIC = 77775
-POINT = 1
-SLIPPAGE_POINTS = 1000
-TRAILING_SL_TRIGGER = 1.0
-TRAILING_SL_STEP = 0.5
-PARTIAL_TP_RATIO = 1.0
-
-# === Logs ===
-trade_log = []
-zone_stats = {
-    'demand_confirmed': 0,
-    'demand_rejected': 0,
-    'supply_confirmed': 0,
-    'supply_rejected': 0
-}
-equity = 0
-equity_curve = []
-
-# === Backtest Loop ===
-for i in range(100, len(df) - 2):
-    try:
-        last3_candles = df.iloc[i-3:i].copy()
-        last3_candles['time'] = last3_candles['datetime']
-        current_candle = df.iloc[i]
-        next_candle = df.iloc[i+1]
-
-        h1_df = df.iloc[i-60:i].copy()
-        h1_df = h1_df.rename(columns={'datetime': 'time'})
-
-        demand_raw, _ = detect_zones(h1_df, zone_type="demand")
-        supply_raw, _ = detect_zones(h1_df, zone_type="supply")
-
-        demand_zones = [{
-            'price': (z['zone_low'] + z['zone_high']) / 2,
-            'type': 'strict_demand',
-            'time': z['timestamp'],
-            'strength': z['strength'],
-            'zone_low': z['zone_low'],
-            'zone_high': z['zone_high']
-        } for z in demand_raw]
-
-        supply_zones = [{
-            'price': (z['zone_low'] + z['zone_high']) / 2,
-            'type': 'strict_supply',
-            'time': z['timestamp'],
-            'strength': z['strength'],
-            'zone_low': z['zone_low'],
-            'zone_high': z['zone_high']
-        } for z in supply_raw]
-
-        trend = "uptrend" if current_candle['close'] > df.iloc[i-50:i]['close'].mean() else "downtrend"
-        breaker_block = detect_breaker_block(last3_candles)
+import time
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+from performance_analytics import compute_metrics
+
+# Tab-separated MT5 history export columns -> feed columns
+MT5_COLUMNS = {"<OPEN>": "open", "<HIGH>": "high", "<LOW>": "low", "<CLOSE>": "close", "<SPREAD>": "spread"}
+
+TRADE_COLUMNS = [
+    "entry_time", "exit_time", "side", "entry", "exit", "sl", "tp", "lot",
+    "profit", "outcome", "exit_reason", "reason", "zone",
+]
+
+Candle = namedtuple("Candle", "time open high low close spread")
+
+
+# === Data feeds ===
+
+class DataFrameFeed:
+    """Bars from a DataFrame with time/open/high/low/close (and optional spread, in points)."""
+
+    def __init__(self, df, start=None, end=None):
+        df = df.sort_values("time")
+        if start is not None:
+            df = df[df["time"] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df["time"] < pd.Timestamp(end)]
+        df = df.reset_index(drop=True)
+        if "spread" not in df.columns:
+            df["spread"] = 0.0
+        self.frame = df[["time", "open", "high", "low", "close", "spread"]]
+        # Plain lists: per-bar scalar access is several times faster than numpy/pandas indexing
+        self.time = df["time"].tolist()
+        self.open = df["open"].tolist()
+        self.high = df["high"].tolist()
+        self.low = df["low"].tolist()
+        self.close = df["close"].tolist()
+        self.spread = df["spread"].astype(float).tolist()
+        self.candles = [Candle(*bar) for bar in zip(self.time, self.open, self.high, self.low, self.close, self.spread)]
+
+    def __len__(self):
+        return len(self.close)
+
+
+class CsvFeed(DataFrameFeed):
+    """Tab-separated MT5 history export (<DATE> <TIME> <OPEN> ... <SPREAD>)."""
+
+    def __init__(self, path, start=None, end=None):
+        df = pd.read_csv(path, sep="\t")
+        df["time"] = pd.to_datetime(df["<DATE>"] + " " + df["<TIME>"], format="%Y.%m.%d %H:%M:%S")
+        df = df.rename(columns=MT5_COLUMNS)
+        super().__init__(df, start, end)
+
+
+class CandleWindow:
+    """
+    The slice of DataFrame behaviour trade_decision_engine uses on last3_candles
+    (.iloc[k] rows with attribute access, ['column'].iloc[k], len) over Candle tuples.
+    Pandas row access was most of a cached sweep run's time.
+    """
+    __slots__ = ("iloc",)
+
+    def __init__(self, candles):
+        self.iloc = candles
+
+    def __len__(self):
+        return len(self.iloc)
+
+    def __getitem__(self, column):
+        return CandleWindow([getattr(candle, column) for candle in self.iloc])
+
+
+# === Simulated broker ===
+
+class SimBroker:
+    """
+    Market orders fill at the bar close +/- half the spread +/- random slippage (seeded).
+    Stops and targets are checked against each later bar's high/low; when one bar
+    touches both, the stop is assumed to have been hit first. A bar that gaps past
+    a level fills at its open (worse for stops, better for targets), the same
+    policy as trade_outcomes.first_touch().
+    """
+
+    def __init__(self, point=1.0, contract_size=1.0, slippage_points=0, seed=0, initial_equity=0.0):
+        self.point = point
+        self.contract_size = contract_size
+        self.slippage_points = slippage_points
+        self.rng = np.random.default_rng(seed)
+        self.balance = initial_equity
+        self.positions = []   # open position dicts
+        self.trades = []      # closed trade dicts (TRADE_COLUMNS)
+
+    def open_sides(self):
+        return {p["side"] for p in self.positions}
+
+    def submit(self, feed, i, side, lot, sl, tp, reason="", zone=None):
+        slip = self.rng.integers(0, self.slippage_points) * self.point if self.slippage_points else 0.0
+        half_spread = feed.spread[i] * self.point / 2
+        if side == "buy":
+            entry = feed.close[i] + half_spread + slip
+        else:
+            entry = feed.close[i] - half_spread - slip
+        self.positions.append({
+            "side": side, "entry": entry, "sl": sl, "tp": tp, "lot": lot,
+            "entry_time": feed.time[i], "reason": reason, "zone": zone,
+        })
+
+    def _close(self, pos, price, when, exit_reason):
+        direction = 1 if pos["side"] == "buy" else -1
+        profit = (price - pos["entry"]) * direction * pos["lot"] * self.contract_size
+        self.balance += profit
+        self.trades.append({
+            "entry_time": pos["entry_time"], "exit_time": when, "side": pos["side"],
+            "entry": pos["entry"], "exit": price, "sl": pos["sl"], "tp": pos["tp"], "lot": pos["lot"],
+            "profit": profit, "outcome": "Win" if profit > 0 else "Loss", "exit_reason": exit_reason,
+            "reason": pos["reason"], "zone": pos["zone"],
+        })
+
+    def on_bar(self, feed, i):
+        """Settle stops/targets touched by bar i; a bar that opens beyond a level fills at its open."""
+        open_, high, low = feed.open[i], feed.high[i], feed.low[i]
+        still_open = []
+        for pos in self.positions:
+            if pos["side"] == "buy":
+                if low <= pos["sl"]:
+                    self._close(pos, min(pos["sl"], open_), feed.time[i], "sl")
+                elif high >= pos["tp"]:
+                    self._close(pos, max(pos["tp"], open_), feed.time[i], "tp")
+                else:
+                    still_open.append(pos)
+            else:
+                if high >= pos["sl"]:
+                    self._close(pos, max(pos["sl"], open_), feed.time[i], "sl")
+                elif low <= pos["tp"]:
+                    self._close(pos, min(pos["tp"], open_), feed.time[i], "tp")
+                else:
+                    still_open.append(pos)
+        self.positions = still_open
+
+    def equity(self, price):
+        floating = 0.0
+        for pos in self.positions:
+            direction = 1 if pos["side"] == "buy" else -1
+            floating += (price - pos["entry"]) * direction * pos["lot"] * self.contract_size
+        return self.balance + floating
+
+    def close_all(self, feed, i):
+        for pos in self.positions:
+            self._close(pos, feed.close[i], feed.time[i], "end")
+        self.positions = []
+
 
+# === Strategies ===
+
+class NullStrategy:
+    """Never trades; measures the engine itself."""
+    warmup = 0
+
+    def on_bar(self, bt, i):
+        pass
+
+
+class ZoneStrategy:
+    """The live zone strategy: same zone detection/selection, trend filter and decision engine."""
+
+    def __init__(self, strategy_mode="aggressive", symbol="BACKTEST", point=1.0, lot=0.001,
+                 sl_buffer=75000, tp_ratio=1.2, check_range=100000, magic=77775,
+                 zone_lookback=60, zone_refresh=4, strength_threshold=40, trend_bars=100, sma_period=44,
+                 zone_params=None, zone_cache=None, trend_cache=None):
+        self.strategy_mode = strategy_mode
+        self.symbol = symbol
+        self.point = point
+        self.lot = lot
+        self.sl_buffer = sl_buffer
+        self.tp_ratio = tp_ratio
+        self.check_range = check_range
+        self.magic = magic
+        self.zone_lookback = zone_lookback      # bars handed to detect_zones
+        self.zone_refresh = zone_refresh        # bars between zone rescans (4 x M15 = hourly, as live)
+        self.strength_threshold = strength_threshold
+        self.trend_bars = trend_bars
+        self.sma_period = sma_period
+        self.zone_params = dict(zone_params or {})   # detect_zones() keyword overrides
+        # Optional bar index -> result maps shared by runs that differ only in other
+        # parameters: formatted (demand, supply) zones before selection, and the trend
+        self.zone_cache = zone_cache
+        self.trend_cache = trend_cache
+        self.warmup = max(zone_lookback, trend_bars, 4)
+        self.zone_touch_counts = {}
+        self.demand_zones = []
+        self.supply_zones = []
+        self._zones_loaded = False
+
+    def reset(self):
+        """Fresh state for a run, including this symbol's decision-engine pattern cooldowns."""
+        import trade_decision_engine
+        self.zone_touch_counts = {}
+        self.demand_zones = []
+        self.supply_zones = []
+        self._zones_loaded = False
+        for key in [k for k in trade_decision_engine._last_pattern_used if k[0] == self.symbol]:
+            del trade_decision_engine._last_pattern_used[key]
+
+    def refresh_bars(self, end, start=0):
+        """Bar indices whose zones a run over bars [start, end) uses."""
+        first = max(start, self.warmup)
+        return range(self._last_refresh(first), end, self.zone_refresh)
+
+    def _last_refresh(self, i):
+        """Latest scheduled rescan at or before bar i (rescans are aligned to the feed, not the run)."""
+        return i - (i - self.warmup) % self.zone_refresh
+
+    def scan_zones(self, frame, i):
+        """Formatted (demand, supply) zones seen at bar i, before strength selection."""
+        from zone_detector import detect_zones, format_zones
+        window = frame.iloc[i + 1 - self.zone_lookback:i + 1]
+        demand_raw, _ = detect_zones(window, zone_type="demand", **self.zone_params)
+        supply_raw, _ = detect_zones(window, zone_type="supply", **self.zone_params)
+        return format_zones(demand_raw, "demand"), format_zones(supply_raw, "supply")
+
+    def trend_at(self, feed, i):
+        if self.trend_cache is not None and i in self.trend_cache:
+            return self.trend_cache[i]
+        from trend_filter import classify_trend
+        lo = i + 1 - self.trend_bars
+        trend = classify_trend(feed.close[lo:i + 1], feed.high[lo:i + 1], feed.low[lo:i + 1], self.sma_period)
+        if self.trend_cache is not None:
+            self.trend_cache[i] = trend
+        return trend
+
+    def _refresh_zones(self, bt, i):
+        from zone_detector import select_zones
+        zones = self.zone_cache.get(i) if self.zone_cache is not None else None
+        if zones is None:
+            zones = self.scan_zones(bt.feed.frame, i)
+            if self.zone_cache is not None:
+                self.zone_cache[i] = zones
+        self.demand_zones, self.supply_zones = select_zones(*zones, self.strategy_mode, self.strength_threshold)
+        self._zones_loaded = True
+
+    def on_bar(self, bt, i):
+        from trade_decision_engine import trade_decision_engine
+        from breaker_block_detector import detect_breaker_block
+
+        feed = bt.feed
+        if not self._zones_loaded or (i - self.warmup) % self.zone_refresh == 0:
+            # A run starting between rescans picks up the zones a full-history run would hold
+            self._refresh_zones(bt, self._last_refresh(i))
+
+        trend = self.trend_at(feed, i)
+        last3 = CandleWindow(feed.candles[i - 2:i + 1])
+        open_sides = bt.broker.open_sides()
         signals = trade_decision_engine(
-            symbol="VIX75",
-            point=POINT,
-            current_price=current_candle['close'],
+            symbol=self.symbol,
+            point=self.point,
+            current_price=feed.close[i],
             trend=trend,
-            demand_zones=demand_zones,
-            supply_zones=supply_zones,
-            last3_candles=last3_candles,
-            active_trades={},
-            zone_touch_counts={},
-            SL_BUFFER=SL_BUFFER,
-            TP_RATIO=TP_RATIO,
-            CHECK_RANGE=CHECK_RANGE,
-            LOT_SIZE=LOT_SIZE,
-            MAGIC=MAGIC,
-            strategy_mode="aggressive",
-            breaker_block=breaker_block
+            demand_zones=self.demand_zones,
+            supply_zones=self.supply_zones,
+            last3_candles=last3,
+            active_trades={side: True for side in open_sides},
+            zone_touch_counts=self.zone_touch_counts,
+            SL_BUFFER=self.sl_buffer,
+            TP_RATIO=self.tp_ratio,
+            CHECK_RANGE=self.check_range,
+            LOT_SIZE=self.lot,
+            MAGIC=self.magic,
+            strategy_mode=self.strategy_mode,
+            breaker_block=detect_breaker_block(last3),
+            now=feed.time[i].to_pydatetime(),
         )
+        for signal in signals:
+            if signal["side"] in open_sides:
+                continue
+            open_sides.add(signal["side"])
+            bt.broker.submit(feed, i, signal["side"], signal["lot"], signal["sl"], signal["tp"],
+                             signal.get("reason", ""), signal.get("zone"))
 
-        for zone in demand_zones:
-            zone_stats['demand_confirmed' if any(sig['zone'] == zone['price'] and sig['side'] == 'buy' for sig in signals) else 'demand_rejected'] += 1
 
-        for zone in supply_zones:
-            zone_stats['supply_confirmed' if any(sig['zone'] == zone['price'] and sig['side'] == 'sell' for sig in signals) else 'supply_rejected'] += 1
+# === Engine ===
 
-        for signal in signals:
-            mid_price = current_candle['close']
-            spread = current_candle['spread']
-            slippage = np.random.randint(0, SLIPPAGE_POINTS)
-
-            if signal['side'] == "buy":
-                entry = mid_price + spread / 2 + slippage
-                r_value = entry - signal['sl']
-                partial_tp = entry + PARTIAL_TP_RATIO * r_value
-                final_tp = entry + TP_RATIO * r_value
-                sl = signal['sl']
+class BacktestResult:
+    def __init__(self, trades, equity, times, bars, elapsed, initial_equity):
+        self.trades = pd.DataFrame(trades, columns=TRADE_COLUMNS)
+        self.equity = equity          # equity at each bar close (numpy array)
+        self.times = times
+        self.bars = bars
+        self.elapsed = elapsed
+        self.initial_equity = initial_equity
+
+    def metrics(self):
+        profits = self.trades["profit"].to_numpy(dtype=float)
+        times = self.trades["exit_time"].to_numpy(dtype="datetime64[s]") if len(self.trades) else None
+        return compute_metrics(profits, times, self.initial_equity)
+
+    def summary(self):
+        m = self.metrics()
+        return (
+            f"Bars: {self.bars} in {self.elapsed:.2f}s ({self.bars / self.elapsed:,.0f} bars/s)\n"
+            f"Trades: {m['total_trades']} | Win rate: {m['win_rate']}% | Net: {m['total_profit']:.2f}\n"
+            f"Profit factor: {m['profit_factor']} | Max drawdown: {m['max_drawdown']:.2f}"
+        )
+
+
+class Backtest:
+    """Run over bars [start, end) of the feed; earlier bars still serve as indicator history."""
+
+    def __init__(self, feed, strategy, broker=None, initial_equity=0.0, seed=0, close_at_end=True,
+                 start=0, end=None):
+        self.feed = feed
+        self.strategy = strategy
+        self.broker = broker or SimBroker(
+            point=getattr(strategy, "point", 1.0), seed=seed, initial_equity=initial_equity
+        )
+        self.initial_equity = initial_equity
+        self.close_at_end = close_at_end
+        self.start = start
+        self.end = len(feed) if end is None else min(end, len(feed))
+
+    def run(self):
+        feed, broker, strategy = self.feed, self.broker, self.strategy
+        start, end = self.start, self.end
+        n = max(end - start, 0)
+        warmup = getattr(strategy, "warmup", 0)
+        if hasattr(strategy, "reset"):
+            strategy.reset()
+        equity = np.empty(n)
+        started = time.perf_counter()
+        on_bar = strategy.on_bar
+        settle = broker.on_bar
+        close = feed.close
+        for i in range(start, end):
+            if broker.positions:
+                settle(feed, i)
+            if i >= warmup:
+                on_bar(self, i)
+            if broker.positions:
+                equity[i - start] = broker.equity(close[i])
             else:
-                entry = mid_price - spread / 2 - slippage
-                r_value = signal['sl'] - entry
-                partial_tp = entry - PARTIAL_TP_RATIO * r_value
-                final_tp = entry - TP_RATIO * r_value
-                sl = signal['sl']
-
-            result = ""
-            profit = 0
-
-            if signal['side'] == "buy":
-                if next_candle['low'] <= sl:
-                    result = "LOSS"
-                    exit_price = sl
-                    profit = exit_price - entry
-                elif next_candle['high'] >= final_tp:
-                    result = "WIN"
-                    exit_price = final_tp
-                    profit = r_value * TP_RATIO
-                elif next_candle['high'] >= partial_tp:
-                    result = "PARTIAL"
-                    exit_price = entry + r_value * TRAILING_SL_STEP
-                    profit = r_value * 0.5
-
-            elif signal['side'] == "sell":
-                if next_candle['high'] >= sl:
-                    result = "LOSS"
-                    exit_price = sl
-                    profit = entry - exit_price
-                elif next_candle['low'] <= final_tp:
-                    result = "WIN"
-                    exit_price = final_tp
-                    profit = r_value * TP_RATIO
-                elif next_candle['low'] <= partial_tp:
-                    result = "PARTIAL"
-                    exit_price = entry - r_value * TRAILING_SL_STEP
-                    profit = r_value * 0.5
-
-            if result:
-                equity += profit
-                equity_curve.append(equity)
-                trade_log.append({
-                    "time": current_candle['datetime'],
-                    "side": signal['side'],
-                    "entry": entry,
-                    "sl": sl,
-                    "tp": final_tp,
-                    "exit": exit_price,
-                    "result": result,
-                    "profit": profit,
-                    "reason": signal.get("reason", ""),
-                    "patterns": ", ".join(signal.get("patterns", [])),
-                    "zone": signal.get("zone", "")
-                })
-
-    except Exception as e:
-        print(f"[❌ ERROR] i={i} | {e}")
-
-# === Save and Summary ===
-results_df = pd.DataFrame(trade_log)
-results_df.to_csv("backtest_results.csv", index=False)
-
-print("\n=== \U0001F4CA BACKTEST SUMMARY ===")
-print(f"Total Trades : {len(results_df)}")
-print(f"✅ Wins       : {len(results_df[results_df['result'] == 'WIN'])}")
-print(f"❌ Losses     : {len(results_df[results_df['result'] == 'LOSS'])}")
-print(f"🏆 Win Rate   : {len(results_df[results_df['result'] == 'WIN']) / len(results_df) * 100:.2f}%" if len(results_df) else "No trades.")
-print(f"📈 Net Equity : {equity:.2f}")
-
-print("\n=== \U0001F9E0 Zone Stats ===")
-print(f"🟢 Demand Zones Confirmed : {zone_stats['demand_confirmed']}")
-print(f"⛔️ Demand Zones Rejected  : {zone_stats['demand_rejected']}")
-print(f"🔴 Supply Zones Confirmed : {zone_stats['supply_confirmed']}")
-print(f"⛔️ Supply Zones Rejected  : {zone_stats['supply_rejected']}")
-
-# === Plot Equity Curve ===
-if equity_curve:
+                equity[i - start] = broker.balance
+        if self.close_at_end and n:
+            broker.close_all(feed, end - 1)
+            equity[n - 1] = broker.balance
+        elapsed = time.perf_counter() - started
+        return BacktestResult(broker.trades, equity, feed.time[start:end], n, elapsed, self.initial_equity)
+
+
+def _plot(result, path="equity_curve.png"):
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 4))
-    plt.plot(equity_curve, label="Equity", color="green")
+    plt.plot(result.times, result.equity, label="Equity", color="green")
     plt.title("📈 Equity Curve (VIX75 Backtest)")
-    plt.xlabel("Trade #")
     plt.ylabel("Equity")
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
-    plt.savefig("equity_curve.png")
-    plt.show()
+    plt.savefig(path)
+    print(f"Saved {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the zone strategy over MT5 history exports")
+    parser.add_argument("--data", default="M15_data.csv")
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--end")
+    parser.add_argument("--mode", default="aggressive", choices=["aggressive", "trend_follow"])
+    parser.add_argument("--slippage", type=int, default=1000, help="max random slippage in points")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="backtest_results.csv")
+    parser.add_argument("--plot", action="store_true")
+    parser.add_argument("--bench", action="store_true", help="time the engine alone with NullStrategy")
+    args = parser.parse_args()
+
+    # Backtests never message Telegram (read by telegram_notifier's sink selection)
+    os.environ["DISABLE_TELEGRAM"] = "True"
+
+    feed = CsvFeed(args.data, args.start, args.end)
+    if args.bench:
+        result = Backtest(feed, NullStrategy()).run()
+        print(f"Engine only: {result.bars} bars in {result.elapsed * 1000:.1f} ms "
+              f"({result.bars / result.elapsed:,.0f} bars/s)")
+        return
+
+    strategy = ZoneStrategy(strategy_mode=args.mode)
+    broker = SimBroker(point=strategy.point, slippage_points=args.slippage, seed=args.seed)
+    result = Backtest(feed, strategy, broker).run()
+    result.trades.to_csv(args.out, index=False)
+    print("\n=== 📊 BACKTEST SUMMARY ===")
+    print(result.summary())
+    if args.plot:
+        _plot(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# === bar_cache.py (Shared Per-Cycle Broker Data Cache) ===
+#
+# One cache for every strategy instance: within a cycle each (symbol, timeframe)
+# is fetched once at the largest bar count asked for, and open positions come
+# from a single positions_get() for all symbols. Entries also expire after
+# MAX_AGE seconds so callers outside the orchestrator never see stale bars.
+
+import threading
+import time
+
+from mt5_gateway import mt5
+
+MAX_AGE = 2.0  # seconds
+
+
+class BarCache:
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        self._rates = {}       # (symbol, timeframe) -> (fetched_at, rates)
+        self._positions = None  # (fetched_at, positions)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def new_cycle(self):
+        """Drop everything fetched so far; call once at the start of each batched cycle."""
+        with self._lock:
+            self._rates.clear()
+            self._positions = None
+
+    def rates(self, symbol, timeframe, bars):
+        """Latest `bars` rates, same shape as mt5.copy_rates_from_pos (None on failure)."""
+        key = (symbol, timeframe)
+        now = time.monotonic()
+        cached = self._rates.get(key)
+        if cached is not None and now - cached[0] <= self.max_age and len(cached[1]) >= bars:
+            self.hits += 1
+            return cached[1][-bars:]
+
+        self.misses += 1
+        rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, bars)
+        if rates is not None and len(rates):
+            with self._lock:
+                current = self._rates.get(key)
+                if current is None or now - current[0] > self.max_age or len(current[1]) <= len(rates):
+                    self._rates[key] = (now, rates)
+        return rates
+
+    def positions(self, symbol=None):
+        """Open positions (optionally for one symbol) from one positions_get() per cycle."""
+        now = time.monotonic()
+        cached = self._positions
+        if cached is None or now - cached[0] > self.max_age:
+            self.misses += 1
+            cached = (now, tuple(mt5.positions_get() or ()))
+            self._positions = cached
+        else:
+            self.hits += 1
+        if symbol is None:
+            return cached[1]
+        return tuple(p for p in cached[1] if p.symbol == symbol)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "series": len(self._rates)}
+
+
+bar_cache = BarCache()
@@ -0,0 +1,122 @@
+# === bot_process.py (Bot Worker Process + IPC Control) ===
+#
+# The trading bot runs in its own process so Flask request handling (and the
+# GIL) never competes with the strategy, risk monitor or MT5 thread. Commands
+# go over a multiprocessing Pipe; status comes back through the bot's status
+# file (main.STATUS_PATH), which is replaced atomically and so can be read at
+# any time without locking.
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+STOP_TIMEOUT = 30       # seconds to wait for a clean shutdown before terminating
+STATUS_STALE_AFTER = 5  # seconds without a status update before the bot counts as unresponsive
+
+
+def _listen(conn):
+    """Child side: apply commands from the parent until told to stop."""
+    import main
+    while True:
+        try:
+            command, args = conn.recv()
+        except (EOFError, OSError):
+            main.stop_bot()
+            return
+        if command == "stop":
+            main.stop_bot()
+            return
+        if command == "mode":
+            main.set_mode(**args)
+
+
+def bot_main(conn, strategy_mode, lot_size):
+    """Entry point of the bot process."""
+    import main
+    threading.Thread(target=_listen, args=(conn,), name="bot-ipc", daemon=True).start()
+    main.run_bot(strategy_mode, lot_size)
+
+
+def read_status(path=None):
+    """Latest status written by the bot process, or None if there isn't one."""
+    if path is None:
+        path = os.getenv("BOT_STATUS_PATH", "bot_status.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class BotProcess:
+    """Parent-side handle: start/stop the bot process, change mode, read status."""
+
+    def __init__(self):
+        self.process = None
+        self.conn = None
+        self.strategy = None
+        self.lot = None
+        self._lock = threading.Lock()  # serializes control commands from Flask threads
+
+    def is_running(self):
+        return self.process is not None and self.process.is_alive()
+
+    def start(self, strategy_mode="trend_follow", lot_size=0.001):
+        with self._lock:
+            if self.is_running():
+                return False
+            parent_conn, child_conn = multiprocessing.Pipe()
+            self.process = multiprocessing.Process(
+                target=bot_main, args=(child_conn, strategy_mode, lot_size), name="vix75-bot", daemon=False
+            )
+            self.process.start()
+            child_conn.close()
+            self.conn = parent_conn
+            self.strategy, self.lot = strategy_mode, lot_size
+            return True
+
+    def _send(self, command, **args):
+        try:
+            self.conn.send((command, args))
+            return True
+        except (OSError, AttributeError, BrokenPipeError):
+            return False
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        with self._lock:
+            if not self.is_running():
+                return False
+            self._send("stop")
+            self.process.join(timeout)
+            if self.process.is_alive():
+                print("[⚠️ BOT PROCESS] Clean stop timed out, terminating")
+                self.process.terminate()
+                self.process.join(5)
+            self.conn.close()
+            self.strategy = self.lot = None
+            return True
+
+    def set_mode(self, strategy_mode=None, lot_size=None):
+        with self._lock:
+            if not self.is_running():
+                return False
+            if strategy_mode:
+                self.strategy = strategy_mode
+            if lot_size is not None:
+                self.lot = lot_size
+            return self._send("mode", strategy_mode=strategy_mode, lot_size=lot_size)
+
+    def status(self):
+        running = self.is_running()
+        status = read_status() or {}
+        status.update(
+            running=running,
+            strategy=self.strategy if running else None,
+            lot=self.lot if running else None,
+            pid=self.process.pid if running else None,
+        )
+        updated = status.get("updated")
+        status["responsive"] = bool(running and updated and time.time() - updated < STATUS_STALE_AFTER)
+        return status
@@ -0,0 +1,156 @@
+# === dashboard_stream.py (Server-Sent Events for the Dashboard) ===
+#
+# One publisher thread watches the bot status file and the trade journal.
+# When a file changes it rebuilds that topic once. It pushes to viewers only
+# when the topic's payload actually changed. Each viewer keeps only the latest
+# payload per topic, so a slow tab gets the newest state rather than a backlog,
+# and the work per update doesn't grow with the number of open dashboards.
+
+import json
+import os
+import threading
+import time
+
+from bot_process import read_status
+import performance_tracker
+
+POLL_INTERVAL = 0.25    # seconds between file checks (bot status refreshes every 0.5 s)
+STATUS_REFRESH = 2.0    # re-read status even if the file is unchanged (catches a dead bot process)
+KEEPALIVE = 15          # seconds between SSE comments on an idle stream
+MAX_CLIENTS = 100
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class _Client:
+    __slots__ = ("pending", "cond", "closed")
+
+    def __init__(self):
+        self.pending = {}  # topic -> serialized payload; newer overwrites older
+        self.cond = threading.Condition()
+        self.closed = False
+
+
+class DashboardStream:
+    def __init__(self, status_source=read_status, status_path=None):
+        self.status_source = status_source
+        self.status_path = status_path or os.getenv("BOT_STATUS_PATH", "bot_status.json")
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._latest = {}   # topic -> serialized payload
+        self._mtimes = {}
+        self._status_read = 0.0
+        self._thread = None
+        self.stats = {"published": 0, "coalesced": 0, "rebuilds": 0}
+
+    # --- producer side ---
+
+    def publish(self, topic, payload):
+        """Queue `payload` for every viewer unless it equals the last one sent for `topic`."""
+        data = json.dumps(payload, default=str, separators=(",", ":"))
+        with self._lock:
+            if self._latest.get(topic) == data:
+                return False
+            self._latest[topic] = data
+            clients = list(self._clients)
+        self.stats["published"] += 1
+        for client in clients:
+            with client.cond:
+                if topic in client.pending:
+                    self.stats["coalesced"] += 1
+                client.pending[topic] = data
+                client.cond.notify()
+        return True
+
+    def _changed(self, key, path):
+        mtime = _mtime(path)
+        if mtime == self._mtimes.get(key):
+            return False
+        self._mtimes[key] = mtime
+        return True
+
+    def poll_once(self, bot_status=None):
+        """Rebuild topics whose source file changed; `bot_status` overrides the status file."""
+        now = time.monotonic()
+        if (bot_status is not None or self._changed("status", self.status_path)
+                or now - self._status_read >= STATUS_REFRESH):
+            status = bot_status if bot_status is not None else (self.status_source() or {})
+            self._status_read = now
+            self.stats["rebuilds"] += 1
+            self.publish("status", {
+                "running": status.get("running", False),
+                "strategy": status.get("strategy"),
+                "lot": status.get("lot"),
+                "responsive": status.get("responsive"),
+                "symbols": status.get("symbols", []),
+                "active_trades": status.get("active_trades", {}),
+            })
+            risk = status.get("risk") or {}
+            self.publish("equity", {
+                "equity": risk.get("equity"),
+                "daily_profit": risk.get("daily_profit"),
+                "drawdown": risk.get("drawdown"),
+                "halted": risk.get("halted"),
+            })
+            self.publish("signals", (status.get("events") or {}).get("recent", []))
+
+        if self._changed("journal", performance_tracker.file_path):
+            self.stats["rebuilds"] += 1
+            stats = performance_tracker.get_live_stats()  # shared memoized dict: don't mutate
+            self.publish("stats", {k: v for k, v in stats.items() if k != "recent_trades"})
+            self.publish("trades", stats.get("recent_trades", []))
+
+    def _run(self):
+        while True:
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"[⚠️ DASHBOARD STREAM] {e}")
+            time.sleep(POLL_INTERVAL)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="dashboard-stream", daemon=True)
+            self._thread.start()
+        return self
+
+    # --- viewer side ---
+
+    def subscribe(self):
+        client = _Client()
+        with self._lock:
+            if len(self._clients) >= MAX_CLIENTS:
+                return None
+            self._clients.add(client)
+            client.pending.update(self._latest)  # new viewers start from the current state
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+        client.closed = True
+
+    def events(self, client):
+        """Generator of SSE frames for one viewer."""
+        try:
+            yield "retry: 2000\n\n"
+            while True:
+                with client.cond:
+                    if not client.pending:
+                        client.cond.wait(KEEPALIVE)
+                    batch, client.pending = client.pending, {}
+                if not batch:
+                    yield ": keepalive\n\n"
+                    continue
+                for topic, data in batch.items():
+                    yield f"event: {topic}\ndata: {data}\n\n"
+        finally:
+            self.unsubscribe(client)
+
+    def viewer_count(self):
+        return len(self._clients)
@@ -1,11 +1,11 @@
 # === emergency_control.py ===
 
+import threading
+import time
 from datetime import datetime
-import MetaTrader5 as mt5
-
-# === Configurable Risk Limits ===
-MAX_DAILY_LOSS = -100     # Adjusted: loss allowed before bot stops (realized)
-MAX_DRAWDOWN = -200       # Drawdown from peak equity (floating or closed)
+from mt5_gateway import mt5, run as mt5_run
+from stage_timing import record as record_timing
+from risk_limits import MAX_DAILY_LOSS, MAX_DRAWDOWN
 
 # === Session Tracker ===
 session_state = {
@@ -52,3 +52,159 @@ def check_emergency_stop(current_equity):
     if drawdown < MAX_DRAWDOWN:
         return "Max Drawdown Exceeded"
     return None
+
+
+# === Independent Risk Monitor ===
+RISK_CHECK_INTERVAL = 0.5   # seconds between equity checks
+CLOSE_DEVIATION = 50        # points of slippage accepted when flattening
+CLOSE_RETRIES = 3
+
+# Set on breach; trade_executor refuses new orders while it is set
+trading_halted = threading.Event()
+
+
+def _close_request(pos, tick):
+    closing_buy = pos.type == mt5.ORDER_TYPE_BUY
+    return {
+        "action": mt5.TRADE_ACTION_DEAL,
+        "symbol": pos.symbol,
+        "volume": pos.volume,
+        "type": mt5.ORDER_TYPE_SELL if closing_buy else mt5.ORDER_TYPE_BUY,
+        "position": pos.ticket,
+        "price": tick.bid if closing_buy else tick.ask,
+        "deviation": CLOSE_DEVIATION,
+        "magic": pos.magic,
+        "comment": "Emergency flatten",
+        "type_time": mt5.ORDER_TIME_GTC,
+        "type_filling": mt5.ORDER_FILLING_FOK,
+    }
+
+
+def _flatten_batch(magics):
+    """
+    Runs as one job on the MT5 thread (calls made there execute inline), so every
+    close is sent back-to-back with no other bot call in between.
+    Returns (closed_tickets, failed_tickets).
+    """
+    closed = []
+    for _ in range(CLOSE_RETRIES):
+        current = mt5.positions_get()
+        if current is not None:
+            break
+    else:
+        print("[🚨 RISK] positions_get() failed — open positions could not be read or closed")
+        current = ()
+    positions = [p for p in current if p.magic in magics]
+    for attempt in range(CLOSE_RETRIES):
+        retry = []
+        ticks = {}
+        for pos in positions:
+            tick = ticks.get(pos.symbol) or mt5.symbol_info_tick(pos.symbol)
+            ticks[pos.symbol] = tick
+            result = mt5.order_send(_close_request(pos, tick)) if tick else None
+            if result is not None and result.retcode == mt5.TRADE_RETCODE_DONE:
+                closed.append(pos.ticket)
+            else:
+                retry.append(pos)
+        if not retry:
+            break
+        # Re-read: a position may have closed anyway (SL/TP hit) or moved in price.
+        # A failed read proves nothing, so every unclosed ticket stays open.
+        current = mt5.positions_get()
+        if current is None:
+            positions = retry
+            continue
+        still_open = {p.ticket: p for p in current}
+        positions = [still_open[p.ticket] for p in retry if p.ticket in still_open]
+    failed = [p.ticket for p in positions if p.ticket not in closed]
+    return closed, failed
+
+
+def flatten_positions(magics):
+    return mt5_run(_flatten_batch, set(magics))
+
+
+class RiskMonitor:
+    """
+    Polls equity on its own thread, independent of the strategy cycle. On a breach it
+    halts new orders, flattens every position carrying one of `magics`, then calls
+    `on_halt(reason)` so the caller can stop scheduling. `on_account(account)`, if given,
+    sees every account_info() snapshot the monitor reads (e.g. to record equity).
+    """
+
+    def __init__(self, magics, on_halt=None, interval=RISK_CHECK_INTERVAL, on_account=None):
+        self.magics = set(magics)
+        self.on_halt = on_halt
+        self.on_account = on_account
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.checks = 0
+        self.daily_profit = 0.0
+        self.drawdown = 0.0
+        self.equity = None
+        self.breach = None  # dict once tripped
+
+    def start(self):
+        trading_halted.clear()
+        self._thread = threading.Thread(target=self._loop, name="risk-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                account = mt5.account_info()
+                if account is not None:
+                    self.check(account.equity)
+                    if self.on_account is not None:
+                        self.on_account(account)
+            except Exception as e:
+                print(f"[⚠️ RISK MONITOR] {e}")
+            if self.breach is not None:
+                return
+            self._stop.wait(self.interval)
+
+    def check(self, equity):
+        self.checks += 1
+        self.equity = equity
+        self.daily_profit, self.drawdown = update_equity_stats(equity)
+        if DEBUG_PRINT:
+            print(f"[Risk Monitor] Daily Profit: {self.daily_profit:.2f} | Drawdown: {self.drawdown:.2f}")
+
+        if self.daily_profit < MAX_DAILY_LOSS:
+            self.trip("Daily Loss Limit Exceeded")
+        elif self.drawdown < MAX_DRAWDOWN:
+            self.trip("Max Drawdown Exceeded")
+
+    def trip(self, reason):
+        breached_at = time.perf_counter()
+        trading_halted.set()
+        closed, failed = flatten_positions(self.magics)
+        elapsed = time.perf_counter() - breached_at
+        record_timing("breach_to_flat", int(elapsed * 1e9))
+        flat_ms = round(elapsed * 1000, 1)
+        self.breach = {
+            "reason": reason,
+            "time": datetime.utcnow().isoformat(timespec="seconds"),
+            "equity": self.equity,
+            "closed": closed,
+            "failed": failed,
+            "breach_to_flat_ms": flat_ms,
+        }
+        print(f"[🚨 RISK] {reason} | closed {len(closed)} position(s), {len(failed)} failed | breach-to-flat {flat_ms} ms")
+        if self.on_halt is not None:
+            self.on_halt(reason)
+
+    def stats(self):
+        return {
+            "checks": self.checks,
+            "equity": self.equity,
+            "daily_profit": self.daily_profit,
+            "drawdown": self.drawdown,
+            "halted": trading_halted.is_set(),
+            "breach": self.breach,
+        }
@@ -0,0 +1,198 @@
+# === equity_store.py (Equity Time-Series Store + LTTB Downsampling) ===
+#
+# Account equity/balance samples go to fixed-width binary files: one raw file
+# and one rollup file each for 1m, 1h and 1d (open/high/low/close equity plus
+# the last balance). Records are appended in time order, so a time range is a
+# binary search over a memory-mapped array and no index is needed. A chart
+# request reads the finest series that keeps the range under MAX_SOURCE_POINTS,
+# then downsamples it with Largest-Triangle-Three-Buckets, which keeps the
+# peaks and troughs that plain decimation would drop.
+
+import os
+import struct
+import threading
+import time
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STORE_DIR = os.getenv("EQUITY_STORE_DIR", "equity_store")   # "" disables recording
+SAMPLE_INTERVAL = float(os.getenv("EQUITY_SAMPLE_INTERVAL", "1.0"))  # seconds between raw samples
+FLUSH_INTERVAL = 5.0       # seconds between buffered writes to disk
+MAX_SOURCE_POINTS = 200_000  # largest series handed to LTTB for one request
+DEFAULT_POINTS = 500
+
+RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+RAW = struct.Struct("<ddd")          # time, equity, balance
+ROLLUP = struct.Struct("<dddddd")    # bucket start, open, high, low, close, balance
+RAW_DTYPE = np.dtype([("t", "<f8"), ("equity", "<f8"), ("balance", "<f8")])
+ROLLUP_DTYPE = np.dtype([("t", "<f8"), ("open", "<f8"), ("high", "<f8"),
+                         ("low", "<f8"), ("close", "<f8"), ("balance", "<f8")])
+
+
+def lttb(x, y, points):
+    """Indices of the `points` samples Largest-Triangle-Three-Buckets keeps from (x, y)."""
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n) if points >= n else np.linspace(0, n - 1, max(points, 0)).astype(int)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # First and last points are always kept; the rest are split into points-2 buckets
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    keep = np.empty(points, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # Third vertex: average of the next bucket (or the last point)
+        cx = x[end:next_end].mean() if next_end > end else x[-1]
+        cy = y[end:next_end].mean() if next_end > end else y[-1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def _read(path, dtype):
+    """Memory-mapped view of a record file, ignoring a trailing partial record."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return np.zeros(0, dtype=dtype)
+    count = size // dtype.itemsize
+    if not count:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+
+class _Bucket:
+    __slots__ = ("start", "open", "high", "low", "close", "balance")
+
+    def __init__(self, start, equity, balance):
+        self.start = start
+        self.open = self.high = self.low = self.close = equity
+        self.balance = balance
+
+    def add(self, equity, balance):
+        if equity > self.high:
+            self.high = equity
+        if equity < self.low:
+            self.low = equity
+        self.close = equity
+        self.balance = balance
+
+    def pack(self):
+        return ROLLUP.pack(self.start, self.open, self.high, self.low, self.close, self.balance)
+
+
+class EquityStore:
+    def __init__(self, directory=STORE_DIR, sample_interval=SAMPLE_INTERVAL):
+        self.directory = directory
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+        self._pending = {}      # file name -> [packed records]
+        self._buckets = {}      # resolution -> _Bucket in progress
+        self._last_sample = None
+        self._last_flush = time.monotonic()
+        self._recovered = False
+        self.samples = 0
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _recover(self):
+        """Rebuild in-progress rollup buckets from raw samples written after the last closed bucket."""
+        os.makedirs(self.directory, exist_ok=True)
+        raw = _read(self._path("raw"), RAW_DTYPE)
+        for name, seconds in RESOLUTIONS.items():
+            rollup = _read(self._path(name), ROLLUP_DTYPE)
+            after = rollup["t"][-1] + seconds if len(rollup) else -np.inf
+            tail = raw[np.searchsorted(raw["t"], after):]
+            bucket = None
+            for t, equity, balance in zip(tail["t"], tail["equity"], tail["balance"]):
+                start = t - t % seconds
+                if bucket is not None and bucket.start != start:
+                    self._pending.setdefault(name, []).append(bucket.pack())
+                    bucket = None
+                if bucket is None:
+                    bucket = _Bucket(start, float(equity), float(balance))
+                else:
+                    bucket.add(float(equity), float(balance))
+            if bucket is not None:
+                self._buckets[name] = bucket
+        if len(raw):
+            self._last_sample = float(raw["t"][-1])
+        self._recovered = True
+
+    def append(self, equity, balance, t=None):
+        """Record one sample (rate-limited to sample_interval); cheap enough for the risk-monitor thread."""
+        t = time.time() if t is None else t
+        if self._last_sample is not None and t - self._last_sample < self.sample_interval:
+            return False
+        with self._lock:
+            if not self._recovered:
+                self._recover()
+            if self._last_sample is not None and t <= self._last_sample:
+                return False
+            self._last_sample = t
+            self.samples += 1
+            self._pending.setdefault("raw", []).append(RAW.pack(t, equity, balance))
+            for name, seconds in RESOLUTIONS.items():
+                start = t - t % seconds
+                bucket = self._buckets.get(name)
+                if bucket is not None and bucket.start == start:
+                    bucket.add(equity, balance)
+                    continue
+                if bucket is not None:
+                    self._pending.setdefault(name, []).append(bucket.pack())
+                self._buckets[name] = _Bucket(start, equity, balance)
+            due = time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+        if due:
+            self.flush()
+        return True
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            for name, records in pending.items():
+                try:
+                    with open(self._path(name), "ab") as f:
+                        f.write(b"".join(records))
+                except OSError as e:
+                    print(f"[⚠️ EQUITY STORE] Write failed for {name}: {e}")
+
+
+def load_series(directory=STORE_DIR, start=None, end=None, points=DEFAULT_POINTS, sample_interval=SAMPLE_INTERVAL):
+    """
+    Downsampled equity curve for [start, end] (epoch seconds): picks the finest stored
+    resolution that fits MAX_SOURCE_POINTS, then applies LTTB.
+    """
+    end = time.time() if end is None else end
+    candidates = [("raw", sample_interval)] + list(RESOLUTIONS.items())
+    chosen = None
+    for name, seconds in candidates:
+        dtype = RAW_DTYPE if name == "raw" else ROLLUP_DTYPE
+        data = _read(os.path.join(directory, f"{name}.bin"), dtype)
+        lo = 0 if start is None else np.searchsorted(data["t"], start)
+        hi = np.searchsorted(data["t"], end, side="right")
+        chosen = (name, data[lo:hi])
+        if hi - lo <= MAX_SOURCE_POINTS:
+            break
+
+    name, data = chosen
+    t = np.asarray(data["t"])
+    equity = np.asarray(data["equity" if name == "raw" else "close"])
+    balance = np.asarray(data["balance"])
+    keep = lttb(t, equity, points)
+    return {
+        "resolution": name,
+        "source_points": int(len(t)),
+        "t": t[keep].tolist(),
+        "equity": equity[keep].round(2).tolist(),
+        "balance": balance[keep].round(2).tolist(),
+    }
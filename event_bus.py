@@ -0,0 +1,295 @@
+# === event_bus.py (In-Process Trading Event Bus) ===
+#
+# Decision/execution code publishes small typed records; formatting, Telegram,
+# logging and metrics happen in subscribers on a dispatcher thread.
+# publish() is a tuple build + deque append: no I/O, no string formatting.
+
+import json
+import os
+import threading
+import time
+from collections import deque, namedtuple, Counter
+
+# === Event types ===
+ZoneTouch = namedtuple("ZoneTouch", "symbol zone_kind zone_price touch")
+Skip = namedtuple("Skip", "symbol reason zone_kind zone_price detail")
+PatternsDetected = namedtuple("PatternsDetected", "symbol source patterns")
+Signal = namedtuple("Signal", "symbol side entry sl tp zone reason")
+OrderResult = namedtuple("OrderResult", "symbol side ok retcode price sl tp lot detail")
+TrailUpdate = namedtuple("TrailUpdate", "symbol ticket new_sl clamped")
+PriceUpdate = namedtuple("PriceUpdate", "symbol price mode")
+OrderTrace = namedtuple(
+    "OrderTrace",
+    "trace_id source symbol side bar_close t_bar t_tick tick_msc t_signal t_request t_send t_fill entry price fill retcode"
+)
+
+EVENT_TYPES = (ZoneTouch, Skip, PatternsDetected, Signal, OrderResult, TrailUpdate, PriceUpdate, OrderTrace)
+
+# Skip reasons
+TREND_MISMATCH = "trend_mismatch"
+NO_CONFIRMATION = "no_confirmation"
+PATTERN_COOLDOWN = "pattern_cooldown"
+NO_SIGNAL = "no_signal"
+SIDEWAYS = "sideways"
+RECENT_PATTERN_TRADE = "recent_pattern_trade"
+NO_PATTERNS = "no_patterns"
+ACTIVE_TRADE = "active_trade"
+TREND_CONFLICT = "trend_conflict"
+
+# === Bus ===
+MAX_PENDING = int(os.getenv("EVENT_BUS_MAX_PENDING", "10000"))  # oldest events drop beyond this
+DISPATCH_INTERVAL = 0.1  # seconds between dispatcher passes
+
+_pending = deque(maxlen=MAX_PENDING)
+_subscribers = []
+_dispatch_lock = threading.Lock()
+_wakeup = threading.Event()
+_dispatcher = None
+_published = 0
+_dropped = 0     # events pushed out of a full _pending deque before dispatch
+
+
+def publish(event):
+    """Queue an event for subscribers. Safe from any thread; never blocks on I/O."""
+    global _published, _dropped
+    if _subscribers:
+        if len(_pending) == MAX_PENDING:
+            _dropped += 1
+        _pending.append((time.time(), event))
+        _published += 1
+
+
+def subscribe(handler):
+    """Register handler(batch) where batch is a list of (timestamp, event) tuples."""
+    if handler not in _subscribers:
+        _subscribers.append(handler)
+    _ensure_dispatcher()
+    return handler
+
+
+def unsubscribe(handler):
+    if handler in _subscribers:
+        _subscribers.remove(handler)
+
+
+def drain():
+    """Dispatch everything queued so far on the calling thread (also used by the dispatcher)."""
+    with _dispatch_lock:
+        if not _pending:
+            return 0
+        batch = []
+        while _pending:
+            batch.append(_pending.popleft())
+        for handler in list(_subscribers):
+            try:
+                handler(batch)
+            except Exception as e:
+                print(f"[⚠️ EVENT BUS] Subscriber {getattr(handler, '__name__', handler)} failed: {e}")
+        return len(batch)
+
+
+def request_dispatch():
+    """Wake the dispatcher now instead of waiting for the next interval."""
+    _wakeup.set()
+
+
+def _dispatch_loop():
+    while True:
+        _wakeup.wait(DISPATCH_INTERVAL)
+        _wakeup.clear()
+        drain()
+
+
+def _ensure_dispatcher():
+    global _dispatcher
+    if _dispatcher is None or not _dispatcher.is_alive():
+        _dispatcher = threading.Thread(target=_dispatch_loop, name="event-dispatcher", daemon=True)
+        _dispatcher.start()
+
+
+def bus_stats():
+    return {"published": _published, "dropped": _dropped, "pending": len(_pending), "subscribers": len(_subscribers)}
+
+
+# === Telegram subscriber ===
+
+def format_event(event):
+    """Render an event as [(text, priority, digest category), ...] for Telegram, tagged with its symbol."""
+    prefix = f"[{event.symbol}] " if event.symbol else ""
+    return [(prefix + text, priority, category) for text, priority, category in _format_body(event)]
+
+
+def _format_body(event):
+    kind = type(event)
+    if kind is ZoneTouch:
+        zone = event.zone_kind.upper()
+        out = [(f"⚠️ Price touched {zone} zone at {event.zone_price:.2f} (touch {event.touch})", "low", "zone_touch")]
+        if event.touch == 4:
+            out.append((f"⚠️ 4th touch at {zone} zone {event.zone_price:.2f} - possible breakout", "normal", "zone_breakout"))
+        return out
+    if kind is Skip:
+        return [(_format_skip(event), "low", event.reason)]
+    if kind is PatternsDetected:
+        labels = {
+            "aggressive": "🔍 Aggressive Mode Patterns: {}",
+            "scan": "🔍 Detected patterns: {}",
+            "scalp": "🧠 Enhanced Pattern Detected: {}",
+        }
+        priority = "normal" if event.source == "scalp" else "low"
+        return [(labels.get(event.source, "🔍 Patterns: {}").format(", ".join(event.patterns)), priority, "patterns")]
+    if kind is Signal:
+        icon = "🟢" if event.side == "buy" else "🔴"
+        if event.reason == "false breakout reversal":
+            zone = "DEMAND" if event.side == "sell" else "SUPPLY"
+            return [
+                (f"🔄 False breakout reversal at {zone} zone {event.zone:.2f} → {event.side.upper()}", "normal", "false_breakout"),
+                (f"{icon} {event.side.upper()} Signal | Entry: {event.entry:.2f} | SL: {event.sl:.2f} | TP: {event.tp:.2f}", "high", "signal"),
+            ]
+        if event.zone is None:
+            icon = "📈" if event.side == "buy" else "📉"
+            return [(f"{icon} Aggressive {event.side.upper()} | Entry: {event.entry:.2f} | SL: {event.sl:.2f} | TP: {event.tp:.2f}", "high", "signal")]
+        return [(
+            f"{icon} {event.side.upper()} Signal | Entry: {event.entry:.2f} | SL: {event.sl:.2f} | TP: {event.tp:.2f}\n"
+            f"Zone: {event.zone:.2f} | Reason: {event.reason}",
+            "high", "signal"
+        )]
+    if kind is OrderResult:
+        if event.ok:
+            return [(
+                f"✅ ORDER PLACED: {event.side.upper()} {event.symbol} @ {event.price:.2f}\n"
+                f"SL: {event.sl:.2f} | TP: {event.tp:.2f} | Lot: {event.lot}"
+                + (f"\n{event.detail}" if event.detail else ""),
+                "high", "order"
+            )]
+        return [(f"❌ Order Failed ({event.side.upper()} {event.symbol}). Retcode: {event.retcode}"
+                 + (f"\n{event.detail}" if event.detail else ""), "high", "order")]
+    if kind is TrailUpdate:
+        if event.clamped:
+            return [(f"⚠️ Trail SL clamped to {event.new_sl:.2f}", "normal", "trail")]
+        return [(f"🔰 Trailed SL to {event.new_sl:.2f}", "normal", "trail")]
+    if kind is PriceUpdate:
+        return [(f"📉 Current Price: {event.price:.2f} | Mode: {event.mode.upper()}", "low", "price")]
+    return []
+
+
+def _format_skip(event):
+    zone = event.zone_kind.upper() if event.zone_kind else ""
+    if event.reason == TREND_MISMATCH:
+        return f"⛔️ Skipped: trend mismatch at {zone} zone {event.zone_price:.2f} (trend: {event.detail})"
+    if event.reason == NO_CONFIRMATION:
+        return f"⛔️ Skipped: no confirmation at {zone} zone {event.zone_price:.2f}"
+    if event.reason == PATTERN_COOLDOWN:
+        # Elapsed seconds stay in the event log; omitting them lets repeats collapse in digests
+        return f"⏳ Cooldown active for pattern: {event.detail[0]}"
+    if event.reason == NO_SIGNAL:
+        return "📭 No signal triggered. Market may not be near any active zone."
+    if event.reason == SIDEWAYS:
+        return "🔕 Skipped pattern scalp — sideways trend"
+    if event.reason == RECENT_PATTERN_TRADE:
+        return "🕒 Skipped pattern scalp — last pattern trade was under 5 mins ago"
+    if event.reason == NO_PATTERNS:
+        return "📭 No valid reversal patterns found for scalp entry."
+    if event.reason == ACTIVE_TRADE:
+        return f"⏳ Skipping {event.detail.upper()} pattern trade - active trade exists"
+    if event.reason == TREND_CONFLICT:
+        return f"⛔ Pattern trade blocked due to trend conflict ({event.detail})"
+    return f"⛔️ Skipped: {event.reason}"
+
+
+def telegram_subscriber(batch):
+    """Format events and hand them to the notification sink."""
+    from telegram_notifier import send_telegram_message, notifications_enabled, flush_message_queue
+    if not notifications_enabled():
+        return
+    for _, event in batch:
+        for text, priority, category in format_event(event):
+            send_telegram_message(text, priority=priority, category=category)
+    flush_message_queue()
+
+
+# === JSONL event log subscriber ===
+
+class JsonlEventLog:
+    """Append events as compact JSON lines, rotating to <path>.1 past max_bytes."""
+
+    def __init__(self, path="events.jsonl", max_bytes=20 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _rotate_if_needed(self):
+        if self._file is not None and self._file.tell() >= self.max_bytes:
+            self._file.close()
+            self._file = None
+            os.replace(self.path, self.path + ".1")
+
+    def __call__(self, batch):
+        file = self._open()
+        for ts, event in batch:
+            record = {"t": type(event).__name__, "ts": round(ts, 3)}
+            record.update((k, v) for k, v in event._asdict().items() if v is not None)
+            file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        file.flush()
+        self._rotate_if_needed()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# === Metrics subscriber ===
+
+class EventMetrics:
+    """Running counts by event type, skip reason and order retcode, plus the latest signals/orders."""
+
+    RECENT_TYPES = (Signal, OrderResult)
+
+    def __init__(self, recent=20):
+        self.by_type = Counter()
+        self.skips = Counter()
+        self.retcodes = Counter()
+        self.recent = deque(maxlen=recent)
+        self.last_event_ts = None
+
+    def __call__(self, batch):
+        for ts, event in batch:
+            kind = type(event)
+            self.by_type[kind.__name__] += 1
+            if kind is Skip:
+                self.skips[event.reason] += 1
+            elif kind is OrderResult:
+                self.retcodes[str(event.retcode)] += 1
+            if kind in self.RECENT_TYPES:
+                self.recent.append({"t": kind.__name__, "ts": round(ts, 3), **event._asdict()})
+        if batch:
+            self.last_event_ts = batch[-1][0]
+
+    def snapshot(self):
+        return {
+            "events": dict(self.by_type),
+            "skips": dict(self.skips),
+            "order_retcodes": dict(self.retcodes),
+            "recent": list(self.recent),
+            "last_event_ts": self.last_event_ts,
+            "bus": bus_stats(),
+        }
+
+
+event_metrics = EventMetrics()
+_event_log = None
+
+
+def install_default_subscribers(event_log_path=None):
+    """Telegram formatting, metrics and (optionally, via EVENT_LOG_PATH) a JSONL event log."""
+    global _event_log
+    subscribe(telegram_subscriber)
+    subscribe(event_metrics)
+    path = event_log_path or os.getenv("EVENT_LOG_PATH")
+    if path and _event_log is None:
+        _event_log = subscribe(JsonlEventLog(path))
@@ -0,0 +1,247 @@
+# === latency_trace.py (Tick-to-Order Latency Tracing) ===
+#
+# Each strategy cycle gets a trace id; the cycle stamps bar detection, tick
+# receipt and signal generation, and place_order stamps request build, send
+# and fill. Every order becomes one OrderTrace event, written off the hot path
+# by the event-bus dispatcher to a rolling CSV (TRACE_LOG_PATH).
+#
+#   python latency_trace.py [trace_log.csv]   -> latency distribution + slippage
+
+import argparse
+import itertools
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+from event_bus import publish, subscribe, OrderTrace
+
+load_dotenv()
+
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH", "trace_log.csv")
+TRACE_LOG_MAX_BYTES = int(os.getenv("TRACE_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+
+_local = threading.local()
+_ids = itertools.count(1)
+_BOOT = int(time.time())
+
+
+class _Trace:
+    __slots__ = ("trace_id", "bar_time", "bar_close", "t_bar", "t_tick", "tick_msc",
+                 "t_signal", "source", "entry", "t_request", "t_send")
+
+    def __init__(self, bar_time, bar_period):
+        self.trace_id = f"{_BOOT:x}-{next(_ids)}"
+        self.bar_time = bar_time
+        self.bar_close = bar_time + bar_period if bar_time is not None else None
+        self.t_bar = time.time()
+        self.t_tick = self.tick_msc = None
+        self.t_signal = self.source = self.entry = None
+        self.t_request = self.t_send = None
+
+
+def begin_cycle(bar_time=None, bar_period=60):
+    """Start a trace for this thread's cycle; bar_time is the new candle's open (broker epoch seconds)."""
+    _local.trace = _Trace(int(bar_time) if bar_time is not None else None, bar_period)
+    return _local.trace.trace_id
+
+
+def end_cycle():
+    _local.trace = None
+
+
+def current_trace_id():
+    trace = getattr(_local, "trace", None)
+    return trace.trace_id if trace else None
+
+
+def mark_tick(tick):
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.t_tick = time.time()
+        trace.tick_msc = getattr(tick, "time_msc", None)
+
+
+def mark_signal(entry, source):
+    """Stamp signal generation; `entry` is the price the signal expected to fill at."""
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.t_signal = time.time()
+        trace.entry = entry
+        trace.source = source
+
+
+def mark_request():
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.t_request = time.time()
+
+
+def mark_send():
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.t_send = time.time()
+
+
+def order_done(side, request, result):
+    """Publish the trace for one order_send round trip and clear its per-order stamps."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return
+    t_fill = time.time()
+    publish(OrderTrace(
+        trace.trace_id, trace.source, request.get("symbol"), side,
+        trace.bar_close, trace.t_bar, trace.t_tick, trace.tick_msc,
+        trace.t_signal, trace.t_request, trace.t_send, t_fill,
+        trace.entry, request.get("price"),
+        getattr(result, "price", None) if result else None,
+        getattr(result, "retcode", None) if result else None,
+    ))
+    trace.t_signal = trace.entry = trace.source = None
+    trace.t_request = trace.t_send = None
+
+
+# === Rolling CSV log (event-bus subscriber) ===
+
+def _fmt(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.6f}".rstrip("0").rstrip(".")
+    return str(value)
+
+
+class TraceLog:
+    """Append OrderTrace events as CSV rows, rotating to <path>.1 past max_bytes."""
+
+    def __init__(self, path=TRACE_LOG_PATH, max_bytes=TRACE_LOG_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._file.tell() == 0:
+                self._file.write(",".join(OrderTrace._fields) + "\n")
+        return self._file
+
+    def __call__(self, batch):
+        rows = [event for _, event in batch if type(event) is OrderTrace]
+        if not rows:
+            return
+        file = self._open()
+        for event in rows:
+            file.write(",".join(_fmt(v) for v in event) + "\n")
+        file.flush()
+        if file.tell() >= self.max_bytes:
+            file.close()
+            self._file = None
+            os.replace(self.path, self.path + ".1")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_trace_log = None
+
+
+def install_trace_log(path=None):
+    global _trace_log
+    if _trace_log is None and (path or TRACE_LOG_PATH):
+        _trace_log = subscribe(TraceLog(path or TRACE_LOG_PATH))
+    return _trace_log
+
+
+# === Summary tool ===
+
+def load_traces(path=TRACE_LOG_PATH):
+    """Read the rolled-over and current trace logs into one DataFrame."""
+    import pandas as pd
+    frames = [pd.read_csv(p) for p in (path + ".1", path) if os.path.exists(p) and os.path.getsize(p)]
+    if not frames:
+        return pd.DataFrame(columns=OrderTrace._fields)
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(df, point=None):
+    """Per-leg latency percentiles (ms) and slippage vs latency; returns a dict."""
+    import numpy as np
+    out = {"orders": int(len(df))}
+    if df.empty:
+        return out
+
+    # Broker bar times are in server time: remove the (half-hour granular) timezone offset
+    lag = (df["t_bar"] - df["bar_close"]).dropna()
+    offset = round(float(lag.median()) / 1800) * 1800 if len(lag) else 0
+    legs = {
+        "bar_close_to_detect": df["t_bar"] - (df["bar_close"] + offset),
+        "detect_to_signal": df["t_signal"] - df["t_bar"],
+        "signal_to_request": df["t_request"] - df["t_signal"],
+        "request_to_send": df["t_send"] - df["t_request"],
+        "send_to_fill": df["t_fill"] - df["t_send"],
+        "tick_to_fill": df["t_fill"] - df["t_tick"],
+        "bar_close_to_fill": df["t_fill"] - (df["bar_close"] + offset),
+    }
+    out["clock_offset_s"] = offset
+    out["latency_ms"] = {}
+    for name, series in legs.items():
+        values = series.dropna().to_numpy() * 1000
+        if len(values):
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            out["latency_ms"][name] = {
+                "p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2),
+                "max": round(values.max(), 2), "count": int(len(values)),
+            }
+
+    # Adverse slippage: positive = filled worse than the signal's entry
+    filled = df.dropna(subset=["fill", "entry"])
+    filled = filled[filled["fill"] > 0]
+    if len(filled):
+        direction = np.where(filled["side"] == "buy", 1.0, -1.0)
+        slip = (filled["fill"] - filled["entry"]).to_numpy() * direction
+        if point:
+            slip = slip / point
+        latency = (filled["t_fill"] - (filled["bar_close"] + offset)).to_numpy() * 1000
+        out["slippage"] = {
+            "unit": "points" if point else "price",
+            "mean": round(float(slip.mean()), 2),
+            "p50": round(float(np.percentile(slip, 50)), 2),
+            "p95": round(float(np.percentile(slip, 95)), 2),
+        }
+        valid = ~np.isnan(latency)
+        if valid.sum() >= 3 and np.std(latency[valid]) > 0 and np.std(slip[valid]) > 0:
+            out["slippage"]["latency_correlation"] = round(float(np.corrcoef(latency[valid], slip[valid])[0, 1]), 3)
+            # Mean slippage per latency quartile
+            edges = np.percentile(latency[valid], [25, 50, 75])
+            quartile = np.searchsorted(edges, latency[valid], side="right")
+            out["slippage"]["by_latency_quartile"] = [
+                round(float(slip[valid][quartile == q].mean()), 2) if (quartile == q).any() else None
+                for q in range(4)
+            ]
+    return out
+
+
+def print_summary(summary):
+    print(f"=== Tick-to-order latency ({summary['orders']} orders) ===")
+    if not summary["orders"]:
+        return
+    print(f"Broker clock offset: {summary['clock_offset_s']}s")
+    for name, stats in summary["latency_ms"].items():
+        print(f"{name:<20}: p50 {stats['p50']:>9} ms | p95 {stats['p95']:>9} ms | p99 {stats['p99']:>9} ms | max {stats['max']:>9} ms")
+    slip = summary.get("slippage")
+    if slip:
+        print(f"Slippage ({slip['unit']}): mean {slip['mean']} | p50 {slip['p50']} | p95 {slip['p95']}")
+        if "latency_correlation" in slip:
+            print(f"Latency vs slippage correlation: {slip['latency_correlation']}")
+            print(f"Mean slippage by latency quartile (fast → slow): {slip['by_latency_quartile']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize tick-to-order latency traces")
+    parser.add_argument("path", nargs="?", default=TRACE_LOG_PATH)
+    parser.add_argument("--point", type=float, default=None, help="Symbol point size to report slippage in points")
+    args = parser.parse_args()
+    print_summary(summarize(load_traces(args.path), point=args.point))
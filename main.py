@@ -1,16 +1,23 @@
 # === main.py (Elite VIX75 Bot Orchestrator) ===
 
-import MetaTrader5 as mt5
-import time
+from mt5_gateway import mt5
+import json
 import os
-from datetime import datetime
+import time
 from dotenv import load_dotenv
 
-from scalper_strategy_engine import monitor_and_trade, SYMBOL, TIMEFRAME_ENTRY, notify_strategy_change
-from emergency_control import check_emergency_stop
+from scalper_strategy_engine import load_instances, run_cycle, TIMEFRAME_ENTRY
+from emergency_control import RiskMonitor
 from performance_tracker import init_log, send_daily_summary
 from symbol_info_helper import print_symbol_lot_info
-from trade_executor import trail_sl as apply_trailing_stop
+from event_bus import install_default_subscribers, event_metrics
+from scheduler import AsyncScheduler
+from stage_timing import span, cycle_done
+from latency_trace import begin_cycle, end_cycle, install_trace_log
+from state_snapshot import restore as restore_state, save_if_due as save_state, write_atomic
+from equity_store import EquityStore, STORE_DIR as EQUITY_STORE_DIR
+import stage_timing
+import metrics
 
 load_dotenv()
 
@@ -18,79 +25,183 @@ MT5_LOGIN = int(os.getenv("MT5_LOGIN"))
 MT5_PASSWORD = os.getenv("MT5_PASSWORD")
 MT5_SERVER = os.getenv("MT5_SERVER")
 
-SUMMARY_SENT = False
 BOT_RUNNING = False
+_scheduler = None
+_risk_monitor = None
+_instances = []
+_settings = {"strategy_mode": None, "lot_size": None}
+startup_report = {}
+
+# Status file another process (the Flask app) can read without locks: replaced atomically
+STATUS_PATH = os.getenv("BOT_STATUS_PATH", "bot_status.json")
+STATUS_INTERVAL = 0.5
+
+# === Task cadences (seconds) ===
+BAR_PERIOD = 60               # M1 entry timeframe
+BAR_CLOSE_DELAY = 0.25        # give the broker a moment to open the new candle
+BAR_RETRY_DELAY = 0.2         # re-check if the new candle isn't there yet...
+BAR_MAX_RETRIES = 10          # ...up to this many times, then wait for the next boundary
+ZONE_PERIOD = 3600            # H1 zone timeframe
+TRAIL_INTERVAL = 5.0          # trailing stop updates
+SUMMARY_TIME = (23, 58)       # daily summary, local time
 
 
 def run_bot(strategy_mode="trend_follow", lot_size=0.001):
-    global SUMMARY_SENT, BOT_RUNNING
+    global BOT_RUNNING, _scheduler, _risk_monitor, _instances, startup_report
     BOT_RUNNING = True
+    started = time.time()
+    _settings.update(strategy_mode=strategy_mode, lot_size=lot_size)
 
     print("🔌 Connecting to MetaTrader 5...")
     if not mt5.initialize(login=MT5_LOGIN, password=MT5_PASSWORD, server=MT5_SERVER):
         print("[❌ ERROR] MT5 Initialization Failed!")
+        BOT_RUNNING = False
         return
 
-    print_symbol_lot_info(SYMBOL)
+    instances = load_instances()
+    _instances = instances
+    for instance in instances:
+        mt5.symbol_select(instance.symbol, True)
+        print_symbol_lot_info(instance.symbol)
     init_log()
-    notify_strategy_change(strategy_mode)
-
-    last_candle_time = None
-    print(f"[✅ BOT READY] Mode: '{strategy_mode}' | Lot: {lot_size}\n")
+    install_default_subscribers()
+    install_trace_log()
+
+    # Warm start: restored mode/zones/cooldowns keep the bot from re-alerting or re-entering
+    startup_report = restore_state(instances, mt5.positions_get() or ())
+    startup_report["first_decision_s"] = None
+    if startup_report["restored"]:
+        print(f"[♻️ WARM START] Restored {len(startup_report['symbols'])} symbol(s) from a "
+              f"{startup_report['age_s']}s old snapshot | reconciled: "
+              f"{startup_report['dropped']} dropped, {startup_report['adopted']} adopted")
+    for instance in instances:
+        instance.notify_strategy_change(strategy_mode)
+
+    scheduler = AsyncScheduler()
+    _scheduler = scheduler
+    bar_state = {"last_candle_time": None, "retries": 0}
+
+    def halt(reason):
+        breach = risk_monitor.breach or {}
+        from telegram_notifier import send_telegram_message
+        send_telegram_message(
+            f"❌ Bot Stopped: {reason}\n"
+            f"Flattened {len(breach.get('closed', []))} position(s)"
+            + (f", {len(breach['failed'])} FAILED to close" if breach.get("failed") else "")
+            + f" in {breach.get('breach_to_flat_ms')} ms",
+            priority="high"
+        )
+        scheduler.stop()
+
+    # Equity/drawdown checks run on their own thread, never behind a strategy cycle;
+    # the same account snapshots feed the equity curve
+    equity_store = EquityStore() if EQUITY_STORE_DIR else None
+    risk_monitor = RiskMonitor(
+        {instance.magic for instance in instances}, on_halt=halt,
+        on_account=(lambda account: equity_store.append(account.equity, account.balance)) if equity_store else None,
+    )
+    _risk_monitor = risk_monitor
+
+    def on_bar_close():
+        # All symbols share the M1 clock; the first one tells us the bar has closed
+        rates = mt5.copy_rates_from_pos(instances[0].symbol, TIMEFRAME_ENTRY, 0, 1)
+        current_candle_time = rates[0]['time'] if rates is not None and len(rates) else None
+        if current_candle_time is None or current_candle_time == bar_state["last_candle_time"]:
+            # New candle not visible yet: retry shortly, but don't spin if the market is closed
+            bar_state["retries"] += 1
+            return BAR_RETRY_DELAY if bar_state["retries"] <= BAR_MAX_RETRIES else None
+
+        bar_state["retries"] = 0
+        bar_state["last_candle_time"] = current_candle_time
+        begin_cycle(current_candle_time, BAR_PERIOD)
+        try:
+            with span("batch"):
+                run_cycle(instances, strategy_mode=_settings["strategy_mode"], fixed_lot=_settings["lot_size"])
+        finally:
+            end_cycle()
+        cycle_done()
+        save_state(instances)
+
+        if startup_report["first_decision_s"] is None and any(instance.decisions for instance in instances):
+            elapsed = round(time.time() - started, 2)
+            startup_report["first_decision_s"] = elapsed
+            kind = "warm" if startup_report["restored"] else "cold"
+            print(f"[⏱️ STARTUP] First decision {elapsed}s after start ({kind} start)")
+
+    def rescan_zones():
+        with span("zone_job"):
+            for instance in instances:
+                instance.refresh_zones(force=True)
+
+    def trail_positions():
+        with span("trailing_job"):
+            for instance in instances:
+                instance.trail()
+
+    scheduler.every("m1_bar", BAR_PERIOD, on_bar_close, align=True, offset=BAR_CLOSE_DELAY, run_now=True)
+    scheduler.every("zones", ZONE_PERIOD, rescan_zones, align=True, offset=BAR_CLOSE_DELAY)
+    scheduler.every("trailing_stop", TRAIL_INTERVAL, trail_positions)
+    scheduler.daily("daily_summary", *SUMMARY_TIME, send_daily_summary)
+    scheduler.every("status", STATUS_INTERVAL, write_status, run_now=True)
+
+    symbols = ", ".join(instance.symbol for instance in instances)
+    print(f"[✅ BOT READY] Mode: '{strategy_mode}' | Lot: {lot_size} | Symbols: {symbols}\n")
 
     try:
-        while BOT_RUNNING:
-            tick = mt5.symbol_info_tick(SYMBOL)
-            if tick is None:
-                time.sleep(0.1)
-                continue
-
-            rates = mt5.copy_rates_from_pos(SYMBOL, TIMEFRAME_ENTRY, 0, 1)
-            if not rates:
-                time.sleep(0.1)
-                continue
-
-            current_candle_time = rates[0]['time']
-            equity = mt5.account_info().equity
-
-            # Emergency stop logic
-            if reason := check_emergency_stop(equity):
-                from telegram_notifier import send_telegram_message
-                send_telegram_message(f"❌ Bot Stopped: {reason}")
-                mt5.shutdown()
-                break
-
-            # New candle triggers strategy
-            if current_candle_time != last_candle_time:
-                last_candle_time = current_candle_time
-
-                try:
-                    monitor_and_trade(strategy_mode=strategy_mode, fixed_lot=lot_size)
-                except Exception as e:
-                    print(f"[⚠️ STRATEGY ERROR] {e}")
-
-                apply_trailing_stop(SYMBOL, magic=77775)
-
-                # Daily summary check (between 23:58–23:59)
-                now = datetime.now()
-                if 23 <= now.hour < 24 and 58 <= now.minute <= 59 and not SUMMARY_SENT:
-                    send_daily_summary()
-                    SUMMARY_SENT = True
-
-                # Reset flag at midnight
-                if now.hour == 0 and now.minute == 0:
-                    SUMMARY_SENT = False
-
-            time.sleep(0.1)
-
+        if BOT_RUNNING:
+            risk_monitor.start()
+            scheduler.run()
     except Exception as e:
         print(f"[❗ BOT ERROR] {e}")
     finally:
+        risk_monitor.stop()
+        if equity_store is not None:
+            equity_store.flush()
+        save_state(instances, force=True)
         mt5.shutdown()
         BOT_RUNNING = False
+        write_status()
         print("🛑 Bot stopped and MT5 connection closed.")
 
 
 def stop_bot():
     global BOT_RUNNING
     BOT_RUNNING = False
+    if _scheduler is not None:
+        _scheduler.stop()
+
+
+def set_mode(strategy_mode=None, lot_size=None):
+    """Change strategy mode and/or lot size; takes effect on the next cycle."""
+    if lot_size is not None:
+        _settings["lot_size"] = lot_size
+    if strategy_mode and strategy_mode != _settings["strategy_mode"]:
+        _settings["strategy_mode"] = strategy_mode
+        for instance in _instances:
+            instance.notify_strategy_change(strategy_mode)
+
+
+def bot_status():
+    status = {
+        "running": BOT_RUNNING,
+        "strategy": _settings["strategy_mode"],
+        "lot": _settings["lot_size"],
+        "symbols": [instance.symbol for instance in _instances],
+        "active_trades": {instance.symbol: len(instance.active_trades) for instance in _instances},
+        "updated": time.time(),
+        "pid": os.getpid(),
+        "startup": startup_report,
+    }
+    if _risk_monitor is not None:
+        status["risk"] = _risk_monitor.stats()
+    if _scheduler is not None:
+        status["jobs"] = _scheduler.stats()
+    status["latency_ms"] = stage_timing.snapshot()
+    status["events"] = event_metrics.snapshot()
+    status["metrics"] = metrics.collect(_instances)
+    return status
+
+
+def write_status():
+    if STATUS_PATH:
+        write_atomic(STATUS_PATH, json.dumps(bot_status(), default=str).encode(), fsync=False)
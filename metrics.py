@@ -0,0 +1,151 @@
+# === metrics.py (Prometheus Text Exposition) ===
+#
+# The bot process gathers its counters into the status file (collect(), run by
+# the status job, never by the strategy). The Flask process turns the latest
+# status into Prometheus text (render()). A scrape only reads a file the bot
+# replaces atomically, so scraping never takes a lock the trading loop uses.
+
+import math
+import time
+
+CYCLE_STAGE = "batch"   # span that wraps one full strategy cycle in main.on_bar_close
+
+
+def collect(instances):
+    """Bot side: counters that aren't already in the status file."""
+    # Imported here so the web process can render() without loading the MT5 gateway
+    import stage_timing
+    from mt5_gateway import call_stats
+    from telegram_notifier import get_notifier_stats
+
+    return {
+        "cycles": stage_timing.cycles(),
+        "cycle_hist": stage_timing.buckets(CYCLE_STAGE),
+        "mt5_calls": call_stats(),
+        "notifier": get_notifier_stats(),
+        "strategy": {
+            instance.symbol: {
+                "zones": len(instance.last_demand_zones) + len(instance.last_supply_zones),
+                "touch_states": len(instance.zone_touch_counts),
+            }
+            for instance in instances
+        },
+    }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if value is None:
+        return None
+    if isinstance(value, (bool, int)):
+        return int(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _format_number(value):
+    """Full precision: counters past 1e6 must still change between scrapes."""
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, kind, help_text):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name, value, **labels):
+        value = _number(value)
+        if value is None:
+            return
+        value = _format_number(value)
+        label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        self.lines.append(f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}")
+
+    def metric(self, name, kind, help_text, value, **labels):
+        self.family(name, kind, help_text)
+        self.sample(name, value, **labels)
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def render(status):
+    """Prometheus text format (0.0.4) for a status dict as returned by BotProcess.status()."""
+    out = _Exposition()
+    metrics = status.get("metrics") or {}
+    updated = status.get("updated")
+
+    out.metric("vix75_bot_up", "gauge", "1 if the bot process is running", status.get("running", False))
+    out.metric("vix75_bot_responsive", "gauge", "1 if the bot wrote its status recently",
+               status.get("responsive", False))
+    out.metric("vix75_bot_status_age_seconds", "gauge", "Seconds since the bot last wrote its status",
+               time.time() - updated if updated else None)
+    out.metric("vix75_cycles_total", "counter", "Strategy cycles run", metrics.get("cycles"))
+
+    hist = metrics.get("cycle_hist")
+    if hist:
+        out.family("vix75_cycle_duration_seconds", "histogram", "Duration of one batched strategy cycle")
+        for le_ms, count in zip(hist["le_ms"], hist["counts"]):
+            out.sample("vix75_cycle_duration_seconds_bucket", count, le=f"{le_ms / 1000:g}")
+        out.sample("vix75_cycle_duration_seconds_bucket", hist["count"], le="+Inf")
+        out.sample("vix75_cycle_duration_seconds_sum", hist["sum_ms"] / 1000)
+        out.sample("vix75_cycle_duration_seconds_count", hist["count"])
+
+    calls = metrics.get("mt5_calls") or {}
+    out.family("vix75_broker_calls_total", "counter", "MT5 API calls by function")
+    for name, stats in sorted(calls.items()):
+        out.sample("vix75_broker_calls_total", stats.get("calls"), call=name)
+    out.family("vix75_broker_call_seconds_total", "counter", "Time spent queued and executing MT5 calls")
+    for name, stats in sorted(calls.items()):
+        out.sample("vix75_broker_call_seconds_total", (stats.get("wait_ms") or 0) / 1000, call=name)
+
+    bus = (status.get("events") or {}).get("bus") or {}
+    out.metric("vix75_events_published_total", "counter", "Events queued on the in-process event bus",
+               bus.get("published"))
+    out.metric("vix75_events_dropped_total", "counter", "Events dropped because the event bus queue was full",
+               bus.get("dropped"))
+    out.metric("vix75_events_pending", "gauge", "Events waiting for the bus dispatcher", bus.get("pending"))
+
+    retcodes = (status.get("events") or {}).get("order_retcodes") or {}
+    out.family("vix75_orders_total", "counter", "Order results by MT5 retcode")
+    for retcode, count in sorted(retcodes.items()):
+        out.sample("vix75_orders_total", count, retcode=retcode)
+
+    notifier = metrics.get("notifier") or {}
+    out.metric("vix75_telegram_queue_depth", "gauge", "Telegram messages waiting to be sent",
+               notifier.get("queue_depth"))
+    out.family("vix75_telegram_send_latency_seconds", "gauge", "Telegram send latency percentiles")
+    for key, ms in sorted((notifier.get("send_latency_ms") or {}).items()):
+        out.sample("vix75_telegram_send_latency_seconds", ms / 1000, quantile=f"0.{key[1:]}")
+
+    strategy = metrics.get("strategy") or {}
+    out.family("vix75_zones", "gauge", "Supply and demand zones tracked")
+    for symbol, stats in sorted(strategy.items()):
+        out.sample("vix75_zones", stats.get("zones"), symbol=symbol)
+    out.family("vix75_touch_states", "gauge", "Entries in the zone touch-count table")
+    for symbol, stats in sorted(strategy.items()):
+        out.sample("vix75_touch_states", stats.get("touch_states"), symbol=symbol)
+    out.family("vix75_active_trades", "gauge", "Trades the strategy is managing")
+    for symbol, count in sorted((status.get("active_trades") or {}).items()):
+        out.sample("vix75_active_trades", count, symbol=symbol)
+
+    risk = status.get("risk") or {}
+    out.metric("vix75_equity", "gauge", "Account equity seen by the risk monitor", risk.get("equity"))
+    out.metric("vix75_daily_profit", "gauge", "Session profit seen by the risk monitor", risk.get("daily_profit"))
+    out.metric("vix75_drawdown", "gauge", "Session drawdown seen by the risk monitor", risk.get("drawdown"))
+    out.metric("vix75_trading_halted", "gauge", "1 once the risk monitor has halted trading", risk.get("halted"))
+    return out.text()
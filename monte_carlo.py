@@ -0,0 +1,212 @@
+# === monte_carlo.py (Trade-Sequence Resampling / Risk of Ruin) ===
+#
+#     python monte_carlo.py                                  # live trade_journal.csv
+#     python monte_carlo.py --log backtest_results.csv --block 20 --workers 4
+#
+# Resamples a trade log's profits into many alternative trade sequences. Plain
+# bootstrap draws trades independently; block bootstrap (--block L) draws runs
+# of L consecutive trades so losing streaks stay together. Each chunk of paths
+# is one (paths x trades) matrix: cumulative equity, running peaks and breach
+# masks are whole-matrix NumPy operations, with no per-path Python loop.
+# Trades are grouped into days with the log's own trades-per-day pattern. That
+# lets the emergency_control limits (risk_limits.py) be checked the way the risk monitor does:
+# realized P&L since the day started (MAX_DAILY_LOSS) and the drop from the
+# day's equity peak (MAX_DRAWDOWN). Each chunk has its own seed, so results
+# don't depend on --workers.
+
+import argparse
+import numpy as np
+import pandas as pd
+
+from performance_analytics import JOURNAL_PATH, load_journal
+from risk_limits import MAX_DAILY_LOSS, MAX_DRAWDOWN
+
+DEFAULT_PATHS = 50_000
+CHUNK_CELLS = 2_000_000   # paths x trades per matrix; keeps a chunk's arrays in a few tens of MB
+PERCENTILES = (5, 25, 50, 75, 95, 99)
+
+
+def load_profits(path=JOURNAL_PATH):
+    """(profits, exit times) from the live journal or a backtest trades CSV (backtest_engine --out)."""
+    try:
+        header = pd.read_csv(path, nrows=0).columns
+    except pd.errors.EmptyDataError:
+        return np.zeros(0), np.zeros(0, dtype="datetime64[s]")
+    if "Profit" in header:
+        log = load_journal(path)
+        profits, times = log["profit"], log["time"]
+    else:
+        df = pd.read_csv(path)
+        profits = df["profit"].to_numpy(dtype=float)
+        times = pd.to_datetime(df["exit_time"], errors="coerce").to_numpy(dtype="datetime64[s]")
+    order = np.argsort(times, kind="stable")
+    return profits[order], times[order]
+
+
+def day_layout(times, horizon, trades_per_day=None):
+    """Day number of each of `horizon` trades, repeating the log's trades-per-day pattern."""
+    days = np.asarray(times, dtype="datetime64[D]") if times is not None else np.zeros(0, dtype="datetime64[D]")
+    days = days[~np.isnat(days)]
+    if trades_per_day or not len(days):
+        per_day = np.array([trades_per_day or 10])
+    else:
+        _, per_day = np.unique(days, return_counts=True)
+    reps = -(-horizon // int(per_day.sum()))
+    return np.repeat(np.arange(len(per_day) * reps), np.tile(per_day, reps))[:horizon]
+
+
+def _sample(rng, n, paths, horizon, block):
+    """Trade indices for each path: i.i.d. draws, or circular blocks of `block` trades."""
+    if not block or block <= 1:
+        return rng.integers(0, n, size=(paths, horizon), dtype=np.int32)
+    blocks = -(-horizon // block)
+    starts = rng.integers(0, n, size=(paths, blocks, 1), dtype=np.int32)
+    return ((starts + np.arange(block, dtype=np.int32)) % n).reshape(paths, blocks * block)[:, :horizon]
+
+
+def _first(mask):
+    """Column of the first True per row, -1 where there is none."""
+    hit = mask.any(axis=1)
+    return np.where(hit, mask.argmax(axis=1), -1)
+
+
+def _simulate_chunk(task):
+    profits, day_of, paths, block, seed, max_daily_loss, max_drawdown, ruin_level = task
+    rng = np.random.default_rng(seed)
+    horizon = len(day_of)
+    equity = profits[_sample(rng, len(profits), paths, horizon, block)]
+    np.cumsum(equity, axis=1, out=equity)
+    final = equity[:, -1].copy()
+    low = equity.min(axis=1)
+
+    ruin = np.full(paths, -1)
+    if ruin_level is not None:
+        rows = np.flatnonzero(low <= ruin_level)
+        ruin[rows] = _first(equity[rows] <= ruin_level)
+
+    # Drawdown from the running peak (which starts at 0); the lowest equity covers the 0 start
+    work = np.maximum.accumulate(equity, axis=1)
+    np.subtract(equity, work, out=work)
+    max_dd = np.minimum(work.min(axis=1), low)
+
+    # Intraday P&L: equity minus the equity at the end of the previous day
+    first_of_day = np.r_[0, np.flatnonzero(np.diff(day_of)) + 1]
+    lengths = np.diff(np.r_[first_of_day, horizon])
+    day_start = np.zeros((paths, len(first_of_day)))
+    day_start[:, 1:] = equity[:, first_of_day[1:] - 1]
+    np.subtract(equity, np.repeat(day_start, lengths, axis=1), out=work)
+    del equity, day_start
+    daily_hit = _first(work < max_daily_loss)
+
+    # Intraday drawdown: running max restarted each day by lifting every day above the one before
+    offset = day_of * (2.0 * np.abs(profits).max() * lengths.max() + 1.0)
+    peak = work + offset
+    np.maximum.accumulate(peak, axis=1, out=peak)
+    peak -= offset
+    np.subtract(work, peak, out=peak)
+    # The day's opening equity is also a peak, so falling below it by the limit counts too
+    drawdown_hit = _first((peak < max_drawdown) | (work < max_drawdown))
+
+    return {
+        "final": final,
+        "max_drawdown": max_dd,
+        "daily_loss_trade": daily_hit,
+        "drawdown_trade": drawdown_hit,
+        "ruin_trade": ruin,
+    }
+
+
+def simulate(profits, times=None, paths=DEFAULT_PATHS, horizon=None, block=None, seed=0,
+             max_daily_loss=MAX_DAILY_LOSS, max_drawdown=MAX_DRAWDOWN, capital=None, trades_per_day=None, workers=1):
+    """
+    Per-path arrays for `paths` resampled sequences of `horizon` trades (default: the log's length):
+    final P&L, max drawdown, and the trade index of the first daily-loss, intraday-drawdown and
+    ruin (equity <= -capital) breach, -1 if never. Also returns day_of (day number of each trade).
+    """
+    profits = np.asarray(profits, dtype=float)
+    if not len(profits):
+        raise ValueError("No trades to resample")
+    horizon = horizon or len(profits)
+    day_of = day_layout(times, horizon, trades_per_day)
+    ruin_level = -abs(capital) if capital else None
+
+    per_chunk = max(1, CHUNK_CELLS // horizon)
+    sizes = [min(per_chunk, paths - start) for start in range(0, paths, per_chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(profits, day_of, size, block, s, max_daily_loss, max_drawdown, ruin_level)
+             for size, s in zip(sizes, seeds)]
+
+    if workers and workers > 1:
+        from multiprocessing import get_context
+        with get_context().Pool(min(workers, len(tasks))) as pool:
+            chunks = pool.map(_simulate_chunk, tasks)
+    else:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    result = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+    result["day_of"] = day_of
+    return result
+
+
+def _distribution(values):
+    return {f"p{q}": round(float(v), 2) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def summarize(result):
+    """Percentiles of final P&L and max drawdown; probability and timing of each breach."""
+    day_of = result["day_of"]
+    summary = {
+        "paths": len(result["final"]),
+        "trades": len(day_of),
+        "final": _distribution(result["final"]),
+        "max_drawdown": _distribution(result["max_drawdown"]),
+    }
+    for name in ("daily_loss", "drawdown", "ruin"):
+        trade = result[f"{name}_trade"]
+        hit = trade >= 0
+        summary[name] = {
+            "probability": round(float(hit.mean()), 4),
+            "trades_to_breach": _distribution(trade[hit]) if hit.any() else None,
+            "days_to_breach": _distribution(day_of[trade[hit]]) if hit.any() else None,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo resampling of a trade log against the risk limits")
+    parser.add_argument("--log", default=JOURNAL_PATH, help="trade_journal.csv or a backtest trades CSV")
+    parser.add_argument("--paths", type=int, default=DEFAULT_PATHS)
+    parser.add_argument("--trades", type=int, help="trades per path (default: the log's length)")
+    parser.add_argument("--block", type=int, help="block bootstrap with this block length")
+    parser.add_argument("--capital", type=float, default=1000.0, help="ruin = losing this much")
+    parser.add_argument("--max-daily-loss", type=float, default=MAX_DAILY_LOSS)
+    parser.add_argument("--max-drawdown", type=float, default=MAX_DRAWDOWN)
+    parser.add_argument("--trades-per-day", type=int, help="default: the log's own pattern")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    profits, times = load_profits(args.log)
+    if not len(profits):
+        print(f"[⚠️ MONTE CARLO] No trades in {args.log}")
+        return
+    result = simulate(profits, times, args.paths, args.trades, args.block, args.seed,
+                      args.max_daily_loss, args.max_drawdown, args.capital, args.trades_per_day, args.workers)
+    s = summarize(result)
+
+    print(f"\n=== 🎲 MONTE CARLO ({s['paths']:,} paths x {s['trades']:,} trades"
+          f"{f', block {args.block}' if args.block else ''}) ===")
+    print(f"Source: {len(profits)} trades from {args.log}")
+    print(f"Final P&L:     {s['final']}")
+    print(f"Max drawdown:  {s['max_drawdown']}")
+    for name, label in (("daily_loss", f"Daily loss < {args.max_daily_loss:g}"),
+                        ("drawdown", f"Intraday drawdown < {args.max_drawdown:g}"),
+                        ("ruin", f"Ruin (-{args.capital:g})")):
+        breach = s[name]
+        print(f"{label}: {breach['probability'] * 100:.2f}% of paths")
+        if breach["days_to_breach"]:
+            print(f"  days to breach:   {breach['days_to_breach']}")
+            print(f"  trades to breach: {breach['trades_to_breach']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# === mt5_gateway.py (Serialized MetaTrader5 Access) ===
+#
+# The MetaTrader5 package isn't thread-safe, so every call goes through one
+# dedicated "mt5" thread. Bot modules import the proxy instead of the package:
+#     from mt5_gateway import mt5
+# Constants pass straight through; function calls are queued to the MT5 thread
+# and the caller blocks only for that one call, so concurrent tasks (risk
+# monitor, trailing stops, strategy cycle) interleave at call granularity.
+
+import asyncio
+import functools
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import MetaTrader5 as _mt5
+
+_mt5_thread_id = None
+_calls = Counter()
+_wait_time = Counter()  # seconds spent queued + executing, by function name
+
+
+def _mark_mt5_thread():
+    global _mt5_thread_id
+    _mt5_thread_id = threading.get_ident()
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mt5", initializer=_mark_mt5_thread)
+
+
+def run(func, *args, **kwargs):
+    """Run a blocking MT5 call on the MT5 thread and return its result."""
+    name = getattr(func, "__name__", "call")
+    _calls[name] += 1
+    if threading.get_ident() == _mt5_thread_id:
+        return func(*args, **kwargs)
+    started = time.perf_counter()
+    try:
+        return _executor.submit(func, *args, **kwargs).result()
+    finally:
+        _wait_time[name] += time.perf_counter() - started
+
+
+async def run_async(func, *args, **kwargs):
+    """Awaitable version of run() for asyncio tasks (accepts proxy attributes too)."""
+    func = getattr(func, "raw", func)
+    _calls[getattr(func, "__name__", "call")] += 1
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+class _MT5Proxy:
+    """Module stand-in: attributes resolve on MetaTrader5, callables route through run()."""
+
+    def __getattr__(self, name):
+        attr = getattr(_mt5, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            return run(attr, *args, **kwargs)
+
+        call.raw = attr
+        self.__dict__[name] = call  # cache the wrapper
+        return call
+
+
+mt5 = _MT5Proxy()
+
+
+def call_stats():
+    return {
+        name: {"calls": count, "wait_ms": round(_wait_time[name] * 1000, 2)}
+        for name, count in list(_calls.items())  # copy: the MT5 thread may add names meanwhile
+    }
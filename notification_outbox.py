@@ -0,0 +1,82 @@
+# === notification_outbox.py (Durable Telegram Outbox) ===
+#
+# Append-only SQLite store the Telegram sender writes to before each send.
+# Rows stay pending until the API confirms delivery, so messages survive
+# crashes and network outages (at-least-once; the idempotency key lets a
+# receiver drop repeats).
+
+import sqlite3
+import time
+import uuid
+
+OUTBOX_MAX_ATTEMPTS = 10
+OUTBOX_RETENTION = 7 * 24 * 3600  # seconds to keep delivered rows
+
+
+class NotificationOutbox:
+    def __init__(self, path="telegram_outbox.db"):
+        self.path = path
+        # One connection, owned by the sender thread
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                created REAL NOT NULL,
+                priority TEXT NOT NULL,
+                text TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                sent_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (sent_at, id)")
+
+    def add(self, text, priority="normal", key=None):
+        """Persist a message; returns (row_id, idempotency_key)."""
+        key = key or uuid.uuid4().hex
+        cur = self.conn.execute(
+            "INSERT OR IGNORE INTO outbox (key, created, priority, text) VALUES (?, ?, ?, ?)",
+            (key, time.time(), priority, text)
+        )
+        if cur.lastrowid and cur.rowcount:
+            return cur.lastrowid, key
+        row = self.conn.execute("SELECT id FROM outbox WHERE key = ?", (key,)).fetchone()
+        return row[0], key
+
+    def mark_sent(self, ids):
+        if ids:
+            self.conn.executemany(
+                "UPDATE outbox SET sent_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(time.time(), i) for i in ids]
+            )
+
+    def mark_failed(self, ids):
+        if ids:
+            self.conn.executemany("UPDATE outbox SET attempts = attempts + 1 WHERE id = ?", [(i,) for i in ids])
+
+    def pending(self, limit=50, exclude=()):
+        """Oldest undelivered rows still under the attempt limit: [(id, key, priority, text, created)]."""
+        rows = self.conn.execute(
+            "SELECT id, key, priority, text, created FROM outbox "
+            "WHERE sent_at IS NULL AND attempts < ? ORDER BY id LIMIT ?",
+            (OUTBOX_MAX_ATTEMPTS, limit + len(exclude))
+        ).fetchall()
+        return [r for r in rows if r[0] not in exclude][:limit]
+
+    def backlog_size(self):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM outbox WHERE sent_at IS NULL AND attempts < ?", (OUTBOX_MAX_ATTEMPTS,)
+        ).fetchone()[0]
+
+    def prune(self, retention=OUTBOX_RETENTION):
+        cutoff = time.time() - retention
+        self.conn.execute("DELETE FROM outbox WHERE sent_at IS NOT NULL AND sent_at < ?", (cutoff,))
+        self.conn.execute(
+            "DELETE FROM outbox WHERE sent_at IS NULL AND attempts >= ? AND created < ?",
+            (OUTBOX_MAX_ATTEMPTS, cutoff)
+        )
+
+    def close(self):
+        self.conn.close()
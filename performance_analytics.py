@@ -0,0 +1,314 @@
+# === performance_analytics.py (Vectorized Trade Metrics) ===
+
+import csv
+import os
+import numpy as np
+
+JOURNAL_PATH = "trade_journal.csv"
+PERIODS_PER_YEAR = 365  # VIX75 trades every calendar day
+
+# Journal column -> breakdown key
+BREAKDOWN_COLUMNS = {
+    "strategy_mode": "Strategy Mode",
+    "zone_type": "Zone Type",
+    "pattern": "Entry Reason",
+}
+
+
+def _to_datetime64(values):
+    """Convert journal/broker timestamps to datetime64[s], unparseable values become NaT."""
+    cleaned = [v if v not in (None, "", "-") else "NaT" for v in values]
+    try:
+        return np.array(cleaned, dtype="datetime64[s]")
+    except ValueError:
+        out = np.full(len(cleaned), np.datetime64("NaT"), dtype="datetime64[s]")
+        for i, v in enumerate(cleaned):
+            try:
+                out[i] = np.datetime64(v, "s")
+            except ValueError:
+                continue
+        return out
+
+
+def load_journal(path=JOURNAL_PATH):
+    """Load the trade journal into column arrays (profit, exit_time and breakdown keys)."""
+    if not os.path.isfile(path):
+        return {
+            "profit": np.zeros(0),
+            "time": np.zeros(0, dtype="datetime64[s]"),
+            **{key: np.zeros(0, dtype=object) for key in BREAKDOWN_COLUMNS},
+        }
+
+    with open(path, mode="r") as file:
+        return journal_from_rows(list(csv.DictReader(file)))
+
+
+def journal_from_rows(rows):
+    """Column arrays from already-parsed journal rows (csv.DictReader dicts)."""
+    profit = np.array([
+        float(r["Profit"]) if r.get("Profit") not in ["", "-", None] else 0.0
+        for r in rows
+    ])
+    times = _to_datetime64([r.get("Exit Time") or r.get("Timestamp") for r in rows])
+    log = {"profit": profit, "time": times}
+    for key, column in BREAKDOWN_COLUMNS.items():
+        log[key] = np.array([r.get(column) or "-" for r in rows], dtype=object)
+    return log
+
+
+def _run_lengths(mask):
+    """Return (starts, lengths, values) of consecutive runs in a boolean array."""
+    n = len(mask)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=bool)
+    starts = np.r_[0, np.flatnonzero(mask[1:] != mask[:-1]) + 1]
+    lengths = np.diff(np.r_[starts, n])
+    return starts, lengths, mask[starts]
+
+
+def drawdown_curve(profits, initial_equity=0.0):
+    """Equity, running peak and drawdown (<= 0) after each trade."""
+    profits = np.asarray(profits, dtype=float)
+    equity = initial_equity + np.cumsum(profits)
+    peak = np.maximum.accumulate(np.r_[initial_equity, equity])[1:]
+    return equity, peak, equity - peak
+
+
+def max_drawdown_duration(drawdown, times=None):
+    """Longest underwater stretch, in trades and (if times given) in seconds."""
+    starts, lengths, values = _run_lengths(np.asarray(drawdown) < 0)
+    if not values.any():
+        return 0, 0.0 if times is not None else None
+
+    under_starts = starts[values]
+    under_lengths = lengths[values]
+    longest = int(under_lengths.max())
+    if times is None:
+        return longest, None
+
+    # Measure from the peak trade before each run to the recovering trade (or the last trade)
+    times = np.asarray(times, dtype="datetime64[s]")
+    peak_idx = np.maximum(under_starts - 1, 0)
+    end_idx = np.minimum(under_starts + under_lengths, len(times) - 1)
+    elapsed = times[end_idx] - times[peak_idx]
+    elapsed = elapsed[~np.isnat(elapsed)].astype(np.int64)
+    return longest, float(elapsed.max()) if len(elapsed) else 0.0
+
+
+def streaks(profits):
+    """Longest win/loss streaks and the current streak (positive = wins, negative = losses)."""
+    wins = np.asarray(profits, dtype=float) > 0
+    _, lengths, values = _run_lengths(wins)
+    if len(lengths) == 0:
+        return {"max_win_streak": 0, "max_loss_streak": 0, "current_streak": 0}
+    win_runs = lengths[values]
+    loss_runs = lengths[~values]
+    current = int(lengths[-1]) if values[-1] else -int(lengths[-1])
+    return {
+        "max_win_streak": int(win_runs.max()) if len(win_runs) else 0,
+        "max_loss_streak": int(loss_runs.max()) if len(loss_runs) else 0,
+        "current_streak": current,
+    }
+
+
+def daily_returns(profits, times, initial_equity=0.0):
+    """
+    Calendar-day returns including flat days.
+    With a positive initial equity returns are fractional, otherwise they are daily P&L.
+    """
+    profits = np.asarray(profits, dtype=float)
+    times = np.asarray(times, dtype="datetime64[s]")
+    valid = ~np.isnat(times)
+    if not valid.any():
+        return np.zeros(0)
+
+    days = times[valid].astype("datetime64[D]")
+    offsets = (days - days.min()).astype(np.int64)
+    daily_pnl = np.bincount(offsets, weights=profits[valid])
+    if initial_equity <= 0:
+        return daily_pnl
+
+    start_equity = initial_equity + np.r_[0.0, np.cumsum(daily_pnl)[:-1]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(start_equity > 0, daily_pnl / start_equity, 0.0)
+    return returns
+
+
+def sharpe_ratio(returns, periods_per_year=PERIODS_PER_YEAR):
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) < 2:
+        return 0.0
+    std = returns.std(ddof=1)
+    return float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0
+
+
+def sortino_ratio(returns, periods_per_year=PERIODS_PER_YEAR):
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) < 2:
+        return 0.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    return float(returns.mean() / downside * np.sqrt(periods_per_year)) if downside > 0 else 0.0
+
+
+def compute_metrics(profits, times=None, initial_equity=0.0):
+    """Full metric set for a sequence of closed-trade profits."""
+    profits = np.asarray(profits, dtype=float)
+    total = len(profits)
+    if total == 0:
+        return {
+            "total_trades": 0, "wins": 0, "losses": 0, "win_rate": 0.0,
+            "total_profit": 0.0, "expectancy": 0.0, "avg_win": 0.0, "avg_loss": 0.0,
+            "profit_factor": None, "sharpe": 0.0, "sortino": 0.0,
+            "max_drawdown": 0.0, "max_drawdown_trades": 0, "max_drawdown_seconds": None,
+            "max_win_streak": 0, "max_loss_streak": 0, "current_streak": 0,
+        }
+
+    win_mask = profits > 0
+    wins = int(win_mask.sum())
+    losses = total - wins
+    gross_profit = float(profits[win_mask].sum())
+    gross_loss = float(-profits[~win_mask].sum())
+
+    _, _, drawdown = drawdown_curve(profits, initial_equity)
+    dd_trades, dd_seconds = max_drawdown_duration(drawdown, times)
+
+    if times is not None:
+        returns = daily_returns(profits, times, initial_equity)
+        sharpe, sortino = sharpe_ratio(returns), sortino_ratio(returns)
+    else:
+        sharpe = sortino = 0.0
+
+    return {
+        "total_trades": total,
+        "wins": wins,
+        "losses": losses,
+        "win_rate": round(wins / total * 100, 2),
+        "total_profit": round(float(profits.sum()), 2),
+        "expectancy": round(float(profits.mean()), 4),
+        "avg_win": round(gross_profit / wins, 2) if wins else 0.0,
+        "avg_loss": round(-gross_loss / losses, 2) if losses else 0.0,
+        "profit_factor": round(gross_profit / gross_loss, 3) if gross_loss > 0 else None,
+        "sharpe": round(sharpe, 3),
+        "sortino": round(sortino, 3),
+        "max_drawdown": round(float(-drawdown.min()), 2),
+        "max_drawdown_trades": dd_trades,
+        "max_drawdown_seconds": dd_seconds,
+        **streaks(profits),
+    }
+
+
+def breakdown(log, by="strategy_mode", initial_equity=0.0):
+    """Metrics per group, where `by` is strategy_mode, zone_type or pattern."""
+    keys = np.asarray(log[by], dtype=object)
+    if len(keys) == 0:
+        return {}
+    groups, inverse = np.unique(keys.astype(str), return_inverse=True)
+    times = log.get("time")
+    result = {}
+    for g, name in enumerate(groups):
+        mask = inverse == g
+        result[str(name)] = compute_metrics(
+            log["profit"][mask],
+            times[mask] if times is not None else None,
+            initial_equity
+        )
+    return result
+
+
+def journal_metrics(path=JOURNAL_PATH, initial_equity=0.0):
+    """Batch metrics straight from the CSV journal."""
+    log = load_journal(path)
+    return compute_metrics(log["profit"], log["time"], initial_equity)
+
+
+class TradeAnalytics:
+    """
+    Incremental trade log. `add()` is O(1) and keeps running equity, peak,
+    drawdown and streak counters; full metrics are computed on demand.
+    """
+
+    def __init__(self, initial_equity=0.0, capacity=1024):
+        self.initial_equity = initial_equity
+        self._n = 0
+        self._profit = np.zeros(capacity)
+        self._time = np.full(capacity, np.datetime64("NaT"), dtype="datetime64[s]")
+        self._keys = {key: np.empty(capacity, dtype=object) for key in BREAKDOWN_COLUMNS}
+
+        self.equity = initial_equity
+        self.peak_equity = initial_equity
+        self.max_drawdown = 0.0
+        self.current_streak = 0
+
+    def _grow(self):
+        capacity = len(self._profit) * 2
+        self._profit = np.resize(self._profit, capacity)
+        time = np.full(capacity, np.datetime64("NaT"), dtype="datetime64[s]")
+        time[:self._n] = self._time[:self._n]
+        self._time = time
+        for key, arr in self._keys.items():
+            grown = np.empty(capacity, dtype=object)
+            grown[:self._n] = arr[:self._n]
+            self._keys[key] = grown
+
+    def add(self, profit, time=None, strategy_mode=None, zone_type=None, pattern=None):
+        if self._n == len(self._profit):
+            self._grow()
+        i = self._n
+        self._profit[i] = profit
+        if time is not None:
+            self._time[i] = np.datetime64(time, "s")
+        self._keys["strategy_mode"][i] = strategy_mode or "-"
+        self._keys["zone_type"][i] = zone_type or "-"
+        self._keys["pattern"][i] = pattern or "-"
+        self._n += 1
+
+        self.equity += profit
+        if self.equity > self.peak_equity:
+            self.peak_equity = self.equity
+        self.max_drawdown = max(self.max_drawdown, self.peak_equity - self.equity)
+        if profit > 0:
+            self.current_streak = self.current_streak + 1 if self.current_streak > 0 else 1
+        else:
+            self.current_streak = self.current_streak - 1 if self.current_streak < 0 else -1
+
+    def extend(self, log):
+        """Append a batch of trades in the `load_journal()` column format."""
+        profits = np.asarray(log["profit"], dtype=float)
+        n = len(profits)
+        while self._n + n > len(self._profit):
+            self._grow()
+        sl = slice(self._n, self._n + n)
+        self._profit[sl] = profits
+        if log.get("time") is not None:
+            self._time[sl] = np.asarray(log["time"], dtype="datetime64[s]")
+        for key in BREAKDOWN_COLUMNS:
+            if key in log:
+                self._keys[key][sl] = log[key]
+            else:
+                self._keys[key][sl] = "-"
+        start_equity = self.equity
+        self._n += n
+
+        if n:
+            equity = start_equity + np.cumsum(profits)
+            peak = np.maximum.accumulate(np.r_[self.peak_equity, equity])[1:]
+            self.max_drawdown = max(self.max_drawdown, float((peak - equity).max()))
+            self.peak_equity = float(peak[-1])
+            self.equity = float(equity[-1])
+            self.current_streak = streaks(self._profit[:self._n])["current_streak"]
+
+    def as_log(self):
+        log = {"profit": self._profit[:self._n], "time": self._time[:self._n]}
+        for key, arr in self._keys.items():
+            log[key] = arr[:self._n]
+        return log
+
+    def summary(self):
+        return compute_metrics(self._profit[:self._n], self._time[:self._n], self.initial_equity)
+
+    def breakdown(self, by="strategy_mode"):
+        return breakdown(self.as_log(), by, self.initial_equity)
+
+    def drawdown_curve(self):
+        return drawdown_curve(self._profit[:self._n], self.initial_equity)
@@ -4,6 +4,7 @@ import csv
 import os
 from datetime import datetime, date
 from telegram_notifier import send_telegram_message  # Required for send_daily_summary
+from performance_analytics import compute_metrics, journal_from_rows
 
 # CSV file path for trade journal
 file_path = "trade_journal.csv"
@@ -74,8 +75,30 @@ def log_trade(entry_time, exit_time, side, entry_price, exit_price, profit, outc
     print(f"[Log] Trade saved: {side} | Entry: {entry_price} | Exit: {exit_price} | Profit: {profit}")
 
 
+_stats_cache = (None, None)  # (journal version, stats)
+
+
+def journal_version():
+    """(mtime_ns, size) of the journal, which changes whenever a trade is logged; None without a journal."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
 def get_live_stats():
-    """Return a live summary of performance."""
+    """Return a live summary of performance, recomputed only when the journal has changed."""
+    global _stats_cache
+    version = journal_version()
+    cached_version, stats = _stats_cache
+    if stats is None or cached_version != version:
+        stats = _compute_live_stats()
+        _stats_cache = (version, stats)
+    return stats
+
+
+def _compute_live_stats():
     if not os.path.isfile(file_path):
         return {
             "total_trades": 0,
@@ -84,7 +107,8 @@ def get_live_stats():
             "win_rate": 0.0,
             "total_profit": 0.0,
             "last_trade": None,
-            "recent_trades": []
+            "recent_trades": [],
+            "analytics": compute_metrics([])
         }
 
     with open(file_path, mode='r') as file:
@@ -97,6 +121,7 @@ def get_live_stats():
     total_profit = sum(float(t["Profit"]) for t in trades if t.get("Profit") not in ["", "-", None])
     win_rate = (wins / total_trades * 100) if total_trades > 0 else 0.0
     last_trade = trades[-1] if trades else None
+    log = journal_from_rows(trades)
 
     return {
         "total_trades": total_trades,
@@ -105,7 +130,8 @@ def get_live_stats():
         "win_rate": round(win_rate, 2),
         "total_profit": round(total_profit, 2),
         "last_trade": sanitize_trade_dict(last_trade) if last_trade else None,
-        "recent_trades": [sanitize_trade_dict(t) for t in trades[-10:]] if trades else []
+        "recent_trades": [sanitize_trade_dict(t) for t in trades[-10:]] if trades else [],
+        "analytics": compute_metrics(log["profit"], log["time"])
     }
 
 
@@ -136,4 +162,4 @@ def send_daily_summary():
         f"💰 Net Profit: ${profit:.2f}"
     )
 
-    send_telegram_message(msg)
+    send_telegram_message(msg, priority="high")
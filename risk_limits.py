@@ -0,0 +1,7 @@
+# === risk_limits.py (Configurable Risk Limits) ===
+#
+# Plain constants with no MT5 import, so offline tools (monte_carlo) can read
+# the same limits emergency_control enforces on machines without MetaTrader5.
+
+MAX_DAILY_LOSS = -100     # Adjusted: loss allowed before bot stops (realized)
+MAX_DRAWDOWN = -200       # Drawdown from peak equity (floating or closed)
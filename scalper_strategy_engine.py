@@ -1,28 +1,37 @@
 # === scalper_strategy_engine.py ===
 # (Enhanced with rate limiting and message consolidation)
+#
+# Each traded symbol is a StrategyInstance carrying its own config and state.
+# The module-level functions below drive the default VIX75 instance, so
+# single-symbol callers keep working unchanged.
 
-import MetaTrader5 as mt5
+from mt5_gateway import mt5
+import json
 import pandas as pd
 from datetime import datetime, timedelta
 from candlestick_patterns import detect_patterns
-from zone_detector import detect_zones
+from zone_detector import detect_zones, format_zones, select_zones
 from trade_decision_engine import trade_decision_engine
 from telegram_notifier import send_telegram_message, flush_message_queue
 from trade_executor import place_order, trail_sl
 from performance_tracker import log_trade
 from zone_detector import scan_zones
 from breaker_block_detector import detect_breaker_block
+from bar_cache import bar_cache
+from event_bus import (
+    publish, request_dispatch, PatternsDetected, Skip, PriceUpdate,
+    SIDEWAYS, RECENT_PATTERN_TRADE, NO_PATTERNS, ACTIVE_TRADE, TREND_CONFLICT
+)
 import os
 from trend_filter import get_trend
+from stage_timing import span
+from latency_trace import mark_tick, mark_signal
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # === Zone refresh settings ===
 ZONE_REFRESH_INTERVAL = 300  # 5 minutes
-_last_zone_scan = None
-_last_demand_zones = []
-_last_supply_zones = []
 
 # --- Configuration
 SYMBOL = "Volatility 75 Index"
@@ -30,10 +39,10 @@ TIMEFRAME_ZONE = mt5.TIMEFRAME_H1
 TIMEFRAME_ENTRY = mt5.TIMEFRAME_M1
 TIMEFRAME_PATTERN = mt5.TIMEFRAME_M5
 ZONE_LOOKBACK = 500
-SL_BUFFER = 75000 
+SL_BUFFER = 75000
 TP_RATIO = 1.2
 MAGIC = 77775
-CHECK_RANGE = 100000 
+CHECK_RANGE = 100000
 FAST_ZONE_STRENGTH_THRESHOLD = 40
 ZONE_STRENGTH_THRESHOLD = int(os.getenv("ZONE_STRENGTH_THRESHOLD", "30"))
 ATR_THRESHOLD_FACTOR = float(os.getenv("ATR_THRESHOLD_FACTOR", "0.8"))
@@ -46,120 +55,53 @@ MIN_PATTERN_STRENGTH = 60
 AUTO_SWITCH_ENABLED = os.getenv("AUTO_SWITCH_ENABLED", "False").lower() == "true"
 MANUAL_OVERRIDE = os.getenv("MANUAL_OVERRIDE", "False").lower() == "true"
 ALLOWED_HOURS = [(8, 10), (15, 17), (20, 0)]
-
-# --- State
-active_trades = {}
-zone_touch_counts = {}
-_last_demand_zones = []
-_last_supply_zones = []
-_last_zone_alert_time = None
-_last_switch_time = None
-_last_status = None
-_current_mode = None
-_last_pattern_trade_time = None
-_last_pattern_scan_time = None
-_last_manual_override_alert = None
-_last_zone_summary = None
-_last_price_update = None
 PRICE_UPDATE_THRESHOLD = 500  # Only send price updates if price changes by this much
 
-def init_globals():
-    global active_trades, zone_touch_counts, _last_demand_zones, _last_supply_zones
-    global _last_zone_alert_time, _last_switch_time, _last_status, _current_mode
-    global _last_pattern_trade_time, _last_pattern_scan_time, _last_zone_scan
-    global _last_price_update
-    
-    active_trades = {}
-    zone_touch_counts = {}
-    _last_demand_zones = []
-    _last_supply_zones = []
-    _last_zone_alert_time = None
-    _last_switch_time = None
-    _last_status = None
-    _current_mode = None
-    _last_pattern_trade_time = None
-    _last_pattern_scan_time = None
-    _last_zone_scan = None
-    _last_price_update = None
-
-init_globals()
-
-def clean_stale_trades():
-    """Removes trades from active_trades if they are no longer open in MT5"""
-    open_positions = mt5.positions_get(symbol=SYMBOL)
-    open_sides = {p.type for p in open_positions} if open_positions else set()
-    
-    stale_keys = []
-    for key in list(active_trades.keys()):
-        side = key[0]  # "buy" or "sell"
-        mt5_side = 0 if side == "buy" else 1
-        if mt5_side not in open_sides:
-            stale_keys.append(key)
-
-    for k in stale_keys:
-        del active_trades[k]
-        send_telegram_message(f"🧹 Cleaned ghost trade: {k[0].upper()} position removed from memory", priority="low")
-
-def send_zone_summary(demand_stats, supply_stats):
-    global _last_zone_summary
-    current_summary = (demand_stats['accepted'], demand_stats['rejected'], 
-                       supply_stats['accepted'], supply_stats['rejected'], 
-                       max(demand_stats['max'], supply_stats['max']))
-    
-    if current_summary == _last_zone_summary:
-        return  # No change, skip
-    _last_zone_summary = current_summary
-    
-    summary = (
-        f"📊 Zone Scan Summary:\n"
-        f"🟢 Demand Zones → Found: {demand_stats['accepted']} | Rejected: {demand_stats['rejected']}\n"
-        f"🔴 Supply Zones → Found: {supply_stats['accepted']} | Rejected: {supply_stats['rejected']}\n"
-        f"🏆 Max Strength: {max(demand_stats['max'], supply_stats['max']):.0f}%"
-    )
-    send_telegram_message(summary, priority="normal")
+# Per-instance settings; SYMBOLS_FILE entries may override any of these
+DEFAULT_CONFIG = {
+    "symbol": SYMBOL,
+    "magic": MAGIC,
+    "label": None,           # prefix for Telegram messages when trading several symbols
+    "lot": None,             # overrides the lot size passed to monitor_and_trade
+    "zone_lookback": ZONE_LOOKBACK,
+    "sl_buffer": SL_BUFFER,
+    "tp_ratio": TP_RATIO,
+    "check_range": CHECK_RANGE,
+    "fast_zone_strength_threshold": FAST_ZONE_STRENGTH_THRESHOLD,
+    "pattern_scalp_enabled": PATTERN_SCALP_ENABLED,
+    "pattern_cooldown": PATTERN_COOLDOWN,
+    "auto_switch_enabled": AUTO_SWITCH_ENABLED,
+    "manual_override": MANUAL_OVERRIDE,
+    "allowed_hours": ALLOWED_HOURS,
+    "price_update_threshold": PRICE_UPDATE_THRESHOLD,
+    "zone_refresh_interval": ZONE_REFRESH_INTERVAL,
+}
+
+# Comma-separated symbols to trade (magic numbers count up from MAGIC), or a JSON
+# file with a list of DEFAULT_CONFIG-style overrides per symbol
+SYMBOLS = [s.strip() for s in os.getenv("SYMBOLS", SYMBOL).split(",") if s.strip()]
+SYMBOLS_FILE = os.getenv("SYMBOLS_FILE")
+
 
 def get_data(symbol, timeframe, bars):
-    rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, bars)
+    rates = bar_cache.rates(symbol, timeframe, bars)
     if rates is None or len(rates) == 0:
         print(f"[❌ ERROR] Failed to retrieve data for {symbol} on {timeframe}")
         return pd.DataFrame()
-    
+
     df = pd.DataFrame(rates)
     if 'time' not in df.columns:
         print(f"[❌ ERROR] No time column in data for {symbol}")
         return pd.DataFrame()
-    
+
     try:
         df['time'] = pd.to_datetime(df['time'], unit='s')
         df['timestamp'] = df['time']
     except Exception as e:
         print(f"[❌ ERROR] Time conversion failed: {str(e)}")
         return pd.DataFrame()
-    
-    return df
-
-def is_within_trading_hours():
-    now = datetime.now()
-    current_hour = now.hour
-    for start, end in ALLOWED_HOURS:
-        if start < end:
-            if start <= current_hour < end:
-                return True
-        else:
-            if current_hour >= start or current_hour < end:
-                return True
-    return False
 
-def notify_strategy_change(mode):
-    global _current_mode
-    if mode != _current_mode:
-        _current_mode = mode
-        msg = (
-            "📢 Mode Change: Trend-Follow (Safe)\n✅ Focused on strong zones only. Slower but higher quality signals."
-            if mode == "trend_follow"
-            else "⚡ Mode Change: Aggressive Scalper (Beast)\n🔥 Bot will now react faster to momentum zones and candlestick patterns."
-        )
-        send_telegram_message(msg, priority="high")
+    return df
 
 def calculate_trend(df):
     df['SMA50'] = df['close'].rolling(50).mean()
@@ -175,37 +117,19 @@ def calculate_trend(df):
         return "downtrend", atr
     return "sideways", atr
 
-def determine_combined_trend():
-    h1_df = get_data(SYMBOL, mt5.TIMEFRAME_H1, 150)
-    h4_df = get_data(SYMBOL, mt5.TIMEFRAME_H4, 150)
-    h1_trend, h1_atr = calculate_trend(h1_df)
-    h4_trend, _ = calculate_trend(h4_df)
-    dynamic_threshold = h1_df['ATR14'].rolling(20).mean().iloc[-1] if 'ATR14' in h1_df else 200
-    adjusted_threshold = ATR_THRESHOLD_FACTOR * dynamic_threshold
-    trend = h1_trend if h1_trend == h4_trend and h1_trend != "sideways" else "sideways"
-    return trend, h1_atr, adjusted_threshold
-
 def zones_equal(z1, z2):
     return len(z1) == len(z2) and all(
         abs(a['price'] - b['price']) < 1e-5 and a['time'] == b['time'] for a, b in zip(z1, z2)
     )
 
-def should_switch_mode(current_time):
-    global _last_switch_time
-    cooldown = 1800  # 30 minutes
-    if _last_switch_time is None or (current_time - _last_switch_time).total_seconds() > cooldown:
-        _last_switch_time = current_time
-        return True
-    return False
-
 def scan_for_patterns(symbol, timeframe, bars=5):
     """Enhanced pattern scanning using multiple timeframes"""
     df = get_data(symbol, timeframe, bars)
     if len(df) < 2:
         return None
-    
+
     patterns = detect_patterns(df)
-    
+
     if patterns:
         candle = df.iloc[-1]
         return {
@@ -216,339 +140,475 @@ def scan_for_patterns(symbol, timeframe, bars=5):
         }
     return None
 
-def execute_pattern_trade(pattern_data, strategy_mode, trend):
-    """Execute trades based on detected patterns"""
-    global _last_pattern_trade_time, active_trades
-    
-    patterns = pattern_data['patterns']
-    candle = pattern_data['candle']
-    prev_candle = pattern_data['prev_candle']
-    point = mt5.symbol_info(SYMBOL).point
-    tick = mt5.symbol_info_tick(SYMBOL)
-    
-    if not tick:
-        return False
-    
-    # Get symbol info for spread
-    symbol_info = mt5.symbol_info(SYMBOL)
-    spread = symbol_info.spread * point if symbol_info else 0
-    
-    bullish_patterns = ['bullish_pin_bar', 'hammer', 'bullish_engulfing', 'bullish_marubozu', 'hammer_bullish']
-    bearish_patterns = ['bearish_pin_bar', 'shooting_star', 'bearish_engulfing', 'bearish_marubozu', 'shooting_star_bearish']
-    
-    entry_price = tick.ask if any(p in patterns for p in bullish_patterns) else tick.bid
-    
-    # Calculate buffer based on spread
-    buffer = max(SL_BUFFER * point, spread * 2)
-    
-    if any(p in patterns for p in bullish_patterns):
-        sl = candle.low - buffer
-        tp = entry_price + (entry_price - sl) * TP_RATIO
-        side = "buy"
-    elif any(p in patterns for p in bearish_patterns):
-        sl = candle.high + buffer
-        tp = entry_price - (sl - entry_price) * TP_RATIO
-        side = "sell"
-    else:
+
+class StrategyInstance:
+    """One traded symbol: its config plus all the state the strategy keeps between cycles."""
+
+    # Persisted across restarts by state_snapshot
+    STATE_FIELDS = (
+        "active_trades", "zone_touch_counts", "last_demand_zones", "last_supply_zones",
+        "last_zone_alert_time", "last_switch_time", "last_status", "current_mode",
+        "last_pattern_trade_time", "last_pattern_scan_time", "last_manual_override_alert",
+        "last_zone_summary", "last_price_update", "last_zone_scan",
+    )
+
+    def __init__(self, **overrides):
+        unknown = set(overrides) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown strategy settings: {', '.join(sorted(unknown))}")
+        for key, value in {**DEFAULT_CONFIG, **overrides}.items():
+            setattr(self, key, value)
+        self.prefix = f"[{self.label}] " if self.label else ""
+        self.init_state()
+
+    def __repr__(self):
+        return f"StrategyInstance({self.symbol!r}, magic={self.magic})"
+
+    def init_state(self):
+        self.active_trades = {}
+        self.zone_touch_counts = {}
+        self.last_demand_zones = []
+        self.last_supply_zones = []
+        self.last_zone_alert_time = None
+        self.last_switch_time = None
+        self.last_status = None
+        self.current_mode = None
+        self.last_pattern_trade_time = None
+        self.last_pattern_scan_time = None
+        self.last_manual_override_alert = None
+        self.last_zone_summary = None
+        self.last_price_update = None
+        self.last_zone_scan = None
+        self.decisions = 0  # cycles that reached the decision engine (not persisted)
+
+    def state_dict(self):
+        return {field: getattr(self, field) for field in self.STATE_FIELDS}
+
+    def load_state(self, state):
+        for field in self.STATE_FIELDS:
+            if field in state:
+                setattr(self, field, state[field])
+
+    def notify(self, message, priority="normal"):
+        send_telegram_message(self.prefix + message, priority=priority)
+
+    def clean_stale_trades(self):
+        """Removes trades from active_trades if they are no longer open in MT5"""
+        open_positions = bar_cache.positions(self.symbol)
+        open_sides = {p.type for p in open_positions} if open_positions else set()
+
+        stale_keys = []
+        for key in list(self.active_trades.keys()):
+            side = key[0]  # "buy" or "sell"
+            mt5_side = 0 if side == "buy" else 1
+            if mt5_side not in open_sides:
+                stale_keys.append(key)
+
+        for k in stale_keys:
+            del self.active_trades[k]
+            self.notify(f"🧹 Cleaned ghost trade: {k[0].upper()} position removed from memory", priority="low")
+
+    def send_zone_summary(self, demand_stats, supply_stats):
+        current_summary = (demand_stats['accepted'], demand_stats['rejected'],
+                           supply_stats['accepted'], supply_stats['rejected'],
+                           max(demand_stats['max'], supply_stats['max']))
+
+        if current_summary == self.last_zone_summary:
+            return  # No change, skip
+        self.last_zone_summary = current_summary
+
+        summary = (
+            f"📊 Zone Scan Summary:\n"
+            f"🟢 Demand Zones → Found: {demand_stats['accepted']} | Rejected: {demand_stats['rejected']}\n"
+            f"🔴 Supply Zones → Found: {supply_stats['accepted']} | Rejected: {supply_stats['rejected']}\n"
+            f"🏆 Max Strength: {max(demand_stats['max'], supply_stats['max']):.0f}%"
+        )
+        self.notify(summary, priority="normal")
+
+    def is_within_trading_hours(self):
+        now = datetime.now()
+        current_hour = now.hour
+        for start, end in self.allowed_hours:
+            if start < end:
+                if start <= current_hour < end:
+                    return True
+            else:
+                if current_hour >= start or current_hour < end:
+                    return True
         return False
-    
-    if active_trades.get(side):
-        send_telegram_message(f"⏳ Skipping {side.upper()} pattern trade - active trade exists", priority="low")
+
+    def notify_strategy_change(self, mode):
+        if mode != self.current_mode:
+            self.current_mode = mode
+            msg = (
+                "📢 Mode Change: Trend-Follow (Safe)\n✅ Focused on strong zones only. Slower but higher quality signals."
+                if mode == "trend_follow"
+                else "⚡ Mode Change: Aggressive Scalper (Beast)\n🔥 Bot will now react faster to momentum zones and candlestick patterns."
+            )
+            self.notify(msg, priority="high")
+
+    def determine_combined_trend(self):
+        h1_df = get_data(self.symbol, mt5.TIMEFRAME_H1, 150)
+        h4_df = get_data(self.symbol, mt5.TIMEFRAME_H4, 150)
+        h1_trend, h1_atr = calculate_trend(h1_df)
+        h4_trend, _ = calculate_trend(h4_df)
+        dynamic_threshold = h1_df['ATR14'].rolling(20).mean().iloc[-1] if 'ATR14' in h1_df else 200
+        adjusted_threshold = ATR_THRESHOLD_FACTOR * dynamic_threshold
+        trend = h1_trend if h1_trend == h4_trend and h1_trend != "sideways" else "sideways"
+        return trend, h1_atr, adjusted_threshold
+
+    def should_switch_mode(self, current_time):
+        cooldown = 1800  # 30 minutes
+        if self.last_switch_time is None or (current_time - self.last_switch_time).total_seconds() > cooldown:
+            self.last_switch_time = current_time
+            return True
         return False
-    
-    if (trend == "uptrend" and side == "sell") or (trend == "downtrend" and side == "buy"):
-        send_telegram_message(f"⛔ Pattern trade blocked due to trend conflict ({trend})", priority="low")
+
+    def execute_pattern_trade(self, pattern_data, strategy_mode, trend):
+        """Execute trades based on detected patterns"""
+        patterns = pattern_data['patterns']
+        candle = pattern_data['candle']
+        prev_candle = pattern_data['prev_candle']
+        point = mt5.symbol_info(self.symbol).point
+        tick = mt5.symbol_info_tick(self.symbol)
+
+        if not tick:
+            return False
+
+        # Get symbol info for spread
+        symbol_info = mt5.symbol_info(self.symbol)
+        spread = symbol_info.spread * point if symbol_info else 0
+
+        bullish_patterns = ['bullish_pin_bar', 'hammer', 'bullish_engulfing', 'bullish_marubozu', 'hammer_bullish']
+        bearish_patterns = ['bearish_pin_bar', 'shooting_star', 'bearish_engulfing', 'bearish_marubozu', 'shooting_star_bearish']
+
+        entry_price = tick.ask if any(p in patterns for p in bullish_patterns) else tick.bid
+
+        # Calculate buffer based on spread
+        buffer = max(self.sl_buffer * point, spread * 2)
+
+        if any(p in patterns for p in bullish_patterns):
+            sl = candle.low - buffer
+            tp = entry_price + (entry_price - sl) * self.tp_ratio
+            side = "buy"
+        elif any(p in patterns for p in bearish_patterns):
+            sl = candle.high + buffer
+            tp = entry_price - (sl - entry_price) * self.tp_ratio
+            side = "sell"
+        else:
+            return False
+
+        if self.active_trades.get(side):
+            publish(Skip(self.symbol, ACTIVE_TRADE, None, None, side))
+            return False
+
+        if (trend == "uptrend" and side == "sell") or (trend == "downtrend" and side == "buy"):
+            publish(Skip(self.symbol, TREND_CONFLICT, None, None, trend))
+            return False
+
+        lot_size = self.lot or 0.001
+        mark_signal(entry_price, "pattern_scan")
+        result = place_order(self.symbol, side, lot_size, sl, tp, self.magic)
+
+        if result and result.retcode == mt5.TRADE_RETCODE_DONE:
+            self.last_pattern_trade_time = datetime.now()
+            self.active_trades[(side, 'pattern')] = {
+                "entry": entry_price,
+                "sl": sl,
+                "tp": tp,
+                "zone_type": "pattern",
+                "strategy_mode": strategy_mode,
+                "entry_time": datetime.now(),
+                "patterns": patterns
+            }
+            return True
+        # Order outcome (success or broker error) is published by place_order
         return False
-    
-    lot_size = 0.001
-    result = place_order(SYMBOL, side, lot_size, sl, tp, MAGIC)
-    
-    if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-        _last_pattern_trade_time = datetime.now()
-        active_trades[(side, 'pattern')] = {
-            "entry": entry_price,
-            "sl": sl,
-            "tp": tp,
-            "zone_type": "pattern",
-            "strategy_mode": strategy_mode,
-            "entry_time": datetime.now(),
-            "patterns": patterns
-        }
-        send_telegram_message(
-            f"⚡ PATTERN TRADE ({', '.join(patterns)})\n"
-            f"Direction: {side.upper()} | Entry: {entry_price:.2f}\n"
-            f"SL: {sl:.2f} | TP: {tp:.2f} | Spread: {spread/point:.0f}pts",
-            priority="high"
-        )
-        return True
-    else:
-        error_msg = getattr(result, 'retcode', 'N/A')
-        if hasattr(result, 'retcode'):
-            error_msg = f"{result.retcode} - {mt5.return_string(result.retcode)}"
-        send_telegram_message(f"❌ Pattern trade failed. Error: {error_msg}", priority="high")
+
+    def should_update_price(self, current_price):
+        if self.last_price_update is None:
+            self.last_price_update = current_price
+            return True
+        if abs(current_price - self.last_price_update) >= self.price_update_threshold:
+            self.last_price_update = current_price
+            return True
         return False
 
-def should_update_price(current_price):
-    global _last_price_update
-    if _last_price_update is None:
-        _last_price_update = current_price
-        return True
-    if abs(current_price - _last_price_update) >= PRICE_UPDATE_THRESHOLD:
-        _last_price_update = current_price
-        return True
-    return False
+    def refresh_zones(self, force=False):
+        """Rescan H1 zones when the cached scan is older than zone_refresh_interval (or when forced)"""
+        now = datetime.now()
+        if not force and self.last_zone_scan is not None and (now - self.last_zone_scan).total_seconds() <= self.zone_refresh_interval:
+            return False
 
-def monitor_and_trade(strategy_mode="trend_follow", fixed_lot=None):
-    global _last_zone_scan, _last_demand_zones, _last_supply_zones
-    global _last_manual_override_alert, _last_pattern_trade_time
-    global _last_zone_alert_time, _last_status, _last_pattern_scan_time
-    global _last_price_update
-    
-    now = datetime.now()
-    clean_stale_trades()
-    
-    # Refresh zones every 5 minutes
-    if _last_zone_scan is None or (now - _last_zone_scan).total_seconds() > ZONE_REFRESH_INTERVAL:
-        demand_zones, supply_zones = scan_zones(get_data, SYMBOL, TIMEFRAME_ZONE, ZONE_LOOKBACK)
+        demand_zones, supply_zones = scan_zones(get_data, self.symbol, TIMEFRAME_ZONE, self.zone_lookback)
         if not demand_zones and not supply_zones:
-            print("[⚠️ WARNING] Zone scanning returned empty results")
-        _last_zone_scan = now
-        _last_demand_zones = demand_zones
-        _last_supply_zones = supply_zones
-    
-    m1_df = get_data(SYMBOL, TIMEFRAME_ENTRY, 5)
-    if m1_df.empty or 'time' not in m1_df.columns:
-        print("[❌ ERROR] Failed to get valid M1 data")
-        return
-
-    if strategy_mode == "trend_follow" and not is_within_trading_hours():
-        if _last_status != "sleep":
-            send_telegram_message(
-                "🛌 Trend-Follow sleeping. ⏰ Best hours: 08–10, 15–17, 20–00\n"
-                "⚡ Aggressive Scalper is still active 24/7 for momentum trades.",
-                priority="normal"
-            )
-            _last_status = "sleep"
-        return
-    elif _last_status != "awake":
-        send_telegram_message("🔔 Bot Active: Monitoring zones and patterns for trade setups. 📊", priority="normal")
-        _last_status = "awake"
-
-    h1_df = get_data(SYMBOL, TIMEFRAME_ZONE, ZONE_LOOKBACK)
-    if h1_df.empty:
-        return
-
-    demand_raw, demand_stats = detect_zones(h1_df, zone_type='demand')
-    supply_raw, supply_stats = detect_zones(h1_df, zone_type='supply')
-
-    all_demand_zones = []
-    all_supply_zones = []
-
-    for z in demand_raw:
-        price = (z['zone_low'] + z['zone_high']) / 2
-        formatted = {
-            'price': price,
-            'type': "strict_demand",
-            'time': z['timestamp'],
-            'strength': z['strength'],
-            'zone_low': z['zone_low'],
-            'zone_high': z['zone_high']
-        }
-        all_demand_zones.append(formatted)
-
-    for z in supply_raw:
-        price = (z['zone_low'] + z['zone_high']) / 2
-        formatted = {
-            'price': price,
-            'type': "strict_supply",
-            'time': z['timestamp'],
-            'strength': z['strength'],
-            'zone_low': z['zone_low'],
-            'zone_high': z['zone_high']
-        }
-        all_supply_zones.append(formatted)
+            print(f"[⚠️ WARNING] Zone scanning returned empty results for {self.symbol}")
+        self.last_zone_scan = now
+        self.last_demand_zones = demand_zones
+        self.last_supply_zones = supply_zones
+        return True
 
-    send_zone_summary(demand_stats, supply_stats)
+    def trail(self):
+        trail_sl(self.symbol, self.magic)
+
+    def monitor_and_trade(self, strategy_mode="trend_follow", fixed_lot=None):
+        symbol = self.symbol
+        fixed_lot = self.lot or fixed_lot
+        now = datetime.now()
+        self.clean_stale_trades()
+        with span("zone_scan"):
+            self.refresh_zones()
+
+        with span("m1_fetch"):
+            m1_df = get_data(symbol, TIMEFRAME_ENTRY, 5)
+        if m1_df.empty or 'time' not in m1_df.columns:
+            print(f"[❌ ERROR] Failed to get valid M1 data for {symbol}")
+            return
+
+        if strategy_mode == "trend_follow" and not self.is_within_trading_hours():
+            if self.last_status != "sleep":
+                self.notify(
+                    "🛌 Trend-Follow sleeping. ⏰ Best hours: 08–10, 15–17, 20–00\n"
+                    "⚡ Aggressive Scalper is still active 24/7 for momentum trades.",
+                    priority="normal"
+                )
+                self.last_status = "sleep"
+            return
+        elif self.last_status != "awake":
+            self.notify("🔔 Bot Active: Monitoring zones and patterns for trade setups. 📊", priority="normal")
+            self.last_status = "awake"
+
+        with span("h1_fetch"):
+            h1_df = get_data(symbol, TIMEFRAME_ZONE, self.zone_lookback)
+        if h1_df.empty:
+            return
+
+        with span("detect_zones"):
+            demand_raw, demand_stats = detect_zones(h1_df, zone_type='demand')
+            supply_raw, supply_stats = detect_zones(h1_df, zone_type='supply')
+
+        all_demand_zones = format_zones(demand_raw, 'demand')
+        all_supply_zones = format_zones(supply_raw, 'supply')
+
+        self.send_zone_summary(demand_stats, supply_stats)
+
+        demand_zones, supply_zones = select_zones(
+            all_demand_zones, all_supply_zones, strategy_mode, self.fast_zone_strength_threshold
+        )
 
-    if strategy_mode == "aggressive":
-        demand_zones = [z for z in all_demand_zones if z['strength'] >= FAST_ZONE_STRENGTH_THRESHOLD][:3]
-        supply_zones = [z for z in all_supply_zones if z['strength'] >= FAST_ZONE_STRENGTH_THRESHOLD][:3]
-    else:
-        demand_zones = all_demand_zones[:2]
-        supply_zones = all_supply_zones[:2]
-
-    current_h1_time = h1_df['time'].iloc[-1]
-    if (not zones_equal(demand_zones, _last_demand_zones) or not zones_equal(supply_zones, _last_supply_zones)) and _last_zone_alert_time != current_h1_time:
-        _last_zone_alert_time = current_h1_time
-        _last_demand_zones = demand_zones
-        _last_supply_zones = supply_zones
-
-        msg = ["📈 Zone Update: Fresh Levels Detected"]
-        msg.append("\n🟢 Demand Zones:")
-        msg.extend([
-            f"• {z['price']:.2f} | Strength: {z['strength']}% | Type: {z['type']} | ⏰ {z['time'].strftime('%H:%M')}"
-            for z in demand_zones
-        ] or ["⚠️ No demand zones found."])
-        msg.append("\n\n🔴 Supply Zones:")
-        msg.extend([
-            f"• {z['price']:.2f} | Strength: {z['strength']}% | Type: {z['type']} | ⏰ {z['time'].strftime('%H:%M')}"
-            for z in supply_zones
-        ] or ["⚠️ No supply zones found."])
-        send_telegram_message("\n".join(msg), priority="normal")
-
-    trend = get_trend(SYMBOL)
-    atr = 100000
-    atr_threshold = 100000
-    dynamic_range = max(CHECK_RANGE, int(atr * 4)) if atr else CHECK_RANGE
-
-    if MANUAL_OVERRIDE:
-        strategy_mode = _current_mode or "trend_follow"
-    if _last_manual_override_alert != strategy_mode:
-        send_telegram_message(f"📌 Manual override active: {strategy_mode}", priority="normal")
-        _last_manual_override_alert = strategy_mode
-    elif AUTO_SWITCH_ENABLED and should_switch_mode(now):
-        if atr and atr < atr_threshold * 0.95 and _current_mode != "aggressive":
-            strategy_mode = "aggressive"
-            notify_strategy_change(strategy_mode)
-        elif atr and atr > atr_threshold * 1.05 and _current_mode != "trend_follow":
-            strategy_mode = "trend_follow"
-            notify_strategy_change(strategy_mode)
+        current_h1_time = h1_df['time'].iloc[-1]
+        if ((not zones_equal(demand_zones, self.last_demand_zones) or not zones_equal(supply_zones, self.last_supply_zones))
+                and self.last_zone_alert_time != current_h1_time):
+            self.last_zone_alert_time = current_h1_time
+            self.last_demand_zones = demand_zones
+            self.last_supply_zones = supply_zones
+
+            msg = ["📈 Zone Update: Fresh Levels Detected"]
+            msg.append("\n🟢 Demand Zones:")
+            msg.extend([
+                f"• {z['price']:.2f} | Strength: {z['strength']}% | Type: {z['type']} | ⏰ {z['time'].strftime('%H:%M')}"
+                for z in demand_zones
+            ] or ["⚠️ No demand zones found."])
+            msg.append("\n\n🔴 Supply Zones:")
+            msg.extend([
+                f"• {z['price']:.2f} | Strength: {z['strength']}% | Type: {z['type']} | ⏰ {z['time'].strftime('%H:%M')}"
+                for z in supply_zones
+            ] or ["⚠️ No supply zones found."])
+            self.notify("\n".join(msg), priority="normal")
+
+        with span("trend"):
+            trend = get_trend(symbol)
+        atr = 100000
+        atr_threshold = 100000
+        dynamic_range = max(self.check_range, int(atr * 4)) if atr else self.check_range
+
+        if self.manual_override:
+            strategy_mode = self.current_mode or "trend_follow"
+        if self.last_manual_override_alert != strategy_mode:
+            self.notify(f"📌 Manual override active: {strategy_mode}", priority="normal")
+            self.last_manual_override_alert = strategy_mode
+        elif self.auto_switch_enabled and self.should_switch_mode(now):
+            if atr and atr < atr_threshold * 0.95 and self.current_mode != "aggressive":
+                strategy_mode = "aggressive"
+                self.notify_strategy_change(strategy_mode)
+            elif atr and atr > atr_threshold * 1.05 and self.current_mode != "trend_follow":
+                strategy_mode = "trend_follow"
+                self.notify_strategy_change(strategy_mode)
+            else:
+                strategy_mode = self.current_mode or "trend_follow"
         else:
-            strategy_mode = _current_mode or "trend_follow"
+            strategy_mode = self.current_mode or "trend_follow"
+
+        m1_df = get_data(symbol, TIMEFRAME_ENTRY, 5)
+        if len(m1_df) < 4:
+            return
+
+        tick = mt5.symbol_info_tick(symbol)
+        if not tick:
+            return
+        mark_tick(tick)
+
+        price = tick.bid
+        point = mt5.symbol_info(symbol).point
+
+        if self.should_update_price(price):
+            publish(PriceUpdate(symbol, price, strategy_mode))
+
+        if not demand_zones and not supply_zones and abs(price - h1_df['close'].iloc[-1]) > self.check_range:
+            zone_type = 'demand' if trend == 'uptrend' else 'supply' if trend == 'downtrend' else 'demand'
+            emergency_zone = {
+                'price': price,
+                'type': f"emergency_{zone_type}",
+                'time': datetime.now(),
+                'strength': 85,
+                'zone_low': price - 500 if zone_type == 'demand' else price - 250,
+                'zone_high': price + 250 if zone_type == 'demand' else price + 500
+            }
+
+            if zone_type == 'demand':
+                demand_zones.append(emergency_zone)
+            else:
+                supply_zones.append(emergency_zone)
+
+            self.notify(f"🚨 Emergency {zone_type.upper()} zone injected near price {price:.2f} due to drift", priority="high")
+
+        if strategy_mode == "aggressive" and self.pattern_scalp_enabled:
+            if self.last_pattern_scan_time is None or (now - self.last_pattern_scan_time).total_seconds() >= 30:
+                self.last_pattern_scan_time = now
+
+                with span("pattern_scan"):
+                    pattern_data = scan_for_patterns(symbol, TIMEFRAME_PATTERN)
+
+                if pattern_data:
+                    publish(PatternsDetected(self.symbol, "scan", tuple(pattern_data['patterns'])))
+
+                    if (self.last_pattern_trade_time is None or
+                        (now - self.last_pattern_trade_time).total_seconds() > self.pattern_cooldown):
+
+                        if trend != "sideways":
+                            self.execute_pattern_trade(pattern_data, strategy_mode, trend)
+
+        last3_candles = m1_df.iloc[-4:-1]
+        breaker_block = detect_breaker_block(last3_candles)
+
+        with span("decision_engine"):
+            signals = trade_decision_engine(
+                symbol=symbol,
+                point=point,
+                current_price=price,
+                trend=trend,
+                demand_zones=demand_zones,
+                supply_zones=supply_zones,
+                last3_candles=m1_df.iloc[-4:-1],
+                active_trades=self.active_trades,
+                zone_touch_counts=self.zone_touch_counts,
+                SL_BUFFER=self.sl_buffer,
+                TP_RATIO=self.tp_ratio,
+                CHECK_RANGE=dynamic_range,
+                LOT_SIZE=fixed_lot or 0.001,
+                MAGIC=self.magic,
+                strategy_mode=strategy_mode,
+                breaker_block=breaker_block
+            )
+        self.decisions += 1
+
+        for signal in signals:
+            mark_signal(signal['entry'], signal.get('strategy', strategy_mode))
+            with span("order_send"):
+                result = place_order(symbol, signal['side'], signal['lot'], signal['sl'], signal['tp'], self.magic, atr=atr)
+            if result and result.retcode == mt5.TRADE_RETCODE_DONE:
+                self.active_trades[(signal['side'], signal['zone'])] = {
+                    "entry": signal['entry'],
+                    "sl": signal['sl'],
+                    "tp": signal['tp'],
+                    "zone_type": signal.get('zone_type', ''),
+                    "strategy_mode": signal.get('strategy', strategy_mode),
+                    "entry_time": datetime.now()
+                }
+
+        if not signals and strategy_mode != "aggressive":
+            pattern_df = m1_df.iloc[-3:]
+            detected_patterns = detect_patterns(pattern_df)
+
+            if trend == "sideways":
+                publish(Skip(self.symbol, SIDEWAYS, None, None, None))
+            elif self.last_pattern_trade_time and (now - self.last_pattern_trade_time).total_seconds() < 300:
+                publish(Skip(self.symbol, RECENT_PATTERN_TRADE, None, None, None))
+            elif detected_patterns:
+                side = None
+                candle = m1_df.iloc[-1]
+                prev_candle = m1_df.iloc[-2]
+                entry = candle.close
+                point = mt5.symbol_info(symbol).point
+
+                if any(p in detected_patterns for p in ["bullish_pin_bar", "bullish_engulfing", "hammer_bullish"]):
+                    side = "buy"
+                    sl = candle.low - self.sl_buffer * point
+                    tp = entry + self.tp_ratio * (entry - sl)
+                elif any(p in detected_patterns for p in ["bearish_pin_bar", "bearish_engulfing", "shooting_star_bearish"]):
+                    side = "sell"
+                    sl = candle.high + self.sl_buffer * point
+                    tp = entry - self.tp_ratio * (sl - entry)
+
+                if side and not self.active_trades.get(side):
+                    publish(PatternsDetected(self.symbol, "scalp", tuple(detected_patterns)))
+                    mark_signal(entry, "pattern")
+                    with span("order_send"):
+                        result = place_order(symbol, side, fixed_lot or 0.001, sl, tp, self.magic, atr=atr)
+                    if result and result.retcode == mt5.TRADE_RETCODE_DONE:
+                        self.last_pattern_trade_time = datetime.now()
+                        self.active_trades[(side, 'pattern')] = {
+                            "entry": entry,
+                            "sl": sl,
+                            "tp": tp,
+                            "zone_type": "pattern",
+                            "strategy_mode": "pattern",
+                            "entry_time": datetime.now(),
+                            "patterns": detected_patterns
+                        }
+            else:
+                publish(Skip(self.symbol, NO_PATTERNS, None, None, None))
+
+        with span("trail_sl"):
+            self.trail()
+        request_dispatch()  # Hand this cycle's events to subscribers
+
+
+def load_instances():
+    """Build one StrategyInstance per configured symbol (SYMBOLS_FILE, else SYMBOLS)."""
+    if SYMBOLS_FILE:
+        with open(SYMBOLS_FILE, encoding="utf-8") as f:
+            entries = json.load(f)
     else:
-        strategy_mode = _current_mode or "trend_follow"
-
-    m1_df = get_data(SYMBOL, TIMEFRAME_ENTRY, 5)
-    if len(m1_df) < 4:
-        return
-
-    tick = mt5.symbol_info_tick(SYMBOL)
-    if not tick:
-        return
-
-    price = tick.bid
-    point = mt5.symbol_info(SYMBOL).point
-    
-    if should_update_price(price):
-        send_telegram_message(f"📉 Current VIX75 Price: {price:.2f} | Mode: {strategy_mode.upper()}", priority="low")
-
-    if not demand_zones and not supply_zones and abs(price - h1_df['close'].iloc[-1]) > CHECK_RANGE:
-        zone_type = 'demand' if trend == 'uptrend' else 'supply' if trend == 'downtrend' else 'demand'
-        emergency_zone = {
-            'price': price,
-            'type': f"emergency_{zone_type}",
-            'time': datetime.now(),
-            'strength': 85,
-            'zone_low': price - 500 if zone_type == 'demand' else price - 250,
-            'zone_high': price + 250 if zone_type == 'demand' else price + 500
-        }
+        entries = [{"symbol": symbol, "magic": MAGIC + i} for i, symbol in enumerate(SYMBOLS)]
+    if len(entries) > 1:
+        for entry in entries:
+            entry.setdefault("label", entry["symbol"])
+    return [StrategyInstance(**entry) for entry in entries]
 
-        if zone_type == 'demand':
-            demand_zones.append(emergency_zone)
-        else:
-            supply_zones.append(emergency_zone)
-
-        send_telegram_message(f"🚨 Emergency {zone_type.upper()} zone injected near price {price:.2f} due to drift", priority="high")
-
-    if strategy_mode == "aggressive" and PATTERN_SCALP_ENABLED:
-        if _last_pattern_scan_time is None or (now - _last_pattern_scan_time).total_seconds() >= 30:
-            _last_pattern_scan_time = now
-            
-            pattern_data = scan_for_patterns(SYMBOL, TIMEFRAME_PATTERN)
-            
-            if pattern_data:
-                send_telegram_message(f"🔍 Detected patterns: {', '.join(pattern_data['patterns'])}", priority="low")
-                
-                if (_last_pattern_trade_time is None or 
-                    (now - _last_pattern_trade_time).total_seconds() > PATTERN_COOLDOWN):
-                    
-                    if trend != "sideways":
-                        execute_pattern_trade(pattern_data, strategy_mode, trend)
-
-    last3_candles = m1_df.iloc[-4:-1]
-    breaker_block = detect_breaker_block(last3_candles)
-    
-    signals = trade_decision_engine(
-        symbol=SYMBOL,
-        point=point,
-        current_price=price,
-        trend=trend,
-        demand_zones=demand_zones,
-        supply_zones=supply_zones,
-        last3_candles=m1_df.iloc[-4:-1],
-        active_trades=active_trades,
-        zone_touch_counts=zone_touch_counts,
-        SL_BUFFER=SL_BUFFER,
-        TP_RATIO=TP_RATIO,
-        CHECK_RANGE=dynamic_range,
-        LOT_SIZE=fixed_lot or 0.001,
-        MAGIC=MAGIC,
-        strategy_mode=strategy_mode,
-        breaker_block=breaker_block
-    )
 
-    for signal in signals:
-        result = place_order(SYMBOL, signal['side'], signal['lot'], signal['sl'], signal['tp'], MAGIC, atr=atr)
-        if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-            send_telegram_message(
-                f"✅ ORDER PLACED: {signal['side'].upper()} {SYMBOL}\n"
-                f"Entry: {signal['entry']:.2f} | SL: {signal['sl']:.2f} | TP: {signal['tp']:.2f}",
-                priority="high"
-            )
-            active_trades[(signal['side'], signal['zone'])] = {
-                "entry": signal['entry'],
-                "sl": signal['sl'],
-                "tp": signal['tp'],
-                "zone_type": signal.get('zone_type', ''),
-                "strategy_mode": signal.get('strategy', strategy_mode),
-                "entry_time": datetime.now()
-            }
-        else:
-            send_telegram_message(f"❌ Order Failed. Retcode: {getattr(result, 'retcode', 'N/A')}", priority="high")
-    
-    if not signals and strategy_mode != "aggressive":
-        pattern_df = m1_df.iloc[-3:]
-        detected_patterns = detect_patterns(pattern_df)
-
-        if trend == "sideways":
-            send_telegram_message("🔕 Skipped pattern scalp — sideways trend", priority="low")
-        elif _last_pattern_trade_time and (now - _last_pattern_trade_time).total_seconds() < 300:
-            send_telegram_message("🕒 Skipped pattern scalp — last pattern trade was under 5 mins ago", priority="low")
-        elif detected_patterns:
-            side = None
-            candle = m1_df.iloc[-1]
-            prev_candle = m1_df.iloc[-2]
-            entry = candle.close
-            point = mt5.symbol_info(SYMBOL).point
-
-            if any(p in detected_patterns for p in ["bullish_pin_bar", "bullish_engulfing", "hammer_bullish"]):
-                side = "buy"
-                sl = candle.low - SL_BUFFER * point
-                tp = entry + TP_RATIO * (entry - sl)
-            elif any(p in detected_patterns for p in ["bearish_pin_bar", "bearish_engulfing", "shooting_star_bearish"]):
-                side = "sell"
-                sl = candle.high + SL_BUFFER * point
-                tp = entry - TP_RATIO * (sl - entry)
-
-            if side and not active_trades.get(side):
-                send_telegram_message(f"🧠 Enhanced Pattern Detected: {', '.join(detected_patterns)}", priority="normal")
-                result = place_order(SYMBOL, side, fixed_lot or 0.001, sl, tp, MAGIC, atr=atr)
-                if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-                    _last_pattern_trade_time = datetime.now()
-                    active_trades[(side, 'pattern')] = {
-                        "entry": entry,
-                        "sl": sl,
-                        "tp": tp,
-                        "zone_type": "pattern",
-                        "strategy_mode": "pattern",
-                        "entry_time": datetime.now(),
-                        "patterns": detected_patterns
-                    }
-                    send_telegram_message(f"✅ PATTERN ORDER PLACED: {side.upper()} | SL: {sl:.2f} | TP: {tp:.2f}", priority="high")
-                else:
-                    send_telegram_message(f"❌ Pattern scalp order failed. Retcode: {getattr(result, 'retcode', 'N/A')}", priority="high")
-        else:
-            send_telegram_message("📭 No valid reversal patterns found for scalp entry.", priority="low")
+def run_cycle(instances, strategy_mode="trend_follow", fixed_lot=None):
+    """One batched cycle: shared data is fetched once, then each symbol's strategy runs in turn."""
+    bar_cache.new_cycle()
+    for instance in instances:
+        try:
+            with span("cycle"):
+                instance.monitor_and_trade(strategy_mode=strategy_mode, fixed_lot=fixed_lot)
+        except Exception as e:
+            print(f"[⚠️ STRATEGY ERROR] {instance.symbol}: {e}")
 
-    trail_sl(SYMBOL, MAGIC)
-    flush_message_queue()  # Ensure all queued messages are sent
\ No newline at end of file
+
+# === Default (single-symbol) instance ===
+default_instance = StrategyInstance()
+
+def init_globals():
+    default_instance.init_state()
+
+def notify_strategy_change(mode):
+    default_instance.notify_strategy_change(mode)
+
+def refresh_zones(force=False):
+    return default_instance.refresh_zones(force)
+
+def monitor_and_trade(strategy_mode="trend_follow", fixed_lot=None):
+    default_instance.monitor_and_trade(strategy_mode, fixed_lot)
@@ -0,0 +1,188 @@
+# === scheduler.py (Cadence Scheduler for the Bot Loop) ===
+#
+# Jobs run on fixed intervals, optionally aligned to wall-clock boundaries
+# (e.g. every M1/H1 close), or daily at a set local time. The run loop sleeps
+# until the next due job instead of polling. AsyncScheduler runs the same jobs
+# as concurrent asyncio tasks so a slow job never delays the others.
+
+import asyncio
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class Job:
+    def __init__(self, name, func, interval=None, align=False, offset=0.0, daily_at=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.align = align
+        self.offset = offset
+        self.daily_at = daily_at  # (hour, minute) local time
+        self.next_run = None
+        self.runs = 0
+        self.errors = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.last_lateness = 0.0
+
+    def next_after(self, now):
+        """Next regular slot strictly after `now` (epoch seconds)."""
+        if self.daily_at is not None:
+            hour, minute = self.daily_at
+            current = datetime.fromtimestamp(now)
+            target = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if target.timestamp() <= now:
+                target += timedelta(days=1)
+            return target.timestamp()
+        if self.align:
+            slots = (now - self.offset) // self.interval + 1
+            return slots * self.interval + self.offset
+        return now + self.interval
+
+    def finish(self, due_at, started, finished, retry_in):
+        """Record a run and schedule the next one (a positive `retry_in` reruns sooner)."""
+        self.runs += 1
+        self.last_lateness = started - due_at
+        self.last_duration = finished - started
+        self.max_duration = max(self.max_duration, self.last_duration)
+        if isinstance(retry_in, (int, float)) and not isinstance(retry_in, bool) and retry_in > 0:
+            self.next_run = finished + retry_in
+        else:
+            self.next_run = self.next_after(finished)
+
+
+class Scheduler:
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+        self._stop = threading.Event()
+        self.jobs = {}
+
+    def _push(self, job):
+        self._seq += 1
+        heapq.heappush(self._heap, (job.next_run, self._seq, job))
+
+    def every(self, name, interval, func, align=False, offset=0.0, run_now=False):
+        """
+        Run `func` every `interval` seconds. With align=True runs land on multiples of
+        `interval` (+ offset) since the epoch, i.e. bar-close boundaries.
+        If `func` returns a number, the job reruns after that many seconds once
+        (e.g. the bar hasn't closed at the broker yet) before resuming its cadence.
+        """
+        job = Job(name, func, interval=interval, align=align, offset=offset)
+        now = time.time()
+        job.next_run = now if run_now else job.next_after(now)
+        self.jobs[name] = job
+        self._push(job)
+        return job
+
+    def daily(self, name, hour, minute, func):
+        job = Job(name, func, daily_at=(hour, minute))
+        job.next_run = job.next_after(time.time())
+        self.jobs[name] = job
+        self._push(job)
+        return job
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def run(self):
+        """Run jobs until stop() is called."""
+        while not self._stop.is_set() and self._heap:
+            due_at, _, job = self._heap[0]
+            delay = due_at - time.time()
+            if delay > 0:
+                # Sleep exactly until the next job, waking early on stop()
+                if self._stop.wait(delay):
+                    break
+                continue
+            heapq.heappop(self._heap)
+
+            started = time.time()
+            retry_in = None
+            try:
+                retry_in = job.func()
+            except Exception as e:
+                job.errors += 1
+                print(f"[⚠️ SCHEDULER] Job '{job.name}' failed: {e}")
+            job.finish(due_at, started, time.time(), retry_in)
+            self._push(job)
+
+    def stats(self):
+        return {
+            name: {
+                "runs": job.runs,
+                "errors": job.errors,
+                "last_duration_ms": round(job.last_duration * 1000, 2),
+                "max_duration_ms": round(job.max_duration * 1000, 2),
+                "last_lateness_ms": round(job.last_lateness * 1000, 2),
+                "next_run": job.next_run,
+            }
+            for name, job in self.jobs.items()
+        }
+
+
+class AsyncScheduler(Scheduler):
+    """
+    Same job API as Scheduler, but each job is its own asyncio task. Coroutine
+    functions are awaited; plain functions run in worker threads, so a long
+    strategy cycle can't hold up the risk monitor or trailing stops.
+    A job never overlaps with its own previous run.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._loop = None
+        self._wakeup = None
+
+    def stop(self):
+        """Safe to call from any thread, including from inside a job."""
+        self._stop.set()
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run_job(self, job):
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            delay = job.next_run - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                    break  # stop() was called
+                except asyncio.TimeoutError:
+                    pass
+
+            due_at = job.next_run
+            started = time.time()
+            retry_in = None
+            try:
+                if asyncio.iscoroutinefunction(job.func):
+                    retry_in = await job.func()
+                else:
+                    retry_in = await loop.run_in_executor(None, job.func)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.errors += 1
+                print(f"[⚠️ SCHEDULER] Job '{job.name}' failed: {e}")
+            job.finish(due_at, started, time.time(), retry_in)
+
+    async def run_async(self):
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if self._stop.is_set():
+            return
+        tasks = [asyncio.create_task(self._run_job(job), name=name) for name, job in self.jobs.items()]
+        await self._wakeup.wait()
+        # Jobs waiting for their next slot exit at once; in-flight thread jobs finish their current run
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def run(self):
+        """Run all jobs concurrently until stop() is called."""
+        asyncio.run(self.run_async())
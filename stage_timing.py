@@ -0,0 +1,203 @@
+# === stage_timing.py (Per-Stage Latency Histograms) ===
+#
+#     with span("h1_fetch"):
+#         h1_df = get_data(...)
+#
+# Each stage records into a fixed-bucket, log-linear (HDR-style) histogram:
+# 16 linear sub-buckets per power of two of nanoseconds, so percentiles are
+# within ~6% at any scale and recording is an index computation + increment.
+# STAGE_TIMING=False swaps span() for a shared no-op so nothing is measured.
+
+import os
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ENABLED = os.getenv("STAGE_TIMING", "True").lower() == "true"
+LOG_EVERY = int(os.getenv("STAGE_TIMING_LOG_EVERY", "60"))  # cycles between log lines (0 = never)
+
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS          # 16 linear sub-buckets per power of two
+BUCKET_COUNT = 64 * SUB_BUCKETS
+
+# Export bucket bounds (ms) for buckets()
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_perf_ns = time.perf_counter_ns
+
+
+def bucket_bounds(index):
+    """[low, high) in nanoseconds for a bucket index."""
+    if index < 2 * SUB_BUCKETS:
+        return index, index + 1
+    shift = index // SUB_BUCKETS - 1
+    low = (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+    return low, low + (1 << shift)
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "total", "sum_ns", "max_ns")
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.total = 0
+        self.sum_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        if ns < 2 * SUB_BUCKETS:
+            index = ns if ns > 0 else 0
+        else:
+            shift = ns.bit_length() - SUB_BITS - 1
+            index = (shift + 1) * SUB_BUCKETS + (ns >> shift) - SUB_BUCKETS
+        self.counts[index] += 1
+        self.total += 1
+        self.sum_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentiles(self, qs=(50, 95, 99)):
+        """Bucket-midpoint estimates in nanoseconds, keyed 'p50' etc."""
+        out = {f"p{q}": 0 for q in qs}
+        if not self.total:
+            return out
+        targets = sorted((max(1, -(-self.total * q // 100)), q) for q in qs)
+        seen = 0
+        i = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while i < len(targets) and seen >= targets[i][0]:
+                low, high = bucket_bounds(index)
+                out[f"p{targets[i][1]}"] = min((low + high) // 2, self.max_ns)
+                i += 1
+            if i == len(targets):
+                break
+        return out
+
+    def cumulative(self, bounds_ns):
+        """Counts at or below each bound (bucket resolution), for Prometheus-style `le` buckets."""
+        out = []
+        seen = 0
+        index = 0
+        for bound in bounds_ns:
+            while index < BUCKET_COUNT and bucket_bounds(index)[1] <= bound:
+                seen += self.counts[index]
+                index += 1
+            out.append(seen)
+        return out
+
+    def snapshot(self):
+        ms = {k: round(v / 1e6, 3) for k, v in self.percentiles().items()}
+        ms.update(
+            count=self.total,
+            mean=round(self.sum_ns / self.total / 1e6, 3) if self.total else 0,
+            max=round(self.max_ns / 1e6, 3),
+        )
+        return ms
+
+
+class _Span:
+    """One reusable span per stage name: a stage must not overlap itself (use distinct names per thread)."""
+    __slots__ = ("record", "start")
+
+    def __init__(self, hist):
+        self.record = hist.record
+
+    def __enter__(self):
+        self.start = _perf_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.record(_perf_ns() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_histograms = {}
+_spans = {}
+_cycles = 0
+
+
+def _histogram(name):
+    hist = _histograms.get(name)
+    if hist is None:
+        hist = _histograms.setdefault(name, LatencyHistogram())
+    return hist
+
+
+def _span(name):
+    try:
+        return _spans[name]
+    except KeyError:
+        return _spans.setdefault(name, _Span(_histogram(name)))
+
+
+def _null_span(name):
+    return _NULL_SPAN
+
+
+def record(name, ns):
+    """Record an externally measured duration (nanoseconds)."""
+    if ENABLED:
+        _histogram(name).record(ns)
+
+
+# Chosen once at import: callers bind `span` directly, so disabled timing costs one no-op call
+span = _span if ENABLED else _null_span
+
+
+def snapshot():
+    """{stage: {p50, p95, p99, mean, max (ms), count}}"""
+    return {name: hist.snapshot() for name, hist in sorted(_histograms.copy().items())}
+
+
+def reset():
+    global _cycles
+    for hist in _histograms.values():
+        hist.__init__()
+    _cycles = 0
+
+
+def buckets(name, bounds_ms=BUCKETS_MS):
+    """Cumulative bucket counts plus sum/count for one stage (all zero if it never ran)."""
+    hist = _histograms.get(name) or LatencyHistogram()
+    return {
+        "le_ms": list(bounds_ms),
+        "counts": hist.cumulative([int(b * 1e6) for b in bounds_ms]),
+        "sum_ms": round(hist.sum_ns / 1e6, 3),
+        "count": hist.total,
+    }
+
+
+def cycles():
+    return _cycles
+
+
+def format_summary(stages=None):
+    parts = []
+    for name, stats in snapshot().items():
+        if stages and name not in stages:
+            continue
+        parts.append(f"{name} {stats['p50']}/{stats['p95']}/{stats['p99']}")
+    return " | ".join(parts)
+
+
+def cycle_done():
+    """Count a strategy cycle; with timing enabled, prints a p50/p95/p99 line every LOG_EVERY cycles."""
+    global _cycles
+    _cycles += 1
+    if ENABLED and LOG_EVERY and _cycles % LOG_EVERY == 0:
+        print(f"[⏱️ TIMING] {_cycles} cycles, ms p50/p95/p99: {format_summary()}")
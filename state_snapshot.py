@@ -0,0 +1,216 @@
+# === state_snapshot.py (Warm-Start State Snapshots) ===
+#
+# Strategy state (per-symbol trades, touch counts, zones, cooldowns, mode) plus
+# pattern cooldowns and the risk session are pickled behind a small versioned
+# header. The strategy thread only serializes (~0.5 ms); a background
+# writer does the temp-file + fsync + rename so a crash never leaves a torn
+# snapshot. On startup the snapshot is restored and reconciled with the
+# positions actually open at the broker.
+
+import os
+import pickle
+import struct
+import threading
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+import emergency_control
+import trade_decision_engine
+
+load_dotenv()
+
+SNAPSHOT_PATH = os.getenv("STATE_SNAPSHOT_PATH", "bot_state.snapshot")  # "" disables snapshots
+SNAPSHOT_INTERVAL = float(os.getenv("STATE_SNAPSHOT_INTERVAL", "30"))   # seconds between saves
+SNAPSHOT_MAX_AGE = float(os.getenv("STATE_SNAPSHOT_MAX_AGE", str(24 * 3600)))  # ignore older snapshots
+
+SNAPSHOT_MAGIC = b"VXSNAP"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<6sHd")  # magic, version, written_at (epoch seconds)
+
+
+def encode(state, written_at=None):
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, written_at or time.time())
+    return header + pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode(data):
+    """Return (written_at, state); raises ValueError for foreign or incompatible files."""
+    if len(data) < _HEADER.size:
+        raise ValueError("snapshot truncated")
+    magic, version, written_at = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("not a bot state snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"snapshot version {version}, expected {SNAPSHOT_VERSION}")
+    return written_at, pickle.loads(data[_HEADER.size:])
+
+
+def write_atomic(path, data, fsync=True):
+    """Readers see either the old file or the new one, never a partial write."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def capture_state(instances):
+    return {
+        "instances": {instance.symbol: instance.state_dict() for instance in instances},
+        "pattern_cooldowns": dict(trade_decision_engine._last_pattern_used),
+        "risk_session": dict(emergency_control.session_state),
+    }
+
+
+class SnapshotWriter:
+    """Background writer; only the newest pending snapshot is written."""
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self._pending = None            # (seq, data)
+        self._seq = 0
+        self._written_seq = 0
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self.writes = 0
+        self.errors = 0
+        self.last_bytes = 0
+        self.last_write_ms = 0.0
+
+    def submit(self, data):
+        with self._cond:
+            self._seq += 1
+            self._pending = (self._seq, data)
+            self._cond.notify()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="state-snapshot", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                item, self._pending = self._pending, None
+            self._write(item)
+
+    def _write(self, item):
+        seq, data = item
+        with self._write_lock:
+            if seq <= self._written_seq:
+                return  # a newer snapshot already landed
+            started = time.perf_counter()
+            try:
+                write_atomic(self.path, data)
+                self._written_seq = seq
+                self.writes += 1
+                self.last_bytes = len(data)
+            except OSError as e:
+                self.errors += 1
+                print(f"[⚠️ SNAPSHOT] Write failed: {e}")
+            self.last_write_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def flush(self):
+        """Write any pending snapshot on the calling thread (used at shutdown)."""
+        with self._cond:
+            item, self._pending = self._pending, None
+        if item is not None:
+            self._write(item)
+
+
+_writer = SnapshotWriter(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+_last_save = 0.0
+
+
+def save_if_due(instances, force=False):
+    """Serialize state on the caller's thread and queue it for writing; cheap when not due."""
+    global _last_save
+    if _writer is None:
+        return False
+    now = time.time()
+    if not force and now - _last_save < SNAPSHOT_INTERVAL:
+        return False
+    _last_save = now
+    _writer.submit(encode(capture_state(instances), now))
+    if force:
+        _writer.flush()
+    return True
+
+
+def reconcile(instance, positions):
+    """
+    Align restored active_trades with the broker: drop sides with no open position
+    for this magic, and adopt open positions the snapshot didn't know about.
+    Returns (dropped, adopted).
+    """
+    mine = [p for p in positions if p.magic == instance.magic and p.symbol == instance.symbol]
+    open_sides = {"buy" if p.type == 0 else "sell" for p in mine}
+    dropped = [key for key in instance.active_trades if key[0] not in open_sides]
+    for key in dropped:
+        del instance.active_trades[key]
+
+    known_sides = {key[0] for key in instance.active_trades}
+    adopted = []
+    for p in mine:
+        side = "buy" if p.type == 0 else "sell"
+        if side in known_sides:
+            continue
+        instance.active_trades[(side, "restored")] = {
+            "entry": p.price_open,
+            "sl": p.sl,
+            "tp": p.tp,
+            "zone_type": "restored",
+            "strategy_mode": instance.current_mode or "unknown",
+            "entry_time": datetime.fromtimestamp(p.time),
+        }
+        known_sides.add(side)
+        adopted.append(p.ticket)
+    return dropped, adopted
+
+
+def restore(instances, positions, path=SNAPSHOT_PATH):
+    """Load the snapshot into `instances` and reconcile with `positions`; returns a report dict."""
+    report = {"restored": False, "age_s": None, "symbols": [], "dropped": 0, "adopted": 0}
+    if path and os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                written_at, state = decode(f.read())
+            age = time.time() - written_at
+            report["age_s"] = round(age, 1)
+            if age <= SNAPSHOT_MAX_AGE:
+                saved = state.get("instances", {})
+                for instance in instances:
+                    if instance.symbol in saved:
+                        instance.load_state(saved[instance.symbol])
+                        report["symbols"].append(instance.symbol)
+                trade_decision_engine._last_pattern_used.update(state.get("pattern_cooldowns", {}))
+                emergency_control.session_state.update(state.get("risk_session", {}))
+                report["restored"] = True
+            else:
+                print(f"[⚠️ SNAPSHOT] Ignoring snapshot from {age / 3600:.1f}h ago")
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            print(f"[⚠️ SNAPSHOT] Could not restore state: {e}")
+
+    # Reconcile even on a cold start so open positions aren't traded into again
+    for instance in instances:
+        dropped, adopted = reconcile(instance, positions)
+        report["dropped"] += len(dropped)
+        report["adopted"] += len(adopted)
+    return report
+
+
+def snapshot_stats():
+    if _writer is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "writes": _writer.writes,
+        "errors": _writer.errors,
+        "bytes": _writer.last_bytes,
+        "last_write_ms": _writer.last_write_ms,
+        "last_save": _last_save,
+    }
@@ -0,0 +1,331 @@
+# === sweep.py (Parallel Parameter Sweep) ===
+#
+#     python sweep.py --param sl_buffer=50000,75000,100000 --param tp_ratio=1.0,1.2,1.5
+#     python sweep.py --grid sweep_grid.json --samples 40 --workers 8
+#
+# Runs backtest_engine.ZoneStrategy for every combination in a parameter grid, or
+# for a seeded random sample of it, on a process pool. The CSV is parsed once and
+# the OHLC arrays go into a shared-memory block that every worker maps, so a task
+# carries only its parameters. Zones and the trend filter don't depend on the
+# trade parameters. They are computed once per distinct zone/trend setting, split
+# across the pool and cached on disk, and each run replays only the decision
+# engine and the broker. Cache files are keyed by a hash of the OHLC bytes
+# plus CACHE_VERSION, so a different dataset or cache format never reuses
+# them. Runs share no other state, so throughput scales with
+# cores. Results go into one columnar table: .npz (default), .parquet or .csv.
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from itertools import product
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pandas as pd
+
+from backtest_engine import Backtest, CsvFeed, DataFrameFeed, SimBroker, ZoneStrategy
+
+CACHE_DIR = "sweep_cache"
+CACHE_VERSION = 1   # bump when zone/trend computation or the cache file layout changes
+MEMO_SIZE = 8   # zone/trend caches each worker keeps in memory
+
+# Sweepable names -> ZoneStrategy arguments (the live constants map onto the same knobs)
+ALIASES = {
+    "SL_BUFFER": "sl_buffer",
+    "TP_RATIO": "tp_ratio",
+    "CHECK_RANGE": "check_range",
+    "FAST_ZONE_STRENGTH_THRESHOLD": "strength_threshold",
+}
+DETECT_PARAMS = ("swing_window", "buffer_pips", "future_confirm", "min_strength")  # detect_zones() kwargs
+STRATEGY_PARAMS = ("strategy_mode", "sl_buffer", "tp_ratio", "check_range", "strength_threshold", "lot",
+                   "zone_refresh", "zone_lookback", "trend_bars", "sma_period")
+
+OHLC_DTYPE = np.dtype([("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+                       ("close", "<f8"), ("spread", "<f8")])
+
+_worker = {}    # per-process state set by _attach()
+
+
+# === Parameter space ===
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_param(spec):
+    """'sl_buffer=50000,75000' -> ('sl_buffer', [50000, 75000])"""
+    name, _, values = spec.partition("=")
+    if not values:
+        raise ValueError(f"Expected name=v1,v2,... got {spec!r}")
+    return name.strip(), [_parse_value(v.strip()) for v in values.split(",")]
+
+
+def combinations(grid, samples=None, seed=0):
+    """Every grid combination, or `samples` of them drawn without replacement."""
+    resolved = {}
+    for name, values in grid.items():
+        target = ALIASES.get(name, name)
+        if target in resolved:
+            raise ValueError(f"Sweep parameters {resolved[target][0]} and {name} both set {target}")
+        resolved[target] = (name, list(values))
+    grid = {target: values for target, (_, values) in resolved.items()}
+    unknown = set(grid) - set(STRATEGY_PARAMS) - set(DETECT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+    names = list(grid)
+    sizes = [len(grid[name]) for name in names]
+    total = int(np.prod(sizes)) if names else 1
+    if samples is None or samples >= total:
+        return [dict(zip(names, values)) for values in product(*(grid[name] for name in names))]
+    # Sample flat indices so huge grids are never materialised
+    picks = np.random.default_rng(seed).choice(total, size=samples, replace=False)
+    return [
+        {name: grid[name][int(k)] for name, k in zip(names, np.unravel_index(pick, sizes))}
+        for pick in np.sort(picks)
+    ]
+
+
+def _strategy(params):
+    kwargs = {k: v for k, v in params.items() if k in STRATEGY_PARAMS}
+    detect = {k: v for k, v in params.items() if k in DETECT_PARAMS}
+    return ZoneStrategy(zone_params=detect, **kwargs)
+
+
+def _zone_key(params):
+    strategy = _strategy(params)
+    return (strategy.zone_lookback,) + tuple(sorted(strategy.zone_params.items()))
+
+
+def _trend_key(params):
+    strategy = _strategy(params)
+    return strategy.trend_bars, strategy.sma_period
+
+
+# === Shared OHLC ===
+
+def share_feed(feed):
+    """Copy a feed's bars into a new shared-memory block (caller closes and unlinks it)."""
+    n = len(feed)
+    shm = SharedMemory(create=True, size=max(n, 1) * OHLC_DTYPE.itemsize)
+    bars = np.ndarray(n, dtype=OHLC_DTYPE, buffer=shm.buf)
+    bars["time"] = feed.frame["time"].to_numpy(dtype="datetime64[ns]").view("i8")
+    for column in ("open", "high", "low", "close", "spread"):
+        bars[column] = feed.frame[column].to_numpy(dtype=float)
+    return shm
+
+
+def _bars_digest(shm, n):
+    """Content hash of the shared bars: identifies the dataset in cache keys."""
+    return hashlib.sha1(shm.buf[:n * OHLC_DTYPE.itemsize]).hexdigest()
+
+
+def _attach(name, n, cache_dir, slippage, seed):
+    """Pool initializer: map the shared bars and build this process's feed once."""
+    if sys.version_info >= (3, 13):
+        shm = SharedMemory(name=name, track=False)
+    else:
+        shm = SharedMemory(name=name)
+    bars = np.ndarray(n, dtype=OHLC_DTYPE, buffer=shm.buf)
+    frame = pd.DataFrame({column: bars[column] for column in ("open", "high", "low", "close", "spread")})
+    frame.insert(0, "time", pd.to_datetime(bars["time"]))
+    os.environ["DISABLE_TELEGRAM"] = "True"
+    _worker.update(shm=shm, feed=DataFrameFeed(frame), cache_dir=cache_dir,
+                   slippage=slippage, seed=seed, memo=OrderedDict())
+
+
+# === Zone / trend cache ===
+
+def _cache_path(cache_dir, signature, kind, key):
+    digest = hashlib.sha1(repr((CACHE_VERSION, signature, kind, key)).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{kind}_{digest}.pkl")
+
+
+def _load(path):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        return {}
+
+
+def _memo(path):
+    """A worker's in-memory copy of one cache file (LRU of MEMO_SIZE files)."""
+    memo = _worker["memo"]
+    if path not in memo:
+        memo[path] = _load(path)
+        if len(memo) > MEMO_SIZE:
+            memo.popitem(last=False)
+    memo.move_to_end(path)
+    return memo[path]
+
+
+def _precompute(task):
+    """Zones or trends for a slice of bar indices under one zone/trend setting."""
+    kind, params, indices = task
+    strategy, feed = _strategy(params), _worker["feed"]
+    if kind == "zones":
+        return kind, params, {i: strategy.scan_zones(feed.frame, i) for i in indices}
+    return kind, params, {i: strategy.trend_at(feed, i) for i in indices}
+
+
+def warm_cache(pool_map, runs, spans, signature, cache_dir, workers):
+    """Fill the on-disk zone/trend caches every run in `runs` will read over its (start, end) span."""
+    needed = {}   # cache path -> (kind, params of one run using it, bar indices needed)
+    for params, (start, end) in zip(runs, spans):
+        strategy = _strategy(params)
+        for kind, key, indices in (
+            ("zones", _zone_key(params), strategy.refresh_bars(end, start)),
+            ("trend", _trend_key(params), range(max(strategy.warmup, start), end)),
+        ):
+            path = _cache_path(cache_dir, signature, kind, key)
+            entry = needed.setdefault(path, (kind, params, set()))
+            entry[2].update(indices)
+
+    tasks, stored = [], {}
+    for path, (kind, params, indices) in needed.items():
+        stored[path] = _load(path)
+        missing = sorted(indices - stored[path].keys())
+        if not missing:
+            continue
+        # Enough slices to keep every worker busy even with a single setting
+        pieces = max(1, -(-workers * 4 // len(needed)))
+        for chunk in np.array_split(np.asarray(missing), min(pieces, len(missing))):
+            tasks.append((kind, params, chunk.tolist()))
+    if not tasks:
+        return 0
+
+    started = time.perf_counter()
+    for kind, params, values in pool_map(_precompute, tasks):
+        key = _zone_key(params) if kind == "zones" else _trend_key(params)
+        stored[_cache_path(cache_dir, signature, kind, key)].update(values)
+    os.makedirs(cache_dir, exist_ok=True)
+    for path, values in stored.items():
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(values, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    print(f"[🧮 SWEEP] Cached zones/trend ({len(tasks)} slices) in {time.perf_counter() - started:.1f}s")
+    return len(tasks)
+
+
+# === Runs ===
+
+def _run(task):
+    run_id, params, signature, (start, end), detail = task
+    cache_dir = _worker["cache_dir"]
+    strategy = _strategy(params)
+    strategy.zone_cache = _memo(_cache_path(cache_dir, signature, "zones", _zone_key(params)))
+    strategy.trend_cache = _memo(_cache_path(cache_dir, signature, "trend", _trend_key(params)))
+    broker = SimBroker(point=strategy.point, slippage_points=_worker["slippage"], seed=_worker["seed"])
+    result = Backtest(_worker["feed"], strategy, broker, start=start, end=end).run()
+    row = {"run_id": run_id, **params, **result.metrics(), "bars": result.bars, "elapsed": round(result.elapsed, 3)}
+    if detail:
+        row["equity"] = result.equity
+        row["trades"] = result.trades.to_dict("records")
+    return row
+
+
+def write_table(rows, path):
+    """One row per run, stored column by column."""
+    df = pd.DataFrame(rows).sort_values("run_id").reset_index(drop=True)
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    elif path.endswith(".csv"):
+        df.to_csv(path, index=False)
+    else:
+        columns = {}
+        for name in df.columns:
+            try:
+                columns[name] = df[name].to_numpy(dtype=float)
+            except (TypeError, ValueError):
+                columns[name] = df[name].astype(str).to_numpy()
+        np.savez(path, **columns)
+    return df
+
+
+def sweep(feed, runs, workers=None, cache_dir=CACHE_DIR, signature=None, slippage=0, seed=0, progress=True,
+          spans=None, detail=False):
+    """
+    Backtest every params dict in `runs`; returns one result row per run (metrics + params).
+    spans: optional (start, end) bar range per run. detail: also return each run's
+    equity array and trade records. signature: optional extra cache key; the
+    hash of the OHLC data is always part of it.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(runs)))
+    spans = spans or [(0, len(feed))] * len(runs)
+    shm = share_feed(feed)
+    signature = (_bars_digest(shm, len(feed)), signature)
+    pool = None
+    try:
+        initargs = (shm.name, len(feed), cache_dir, slippage, seed)
+        if workers > 1:
+            pool = get_context().Pool(workers, initializer=_attach, initargs=initargs)
+            pool_map = lambda fn, tasks: pool.imap_unordered(fn, tasks)
+        else:
+            _attach(*initargs)
+            pool_map = map
+        warm_cache(pool_map, runs, spans, signature, cache_dir, workers)
+
+        # Runs that share zone settings go out together so workers reuse their memo
+        tasks = sorted(((i, params, signature, spans[i], detail) for i, params in enumerate(runs)),
+                       key=lambda task: repr((_zone_key(task[1]), _trend_key(task[1]))))
+        rows, started = [], time.perf_counter()
+        for row in pool_map(_run, tasks):
+            rows.append(row)
+            if progress:
+                shown = ", ".join(f"{k}={row[k]}" for k in runs[row["run_id"]])
+                print(f"[🧪 SWEEP] {len(rows)}/{len(runs)} {shown} -> net {row['total_profit']:.2f}, "
+                      f"{row['total_trades']} trades ({row['elapsed']:.1f}s)")
+        elapsed = time.perf_counter() - started
+        bars = sum(end - start for start, end in spans)
+        print(f"[✅ SWEEP] {len(runs)} runs on {workers} worker(s) in {elapsed:.1f}s ({bars / elapsed:,.0f} bars/s)")
+        return rows
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _worker.clear()
+        shm.close()
+        shm.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest a grid of strategy parameters on all cores")
+    parser.add_argument("--data", default="M15_data.csv")
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--end")
+    parser.add_argument("--grid", help="JSON file mapping parameter name -> list of values")
+    parser.add_argument("--param", action="append", default=[], help="name=v1,v2,... (repeatable)")
+    parser.add_argument("--samples", type=int, help="random sample of this many combinations")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--slippage", type=int, default=1000, help="max random slippage in points")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--out", default="sweep_results.npz", help=".npz, .parquet or .csv")
+    args = parser.parse_args()
+
+    grid = {}
+    if args.grid:
+        with open(args.grid) as f:
+            grid.update(json.load(f))
+    grid.update(parse_param(spec) for spec in args.param)
+    runs = combinations(grid, args.samples, args.seed)
+
+    feed = CsvFeed(args.data, args.start, args.end)
+    print(f"[🧪 SWEEP] {len(runs)} runs over {len(feed)} bars")
+    rows = sweep(feed, runs, args.workers, args.cache_dir, slippage=args.slippage, seed=args.seed)
+    df = write_table(rows, args.out)
+    print(f"Saved {args.out}")
+    print(df.sort_values("total_profit", ascending=False).head(5).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
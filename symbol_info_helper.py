@@ -1,6 +1,6 @@
 # === symbol_info_helper.py ===
 
-import MetaTrader5 as mt5
+from mt5_gateway import mt5
 from telegram_notifier import send_telegram_message
 
 # List of safe attributes that exist for all symbols
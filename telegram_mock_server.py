@@ -0,0 +1,147 @@
+# === telegram_mock_server.py (Local Telegram Bot API Stand-in) ===
+#
+# Serves POST /bot<token>/sendMessage so telegram_notifier can be exercised offline.
+#   python telegram_mock_server.py                   -> serve on 127.0.0.1:8081
+#   python telegram_mock_server.py --bench 500       -> benchmark the notifier against it
+# Point the bot at it with TELEGRAM_API_URL=http://127.0.0.1:8081
+# Requests carrying an X-Idempotency-Key already seen are acknowledged but not stored again.
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8081
+
+
+class MockTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so session pooling is measurable
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b"{}"
+        server = self.server
+
+        if not self.path.endswith("/sendMessage"):
+            self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+            return
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if server.rate_limit_ratio and random.random() < server.rate_limit_ratio:
+            self._reply(429, {
+                "ok": False, "error_code": 429,
+                "description": "Too Many Requests",
+                "parameters": {"retry_after": 1}
+            })
+            return
+
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            self._reply(400, {"ok": False, "error_code": 400, "description": "Bad Request"})
+            return
+
+        key = self.headers.get("X-Idempotency-Key")
+        with server.lock:
+            if key and key in server.seen_keys:
+                server.duplicates += 1
+                message_id = server.seen_keys[key]
+            else:
+                server.messages.append(payload.get("text", ""))
+                message_id = len(server.messages)
+                if key:
+                    server.seen_keys[key] = message_id
+        self._reply(200, {
+            "ok": True,
+            "result": {"message_id": message_id, "chat": {"id": payload.get("chat_id")}, "text": payload.get("text")}
+        })
+
+
+def start_mock_server(host=DEFAULT_HOST, port=DEFAULT_PORT, latency=0.0, rate_limit_ratio=0.0):
+    """Start the stand-in server on a background thread and return it (port=0 picks a free port)."""
+    server = ThreadingHTTPServer((host, port), MockTelegramHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.rate_limit_ratio = rate_limit_ratio
+    server.messages = []
+    server.seen_keys = {}   # idempotency key -> message_id
+    server.duplicates = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, name="telegram-mock", daemon=True).start()
+    return server
+
+
+def run_benchmark(count, latency=0.0):
+    """Send `count` messages through the notifier against a local server and report timings."""
+    import tempfile
+    import telegram_notifier
+
+    server = start_mock_server(port=0, latency=latency)
+    telegram_notifier.TELEGRAM_API_URL = f"http://{DEFAULT_HOST}:{server.server_address[1]}"
+    telegram_notifier._message_delay = 0
+    telegram_notifier.MAX_QUEUE_SIZE = max(telegram_notifier.MAX_QUEUE_SIZE, count)
+    telegram_notifier._high_bucket = telegram_notifier.TokenBucket(float("inf"), float("inf"))
+    outbox_dir = tempfile.TemporaryDirectory()
+    telegram_notifier.OUTBOX_PATH = os.path.join(outbox_dir.name, "bench_outbox.db")
+
+    # Direct send path: pooled HTTP round trips
+    started = time.perf_counter()
+    for i in range(count):
+        telegram_notifier._send_telegram_message_now(f"bench {i}")
+    direct = time.perf_counter() - started
+
+    # Enqueue path: caller-side cost of send_telegram_message()
+    started = time.perf_counter()
+    for i in range(count):
+        telegram_notifier.send_telegram_message(f"queued {i}", priority="high")
+    enqueue = time.perf_counter() - started
+    telegram_notifier.stop_sender(timeout=60)
+
+    stats = telegram_notifier.get_notifier_stats()
+    print(f"=== Notifier benchmark ({count} messages, server latency {latency * 1000:.0f}ms) ===")
+    print(f"Direct sends     : {count / direct:.0f} msg/s | {direct / count * 1000:.2f} ms/msg")
+    print(f"Enqueue (caller) : {enqueue / count * 1e6:.2f} µs/msg")
+    print(f"Send latency     : p50 {stats['send_latency_ms']['p50']} ms | p95 {stats['send_latency_ms']['p95']} ms | p99 {stats['send_latency_ms']['p99']} ms")
+    print(f"Queue latency    : p50 {stats['queue_latency_ms']['p50']} ms | p95 {stats['queue_latency_ms']['p95']} ms")
+    print(f"Server received  : {len(server.messages)} (+{server.duplicates} duplicates) | Failed: {stats['failed']} | Dropped: {stats['dropped']}")
+    server.shutdown()
+    outbox_dir.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Telegram Bot API stand-in")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial response delay (seconds)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--bench", type=int, default=0, help="Run a notifier benchmark with N messages and exit")
+    args = parser.parse_args()
+
+    if args.bench:
+        run_benchmark(args.bench, latency=args.latency)
+    else:
+        server = start_mock_server(args.host, args.port, args.latency, args.rate_limit)
+        print(f"📡 Mock Telegram API on http://{args.host}:{args.port} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -1,83 +1,518 @@
 # telegram_notifier.py
 
 import requests
+from requests.adapters import HTTPAdapter
+import hashlib
 import time
+import atexit
+import threading
+from collections import deque
 from dotenv import load_dotenv
 import os
+from notification_outbox import NotificationOutbox
 
 load_dotenv()
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 
+# HTTP settings (point TELEGRAM_API_URL at telegram_mock_server.py for offline benchmarks)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+CONNECT_TIMEOUT = float(os.getenv("TELEGRAM_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("TELEGRAM_READ_TIMEOUT", "10"))
+BACKOFF_BASE = 0.5    # Seconds, doubled per retry on network errors / 5xx
+MAX_BACKOFF = 8
+_session = None
+
 # Rate limiting variables
 _last_message_time = 0
-_message_delay = 2  # Minimum seconds between messages
-_message_queue = []
-_last_flush_time = 0
+_message_delay = 2  # Minimum seconds between API calls
+
+# Token buckets (rate per second, burst). High priority has its own reserved bucket,
+# so digests can never starve order/stop notifications.
+HIGH_RATE, HIGH_BURST = 1 / 3, 5            # ~20/min, Telegram's per-chat ceiling
+DIGEST_RATE, DIGEST_BURST = 1 / 30, 2       # digest messages
+CATEGORY_RATE, CATEGORY_BURST = 1 / 60, 5   # distinct new lines per category
+
+# Digests go out on a fixed schedule per priority tier
+DIGEST_INTERVALS = {"normal": 60, "low": 600}
+MAX_DIGEST_CHARS = 3900  # Telegram caps messages at 4096
+MAX_QUEUE_SIZE = int(os.getenv("TELEGRAM_MAX_QUEUE", "200"))  # high messages / distinct digest lines
+MAX_RETRIES = 3       # Attempts per message on 429 / 5xx / network errors before giving up
+LATENCY_SAMPLES = 512
+
+# Durable outbox: every message is written here before sending ("" disables it)
+OUTBOX_PATH = os.getenv("TELEGRAM_OUTBOX_PATH", "telegram_outbox.db")
+OUTBOX_BATCH = 20             # Backlog rows packed per message when draining
+OUTBOX_RETRY_INTERVAL = 60    # Seconds between backlog drain attempts
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now=None):
+        self._refill(now if now is not None else time.monotonic())
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until(self, now=None):
+        self._refill(now if now is not None else time.monotonic())
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+# Queue state (guarded by _cond)
+_high_queue = deque()                           # [message, enqueued_at, outbox_id, idempotency_key]
+_digests = {tier: {} for tier in DIGEST_INTERVALS}      # tier -> category -> {text: [count, first_seen]}
+_suppressed = {tier: {} for tier in DIGEST_INTERVALS}   # tier -> category -> lines over budget
+_digest_lines = 0
+_high_bucket = TokenBucket(HIGH_RATE, HIGH_BURST)
+_digest_bucket = TokenBucket(DIGEST_RATE, DIGEST_BURST)
+_category_buckets = {}
+_next_digest = {tier: time.monotonic() + interval for tier, interval in DIGEST_INTERVALS.items()}
+_cond = threading.Condition()
+_sender_thread = None
+_stopping = False
+
+# Metrics
+_stats = {"enqueued": 0, "sent": 0, "failed": 0, "dropped": 0, "coalesced": 0,
+          "suppressed": 0, "digests": 0, "api_calls": 0, "outbox_backlog": 0, "outbox_replayed": 0}
+_queue_latencies = deque(maxlen=LATENCY_SAMPLES)  # enqueue -> delivered (seconds)
+_send_latencies = deque(maxlen=LATENCY_SAMPLES)   # HTTP round trip (seconds)
 
-def _send_telegram_message_now(message):
-    """Internal function to actually send the message"""
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+
+def _get_session():
+    """Persistent keep-alive session, only used from the sender thread"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+    return _session
+
+
+def _backoff(attempt):
+    return min(MAX_BACKOFF, BACKOFF_BASE * (2 ** attempt))
+
+
+def _send_telegram_message_now(message, idempotency_key=None):
+    """Internal function to actually send the message (runs on the sender thread)"""
+    url = f"{TELEGRAM_API_URL}/bot{BOT_TOKEN}/sendMessage"
     payload = {
         "chat_id": CHAT_ID,
         "text": message,
         "parse_mode": "HTML"
     }
-    
-    try:
-        response = requests.post(url, json=payload)
+    # Telegram ignores this header; receivers that honour it (e.g. the mock server) drop repeats
+    headers = {"X-Idempotency-Key": idempotency_key} if idempotency_key else None
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            started = time.perf_counter()
+            response = _get_session().post(url, json=payload, headers=headers, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+            _send_latencies.append(time.perf_counter() - started)
+        except requests.exceptions.RequestException as e:
+            print(f"[Telegram ERROR] {e} (attempt {attempt + 1}/{MAX_RETRIES})")
+            time.sleep(_backoff(attempt))
+            continue
+
         if response.status_code == 429:
-            retry_after = response.json().get('parameters', {}).get('retry_after', 5)
+            try:
+                retry_after = response.json().get('parameters', {}).get('retry_after', 5)
+            except ValueError:
+                retry_after = 5
             print(f"[Telegram RATE LIMITED] Waiting {retry_after} seconds")
             time.sleep(retry_after)
-            return _send_telegram_message_now(message)
+            continue
+        elif response.status_code >= 500:
+            print(f"[Telegram ERROR] HTTP {response.status_code} (attempt {attempt + 1}/{MAX_RETRIES})")
+            time.sleep(_backoff(attempt))
+            continue
         elif response.status_code != 200:
             print(f"[Telegram ERROR] {response.text}")
             return False
         return True
+    return False
+
+
+def _window_label(seconds):
+    return f"{seconds // 60} min" if seconds >= 60 else f"{seconds}s"
+
+
+def _render_digest(tiers, now):
+    """Build one digest message from the due tiers and reset them. Returns (text, latencies)."""
+    global _digest_lines
+    lines, latencies = [], []
+    for tier in tiers:
+        window = _window_label(DIGEST_INTERVALS[tier])
+        for entries in _digests[tier].values():
+            for text, (count, first_seen) in entries.items():
+                lines.append(text if count == 1 else f"{text} ×{count} in last {window}")
+                latencies.append(now - first_seen)
+        for category, count in _suppressed[tier].items():
+            lines.append(f"… {count} more {category} notices in last {window}")
+        _digest_lines -= sum(len(entries) for entries in _digests[tier].values())
+        _digests[tier] = {}
+        _suppressed[tier] = {}
+
+    text = ""
+    for i, line in enumerate(lines):
+        if len(text) + len(line) + 1 > MAX_DIGEST_CHARS:
+            text += f"\n… (+{len(lines) - i} more lines)"
+            break
+        text = f"{text}\n{line}" if text else line
+    return text, latencies
+
+
+def _next_message():
+    """
+    Block until there is work. Returns None on shutdown, ("persist", items) for high
+    messages still waiting on their token bucket, or ("send", text, latencies, priority, item).
+    """
+    with _cond:
+        while True:
+            now = time.monotonic()
+            if _high_queue and (_stopping or _high_bucket.try_take(now)):
+                item = _high_queue.popleft()
+                return "send", item[0], [now - item[1]], "high", item
+
+            due = []
+            for tier, interval in DIGEST_INTERVALS.items():
+                if _stopping or now >= _next_digest[tier]:
+                    if _digests[tier] or _suppressed[tier]:
+                        due.append(tier)
+                    elif not _stopping:
+                        # Nothing buffered: keep the fixed schedule ticking
+                        while _next_digest[tier] <= now:
+                            _next_digest[tier] += interval
+            if due and (_stopping or _digest_bucket.try_take(now)):
+                for tier in due:
+                    while _next_digest[tier] <= now:
+                        _next_digest[tier] += DIGEST_INTERVALS[tier]
+                _stats["digests"] += 1
+                text, latencies = _render_digest(due, now)
+                return "send", text, latencies, "digest", None
+
+            if _stopping and not _high_queue:
+                return None
+
+            unpersisted = [item for item in _high_queue if item[2] is None]
+            if unpersisted and OUTBOX_PATH:
+                return "persist", unpersisted
+
+            waits = [_next_digest[tier] - now for tier in DIGEST_INTERVALS]
+            waits.append(OUTBOX_RETRY_INTERVAL)
+            if _high_queue:
+                waits.append(_high_bucket.time_until(now))
+            if due:
+                waits.append(_digest_bucket.time_until(now))
+            _cond.wait(max(min(waits), 0.01))
+
+
+def _deliver(text, key=None):
+    """Rate-limited send on the sender thread; returns True on success"""
+    global _last_message_time
+    # Respect the minimum delay between API calls (sleeps here, never on the caller)
+    wait = _message_delay - (time.time() - _last_message_time)
+    if wait > 0:
+        time.sleep(wait)
+    ok = _send_telegram_message_now(text, key)
+    _last_message_time = time.time()
+    with _cond:
+        _stats["api_calls"] += 1
+    return ok
+
+
+def _open_outbox():
+    if not OUTBOX_PATH:
+        return None
+    try:
+        outbox = NotificationOutbox(OUTBOX_PATH)
+        outbox.prune()
+        return outbox
     except Exception as e:
-        print(f"[Telegram ERROR] {e}")
-        return False
+        print(f"[Telegram ERROR] Outbox unavailable, sending without persistence: {e}")
+        return None
 
-def flush_message_queue():
-    """Send all queued messages as a single message"""
-    global _message_queue, _last_flush_time
-    if not _message_queue:
-        return
-    
-    current_time = time.time()
-    if current_time - _last_flush_time < _message_delay:
+
+def _pack_backlog(rows):
+    """Group backlog rows into as few messages as fit Telegram's size limit"""
+    packs, ids, keys, lines = [], [], [], []
+    for row_id, key, priority, text, created in rows:
+        line = f"[{time.strftime('%H:%M', time.localtime(created))}] {text}"
+        if lines and len("\n".join(lines)) + len(line) + 40 > MAX_DIGEST_CHARS:
+            packs.append((ids, keys, lines))
+            ids, keys, lines = [], [], []
+        ids.append(row_id)
+        keys.append(key)
+        lines.append(line)
+    if lines:
+        packs.append((ids, keys, lines))
+
+    messages = []
+    for ids, keys, lines in packs:
+        key = keys[0] if len(keys) == 1 else hashlib.sha1("".join(keys).encode()).hexdigest()
+        messages.append((ids, key, "📬 Delayed notifications:\n" + "\n".join(lines)))
+    return messages
+
+
+def _drain_outbox(outbox):
+    """Resend undelivered rows (from a previous run or failed sends) in batches"""
+    while True:
+        with _cond:
+            in_memory = {item[2] for item in _high_queue if item[2] is not None}
+        rows = outbox.pending(OUTBOX_BATCH, exclude=in_memory)
+        if not rows:
+            break
+        for ids, key, text in _pack_backlog(rows):
+            if not _deliver(text, key):
+                outbox.mark_failed(ids)
+                _stats["outbox_backlog"] = outbox.backlog_size()
+                return
+            outbox.mark_sent(ids)
+            with _cond:
+                _stats["outbox_replayed"] += len(ids)
+    _stats["outbox_backlog"] = 0
+
+
+def _sender_loop():
+    outbox = _open_outbox()
+    last_drain = None  # drain any backlog on startup
+    while True:
+        if outbox and (last_drain is None or time.monotonic() - last_drain >= OUTBOX_RETRY_INTERVAL):
+            _drain_outbox(outbox)
+            last_drain = time.monotonic()
+
+        work = _next_message()
+        if work is None:
+            break
+        if work[0] == "persist":
+            for item in work[1]:
+                item[2], item[3] = outbox.add(item[0], "high") if outbox else (0, None)
+            continue
+
+        _, text, latencies, priority, item = work
+        row_id, key = (item[2], item[3]) if item is not None else (None, None)
+        if outbox and row_id is None:
+            row_id, key = outbox.add(text, priority)
+
+        ok = _deliver(text, key)
+        if outbox:
+            (outbox.mark_sent if ok else outbox.mark_failed)([row_id])
+        with _cond:
+            if ok:
+                _stats["sent"] += len(latencies)
+                _queue_latencies.extend(latencies)
+            else:
+                _stats["failed"] += len(latencies)
+                _stats["outbox_backlog"] += 1 if outbox else 0
+
+    if outbox:
+        outbox.close()
+
+
+def _ensure_sender():
+    global _sender_thread, _stopping
+    if _sender_thread is not None and _sender_thread.is_alive():
         return
-    
-    combined_message = "\n".join(_message_queue)
-    if _send_telegram_message_now(combined_message):
-        _message_queue = []
-        _last_flush_time = current_time
+    with _cond:
+        if _sender_thread is None or not _sender_thread.is_alive():
+            _stopping = False
+            _sender_thread = threading.Thread(target=_sender_loop, name="telegram-sender", daemon=True)
+            _sender_thread.start()
+
+
+def _request_flush():
+    # Digests keep their fixed schedule; this only wakes the sender to re-check it
+    with _cond:
+        _cond.notify()
+
+
+def _category_bucket(category):
+    bucket = _category_buckets.get(category)
+    if bucket is None:
+        bucket = _category_buckets[category] = TokenBucket(CATEGORY_RATE, CATEGORY_BURST)
+    return bucket
+
 
-def send_telegram_message(message, priority="normal"):
+def _enqueue(message, priority, category=None):
     """
-    Send message with rate limiting
-    Priority can be "high", "normal", or "low"
+    Queue a message for the background sender and return immediately.
+    High messages are sent individually from a reserved token bucket. Normal/low
+    messages are deduplicated into per-category digest buffers (repeats become
+    a count); new lines beyond a category's token budget are only counted.
     """
-    global _last_message_time, _message_queue
-    
-    current_time = time.time()
-    
-    # High priority messages go immediately
-    if priority == "high":
-        # Wait if needed to respect rate limits
-        time_since_last = current_time - _last_message_time
-        if time_since_last < _message_delay:
-            time.sleep(_message_delay - time_since_last)
-        
-        if _send_telegram_message_now(message):
-            _last_message_time = time.time()
+    global _digest_lines
+    _ensure_sender()
+    now = time.monotonic()
+    with _cond:
+        if priority == "high":
+            if len(_high_queue) >= MAX_QUEUE_SIZE:
+                _high_queue.popleft()
+                _stats["dropped"] += 1
+            _high_queue.append([message, now, None, None])
+            _stats["enqueued"] += 1
+            _cond.notify()
+            return
+
+        tier = priority if priority in _digests else "normal"
+        category = category or tier
+        entries = _digests[tier].setdefault(category, {})
+        entry = entries.get(message)
+        if entry is not None:
+            entry[0] += 1
+            _stats["coalesced"] += 1
+            return
+
+        if _digest_lines >= MAX_QUEUE_SIZE or not _category_bucket(category).try_take(now):
+            _suppressed[tier][category] = _suppressed[tier].get(category, 0) + 1
+            _stats["suppressed"] += 1
+            return
+
+        entries[message] = [1, now]
+        _digest_lines += 1
+        _stats["enqueued"] += 1
+
+
+# === Notification sinks ===
+# NOTIFY_SINK selects telegram (default), null or recording; DISABLE_TELEGRAM=True forces null.
+
+class TelegramSink:
+    """Delivers through the background Telegram sender"""
+    enabled = True
+
+    def send(self, message, priority="normal", category=None):
+        _enqueue(message, priority, category)
+
+    def flush(self):
+        _request_flush()
+
+
+class NullSink:
+    """Discards everything; callers skip formatting entirely"""
+    enabled = False
+
+    def send(self, message, priority="normal", category=None):
+        pass
+
+    def flush(self):
+        pass
+
+
+class RecordingSink:
+    """Keeps (priority, message) pairs in memory for tests and replay"""
+    enabled = True
+
+    def __init__(self, maxlen=None):
+        self.messages = deque(maxlen=maxlen)
+
+    def send(self, message, priority="normal", category=None):
+        self.messages.append((priority, message))
+
+    def flush(self):
+        pass
+
+    def texts(self, priority=None):
+        return [m for p, m in self.messages if priority is None or p == priority]
+
+    def clear(self):
+        self.messages.clear()
+
+
+SINKS = {"telegram": TelegramSink, "null": NullSink, "recording": RecordingSink}
+_sink = None
+
+
+def _sink_from_env():
+    if os.getenv("DISABLE_TELEGRAM", "False").lower() == "true":
+        return NullSink()
+    name = os.getenv("NOTIFY_SINK", "telegram").lower()
+    if name not in SINKS:
+        print(f"[Telegram WARNING] Unknown NOTIFY_SINK '{name}', using telegram")
+        name = "telegram"
+    return SINKS[name]()
+
+
+def get_sink():
+    """Active sink, resolved from the environment on first use"""
+    global _sink
+    if _sink is None:
+        _sink = _sink_from_env()
+    return _sink
+
+
+def set_sink(sink):
+    """Install a sink (instance or name) and return the previous one"""
+    global _sink
+    previous = _sink
+    _sink = SINKS[sink]() if isinstance(sink, str) else sink
+    return previous
+
+
+def notifications_enabled():
+    return (_sink or get_sink()).enabled
+
+
+def flush_message_queue():
+    """Nudge the sink's sender (non-blocking); digests still go out on their schedule"""
+    (_sink or get_sink()).flush()
+
+
+def send_telegram_message(message, *args, priority="normal", category=None):
+    """
+    Send a notification through the active sink. Priority can be "high", "normal", or "low";
+    `category` groups normal/low lines for digest budgeting (defaults to the priority).
+    Extra positional args are str.format()ed into `message` only when the sink is enabled,
+    so hot paths can pass a template instead of a pre-built f-string.
+    """
+    sink = _sink or get_sink()
+    if not sink.enabled:
         return
-    
-    # Normal and low priority messages get queued
-    _message_queue.append(message)
-    
-    # Flush queue if it's getting big or it's been a while
-    if len(_message_queue) >= 3 or (current_time - _last_flush_time) > 30:
-        flush_message_queue()
\ No newline at end of file
+    if args:
+        message = message.format(*args)
+    sink.send(message, priority, category)
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def get_notifier_stats():
+    """Queue depth, drop/coalesce/digest counters and latency percentiles (ms) for the sender"""
+    with _cond:
+        queued = list(_queue_latencies)
+        sends = list(_send_latencies)
+        return {
+            "queue_depth": len(_high_queue) + _digest_lines,
+            "high_depth": len(_high_queue),
+            "digest_lines": _digest_lines,
+            **_stats,
+            "queue_latency_ms": {f"p{p}": round(_percentile(queued, p) * 1000, 2) for p in (50, 95, 99)},
+            "send_latency_ms": {f"p{p}": round(_percentile(sends, p) * 1000, 2) for p in (50, 95, 99)},
+        }
+
+
+def stop_sender(timeout=5):
+    """Drain pending messages and stop the sender thread"""
+    global _stopping
+    with _cond:
+        _stopping = True
+        _cond.notify()
+    if _sender_thread is not None:
+        _sender_thread.join(timeout)
+
+
+atexit.register(stop_sender)
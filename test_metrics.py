@@ -0,0 +1,32 @@
+# === test_metrics.py (Prometheus Exposition Values) ===
+#
+#     python -m pytest -q test_metrics.py
+
+from metrics import render
+
+
+def _samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if line and not line.startswith("#"))
+
+
+def test_large_counter_keeps_every_digit():
+    first = _samples(render({"metrics": {"cycles": 1234567}}))
+    second = _samples(render({"metrics": {"cycles": 1234568}}))
+    assert first["vix75_cycles_total"] == "1234567"
+    assert second["vix75_cycles_total"] == "1234568"
+
+
+def test_float_gauge_keeps_full_precision():
+    samples = _samples(render({"risk": {"equity": 10234.57, "drawdown": -12.5}}))
+    assert samples["vix75_equity"] == "10234.57"
+    assert samples["vix75_drawdown"] == "-12.5"
+
+
+def test_bucket_labels_stay_short():
+    status = {"metrics": {"cycle_hist": {"le_ms": [5, 250], "counts": [3, 1234567],
+                                         "count": 1234570, "sum_ms": 1500.25}}}
+    samples = _samples(render(status))
+    assert samples['vix75_cycle_duration_seconds_bucket{le="0.005"}'] == "3"
+    assert samples['vix75_cycle_duration_seconds_bucket{le="0.25"}'] == "1234567"
+    assert samples['vix75_cycle_duration_seconds_bucket{le="+Inf"}'] == "1234570"
+    assert samples["vix75_cycle_duration_seconds_sum"] == "1.50025"
@@ -2,7 +2,10 @@
 # (Enhanced with rate limiting and message consolidation)
 
 from datetime import datetime
-from telegram_notifier import send_telegram_message
+from event_bus import (
+    publish, ZoneTouch, Skip, PatternsDetected, Signal,
+    TREND_MISMATCH, NO_CONFIRMATION, NO_SIGNAL, PATTERN_COOLDOWN as COOLDOWN_SKIP
+)
 from candlestick_patterns import (
     is_bullish_pin_bar,
     is_bullish_engulfing,
@@ -18,7 +21,7 @@ from candlestick_patterns import (
 
 RESET_BUFFER_POINTS = 1000
 PATTERN_COOLDOWN = 300
-_last_pattern_used = {}
+_last_pattern_used = {}  # (symbol, pattern) -> last signal time
 
 def trade_decision_engine(
     symbol,
@@ -36,7 +39,8 @@ def trade_decision_engine(
     LOT_SIZE,
     MAGIC,
     strategy_mode="trend_follow",
-    breaker_block=None
+    breaker_block=None,
+    now=None
 ):
     signals = []
     candle = last3_candles.iloc[-1]
@@ -116,7 +120,7 @@ def trade_decision_engine(
 
     patterns = detect_zone_confirmation_patterns(candle, prev_candle, prev_prev_candle)
     if patterns and strategy_mode == "aggressive":
-        send_telegram_message(f"🔍 Aggressive Mode Patterns: {', '.join(patterns)}", priority="low")
+        publish(PatternsDetected(symbol, "aggressive", tuple(patterns)))
 
     demand_price_check = last3_candles['low'].iloc[-2]
     supply_price_check = last3_candles['high'].iloc[-2]
@@ -131,10 +135,10 @@ def trade_decision_engine(
         touch_number = update_touch_count(zone_price, candle_time, in_zone)
 
         if touch_number:
-            send_telegram_message(f"⚠️ Price touched DEMAND zone at {zone_price:.2f} (touch {touch_number})", priority="low")
+            publish(ZoneTouch(symbol, "demand", zone_price, touch_number))
 
             if strategy_mode == "trend_follow" and trend != "uptrend":
-                send_telegram_message(f"⛔️ Skipped: trend mismatch at DEMAND zone {zone_price:.2f} (trend: {trend})", priority="low")
+                publish(Skip(symbol, TREND_MISMATCH, "demand", zone_price, trend))
                 continue
 
             confirmed = False
@@ -143,7 +147,7 @@ def trade_decision_engine(
             if strategy_mode == "aggressive":
                 if patterns and any(p in patterns for p in ["bullish_pin_bar", "hammer", "bullish_engulfing", "bullish_marubozu"]):
                     confirmed = True
-                    confirmation_reasons.append(f"aggressive pattern ({', '.join(patterns)})")
+                    confirmation_reasons.append("aggressive pattern ({})".format(", ".join(patterns)))
                 elif has_wick_rejection(candle, direction="bullish", min_wick_ratio=1.2):
                     confirmed = True
                     confirmation_reasons.append("strong bullish wick rejection")
@@ -181,13 +185,9 @@ def trade_decision_engine(
                     "patterns": patterns,
                     "lot": LOT_SIZE
                 })
-                send_telegram_message(
-                    f"🟢 BUY Signal | Entry: {entry:.2f} | SL: {sl:.2f} | TP: {tp:.2f}\n"
-                    f"Zone: {zone_price:.2f} | Reason: {', '.join(confirmation_reasons)}",
-                    priority="high"
-                )
+                publish(Signal(symbol, "buy", entry, sl, tp, zone_price, signals[-1]["reason"]))
             elif not confirmed:
-                send_telegram_message(f"⛔️ Skipped: no confirmation at DEMAND zone {zone_price:.2f}", priority="low")
+                publish(Skip(symbol, NO_CONFIRMATION, "demand", zone_price, None))
 
         if detect_false_breakout(prev_candle, candle, zone_price, direction="bearish") and not active_trades.get("sell"):
             entry = candle.close
@@ -202,11 +202,9 @@ def trade_decision_engine(
                 "reason": "false breakout reversal",
                 "lot": LOT_SIZE
             })
-            send_telegram_message(f"🔄 False breakout reversal at DEMAND zone {zone_price:.2f} → SELL", priority="normal")
-            send_telegram_message(f"🔴 SELL Signal | Entry: {entry:.2f} | SL: {sl:.2f} | TP: {tp:.2f}", priority="high")
+            publish(Signal(symbol, "sell", entry, sl, tp, zone_price, "false breakout reversal"))
 
         if touch_number == 4:
-            send_telegram_message(f"⚠️ 4th touch at DEMAND zone {zone_price:.2f} - possible breakout", priority="normal")
             reset_touch_count(zone_price)
 
     # === SUPPLY ZONES ===
@@ -217,10 +215,10 @@ def trade_decision_engine(
         touch_number = update_touch_count(zone_price, candle_time, in_zone)
 
         if touch_number:
-            send_telegram_message(f"⚠️ Price touched SUPPLY zone at {zone_price:.2f} (touch {touch_number})", priority="low")
+            publish(ZoneTouch(symbol, "supply", zone_price, touch_number))
 
             if strategy_mode == "trend_follow" and trend != "downtrend":
-                send_telegram_message(f"⛔️ Skipped: trend mismatch at SUPPLY zone {zone_price:.2f} (trend: {trend})", priority="low")
+                publish(Skip(symbol, TREND_MISMATCH, "supply", zone_price, trend))
                 continue
 
             confirmed = False
@@ -229,7 +227,7 @@ def trade_decision_engine(
             if strategy_mode == "aggressive":
                 if patterns and any(p in patterns for p in ["bearish_pin_bar", "shooting_star", "bearish_engulfing", "bearish_marubozu"]):
                     confirmed = True
-                    confirmation_reasons.append(f"aggressive pattern ({', '.join(patterns)})")
+                    confirmation_reasons.append("aggressive pattern ({})".format(", ".join(patterns)))
                 elif has_wick_rejection(candle, direction="bearish", min_wick_ratio=1.2):
                     confirmed = True
                     confirmation_reasons.append("strong bearish wick rejection")
@@ -267,13 +265,9 @@ def trade_decision_engine(
                     "patterns": patterns,
                     "lot": LOT_SIZE
                 })
-                send_telegram_message(
-                    f"🔴 SELL Signal | Entry: {entry:.2f} | SL: {sl:.2f} | TP: {tp:.2f}\n"
-                    f"Zone: {zone_price:.2f} | Reason: {', '.join(confirmation_reasons)}",
-                    priority="high"
-                )
+                publish(Signal(symbol, "sell", entry, sl, tp, zone_price, signals[-1]["reason"]))
             elif not confirmed:
-                send_telegram_message(f"⛔️ Skipped: no confirmation at SUPPLY zone {zone_price:.2f}", priority="low")
+                publish(Skip(symbol, NO_CONFIRMATION, "supply", zone_price, None))
 
         if detect_false_breakout(prev_candle, candle, zone_price, direction="bullish") and not active_trades.get("buy"):
             entry = candle.close
@@ -288,22 +282,19 @@ def trade_decision_engine(
                 "reason": "false breakout reversal",
                 "lot": LOT_SIZE
             })
-            send_telegram_message(f"🔄 False breakout reversal at SUPPLY zone {zone_price:.2f} → BUY", priority="normal")
-            send_telegram_message(f"🟢 BUY Signal | Entry: {entry:.2f} | SL: {sl:.2f} | TP: {tp:.2f}", priority="high")
+            publish(Signal(symbol, "buy", entry, sl, tp, zone_price, "false breakout reversal"))
 
         if touch_number == 4:
-            send_telegram_message(f"⚠️ 4th touch at SUPPLY zone {zone_price:.2f} - possible breakout", priority="normal")
             reset_touch_count(zone_price)
 
     # === PURE AGGRESSIVE PATTERN SCALP ===
-    current_time = datetime.now()
+    current_time = now or datetime.now()  # backtests pass the bar time
     min_distance = 75000  # VIX75 requires 75k points
 
     for pattern in patterns:
-        last_used = _last_pattern_used.get(pattern)
+        last_used = _last_pattern_used.get((symbol, pattern))
         if last_used and (current_time - last_used).total_seconds() < PATTERN_COOLDOWN:
-            cooldown = (current_time - last_used).total_seconds()
-            send_telegram_message(f"⏳ Cooldown active for pattern: {pattern} ({int(cooldown)}s ago)", priority="low")
+            publish(Skip(symbol, COOLDOWN_SKIP, None, None, (pattern, (current_time - last_used).total_seconds())))
             continue
 
         full_range = candle.high - candle.low
@@ -324,7 +315,7 @@ def trade_decision_engine(
                     "reason": f"Aggressive {pattern} pattern",
                     "lot": LOT_SIZE
                 })
-                send_telegram_message(f"📉 Aggressive SELL | Entry: {candle.close:.2f} | SL: {sl:.2f} | TP: {tp:.2f}", priority="high")
+                publish(Signal(symbol, "sell", candle.close, sl, tp, None, signals[-1]["reason"]))
             else:
                 sl = candle.low - min_distance
                 tp = candle.close + (TP_RATIO * min_distance)
@@ -336,11 +327,11 @@ def trade_decision_engine(
                     "reason": f"Aggressive {pattern} pattern",
                     "lot": LOT_SIZE
                 })
-                send_telegram_message(f"📈 Aggressive BUY | Entry: {candle.close:.2f} | SL: {sl:.2f} | TP: {tp:.2f}", priority="high")
+                publish(Signal(symbol, "buy", candle.close, sl, tp, None, signals[-1]["reason"]))
 
-            _last_pattern_used[pattern] = current_time
+            _last_pattern_used[(symbol, pattern)] = current_time
 
     if not signals:
-        send_telegram_message("📭 No signal triggered. Market may not be near any active zone.", priority="low")
+        publish(Skip(symbol, NO_SIGNAL, None, None, None))
 
     return signals
\ No newline at end of file
@@ -1,7 +1,10 @@
 # === trade_executor.py (VIX75 Optimized) ===
-import MetaTrader5 as mt5
+from mt5_gateway import mt5, run as mt5_run
 from telegram_notifier import send_telegram_message
+from event_bus import publish, OrderResult, TrailUpdate
 from symbol_info_helper import get_symbol_specs
+from latency_trace import mark_request, mark_send, order_done
+from emergency_control import trading_halted
 
 # VIX75-Specific Constants
 VIX75_CONFIG = {
@@ -53,14 +56,25 @@ def validate_lot(symbol_info, lot):
         return round(max_lot, 3)
     return round(round(lot / lot_step) * lot_step, 3)
 
+_HALTED = object()  # _send_unless_halted's result when the halt was set first
+
+def _send_unless_halted(request):
+    """Runs as one MT5-thread job, so a flatten can't run between the halt check and the send."""
+    if trading_halted.is_set():
+        return _HALTED
+    return mt5.order_send(request)
+
 # Update the place_order function
 def place_order(symbol, order_type, lot, sl_price=None, tp_price=None, magic_number=9999, atr=None):
     """Enhanced order placement with VIX75-specific safeguards"""
+    if trading_halted.is_set():
+        print(f"[⛔ HALTED] Risk limit breached — {order_type.upper()} {symbol} not sent")
+        return None
     config = get_config(symbol)
     symbol_info = mt5.symbol_info(symbol)
     
     if not symbol_info:
-        send_telegram_message(f"❌ Symbol {symbol} not found")
+        send_telegram_message(f"[{symbol}] ❌ Symbol not found")
         return None
 
     # Get symbol specifications safely
@@ -70,7 +84,7 @@ def place_order(symbol, order_type, lot, sl_price=None, tp_price=None, magic_num
         spread = symbol_info.spread * point
         stops_level = getattr(symbol_info, 'stops_level', config['fallback_stops']) * point
     except AttributeError as e:
-        send_telegram_message(f"❌ Symbol info error: {str(e)}")
+        send_telegram_message(f"[{symbol}] ❌ Symbol info error: {str(e)}")
         return None
 
     spread_buffer = config.get('spread_buffer', 0) * point
@@ -78,7 +92,7 @@ def place_order(symbol, order_type, lot, sl_price=None, tp_price=None, magic_num
     # Get current tick data
     tick = mt5.symbol_info_tick(symbol)
     if not tick:
-        send_telegram_message("❌ Failed to get tick data")
+        send_telegram_message(f"[{symbol}] ❌ Failed to get tick data")
         return None
 
     price = tick.ask if order_type == "buy" else tick.bid
@@ -90,7 +104,7 @@ def place_order(symbol, order_type, lot, sl_price=None, tp_price=None, magic_num
         for pos in positions:
             if pos.type == (mt5.ORDER_TYPE_BUY if order_type == "buy" else mt5.ORDER_TYPE_SELL):
                 if abs(pos.price_open - price) < 5000 * point:
-                    send_telegram_message("🛑 Similar active trade exists — skipping order")
+                    send_telegram_message(f"[{symbol}] 🛑 Similar active trade exists — skipping order")
                     return None
 
     # Handle stop levels with spread consideration
@@ -115,7 +129,7 @@ def place_order(symbol, order_type, lot, sl_price=None, tp_price=None, magic_num
         current_sl_distance = abs(price - sl_price)
         if current_sl_distance < min_sl_distance:
             new_sl = price - min_sl_distance if order_type == "buy" else price + min_sl_distance
-            send_telegram_message(f"⚠️ Adjusted SL to {new_sl:.2f} (min {min_sl_distance/point:.0f}pts)")
+            send_telegram_message(f"[{symbol}] ⚠️ Adjusted SL to {new_sl:.2f} (min {min_sl_distance/point:.0f}pts)")
             sl_price = new_sl
 
     # Process Take Profit with spread adjustment
@@ -127,16 +141,16 @@ def place_order(symbol, order_type, lot, sl_price=None, tp_price=None, magic_num
         current_tp_distance = abs(tp_price - price)
         if current_tp_distance < min_tp_distance:
             new_tp = price + min_tp_distance if order_type == "buy" else price - min_tp_distance
-            send_telegram_message(f"⚠️ Adjusted TP to {new_tp:.2f}")
+            send_telegram_message(f"[{symbol}] ⚠️ Adjusted TP to {new_tp:.2f}")
             tp_price = new_tp
 
     # Final validation with spread check
     if abs(price - sl_price) < min_sl_distance:
-        send_telegram_message(f"❌ Order skipped: SL needs {min_sl_distance/point:.0f}+ pts (current: {abs(price-sl_price)/point:.0f})")
+        send_telegram_message(f"[{symbol}] ❌ Order skipped: SL needs {min_sl_distance/point:.0f}+ pts (current: {abs(price-sl_price)/point:.0f})")
         return None
         
     if abs(price - tp_price) < min_tp_distance:
-        send_telegram_message(f"❌ Order skipped: TP needs {min_tp_distance/point:.0f}+ pts (current: {abs(price-tp_price)/point:.0f})")
+        send_telegram_message(f"[{symbol}] ❌ Order skipped: TP needs {min_tp_distance/point:.0f}+ pts (current: {abs(price-tp_price)/point:.0f})")
         return None
 
     # Prepare trade request
@@ -155,24 +169,28 @@ def place_order(symbol, order_type, lot, sl_price=None, tp_price=None, magic_num
         "type_filling": mt5.ORDER_FILLING_FOK,
     }
 
+    mark_request()
+
     # Execute trade with enhanced error handling
     try:
-        result = mt5.order_send(request)
+        mark_send()
+        result = mt5_run(_send_unless_halted, request)
+        if result is _HALTED:
+            order_done(order_type, request, None)
+            print(f"[⛔ HALTED] Risk limit breached — {order_type.upper()} {symbol} not sent")
+            return None
+        order_done(order_type, request, result)
         if result:
             if result.retcode == mt5.TRADE_RETCODE_DONE:
-                msg = (f"✅ {order_type.upper()} {symbol} @ {price:.2f}\n"
-                       f"SL: {sl_price:.2f} | TP: {tp_price:.2f} | Lot: {lot}\n"
-                       f"Spread: {spread/point:.0f}pts")
-                send_telegram_message(msg)
+                publish(OrderResult(symbol, order_type, True, result.retcode, price, sl_price, tp_price, lot, None))
             else:
-                error_msg = mt5.return_string(result.retcode)
-                details = (f"Price: {price:.2f} | SL: {sl_price:.2f} | TP: {tp_price:.2f}\n"
-                          f"Spread: {spread/point:.0f}pts | Stops Level: {stops_level/point:.0f}pts\n"
-                          f"Min SL: {min_sl_distance/point:.0f}pts | Min TP: {min_tp_distance/point:.0f}pts")
-                send_telegram_message(f"❌ Trade failed (Code: {result.retcode} - {error_msg})\n{details}")
+                details = (f"{mt5.return_string(result.retcode)}\n"
+                           f"Spread: {spread/point:.0f}pts | Stops Level: {stops_level/point:.0f}pts\n"
+                           f"Min SL: {min_sl_distance/point:.0f}pts | Min TP: {min_tp_distance/point:.0f}pts")
+                publish(OrderResult(symbol, order_type, False, result.retcode, price, sl_price, tp_price, lot, details))
         return result
     except Exception as e:
-        send_telegram_message(f"❌ Trade execution error: {str(e)}")
+        send_telegram_message(f"[{symbol}] ❌ Trade execution error: {str(e)}")
         return None
 
 
@@ -209,7 +227,7 @@ def trail_sl(symbol, magic):
             min_sl = pos.price_open + config['min_sl_distance'] * direction * point
             if (direction == 1 and new_sl < min_sl) or (direction == -1 and new_sl > min_sl):
                 new_sl = min_sl
-                send_telegram_message(f"⚠️ Trail SL clamped to {min_sl:.2f}")
+                publish(TrailUpdate(symbol, pos.ticket, min_sl, True))
 
             # Only update if improvement
             if ((direction == 1 and new_sl > pos.sl) or 
@@ -223,4 +241,4 @@ def trail_sl(symbol, magic):
                 })
                 
                 if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-                    send_telegram_message(f"🔰 Trailed SL to {new_sl:.2f}")
+                    publish(TrailUpdate(symbol, pos.ticket, new_sl, False))
@@ -0,0 +1,269 @@
+# === trade_index.py (Indexed Trade Journal Store) ===
+#
+# SQLite mirror of trade_journal.csv for browsing history. The CSV remains the
+# source of truth; the index tails it from the last byte offset it ingested, so
+# a sync after a new trade parses only the new rows. If the journal is rewritten
+# (shorter file or a different header), the index is rebuilt from scratch.
+# Queries use keyset pagination on the row id: the cost of a page doesn't
+# depend on how deep into the history it is, and exports stream row batches
+# instead of materializing every match.
+
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+import performance_tracker
+
+load_dotenv()
+
+INDEX_PATH = os.getenv("TRADE_INDEX_PATH", "trade_index.db")
+PAGE_LIMIT = 100        # default rows per page
+MAX_PAGE_LIMIT = 1000
+STREAM_BATCH = 500      # rows fetched per step when streaming an export
+
+# CSV header -> index column
+COLUMNS = {
+    "Timestamp": "timestamp",
+    "Side": "side",
+    "Entry Price": "entry_price",
+    "Exit Price": "exit_price",
+    "Profit": "profit",
+    "Outcome": "outcome",
+    "Strategy Mode": "strategy_mode",
+    "Zone Type": "zone_type",
+    "Entry Reason": "entry_reason",
+    "SL": "sl",
+    "TP": "tp",
+    "Entry Time": "entry_time",
+    "Exit Time": "exit_time",
+}
+NUMERIC = {"entry_price", "exit_price", "profit", "sl", "tp"}
+FIELDS = ("id",) + tuple(COLUMNS.values())
+
+# Filter parameter -> indexed column; values are matched case-insensitively
+FILTERS = {
+    "side": "side",
+    "outcome": "outcome",
+    "strategy": "strategy_mode",
+    "zone": "zone_type",
+}
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(value):
+    return None if value in (None, "", "-") else value
+
+
+def _bound(value):
+    """Normalize a date/datetime filter to the journal's text format; ValueError if unparseable."""
+    value = value.strip().replace("T", " ")
+    for fmt in ("%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt).strftime(fmt if fmt == "%Y-%m-%d" else "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+    raise ValueError(f"bad date {value!r}, expected YYYY-MM-DD[ HH:MM[:SS]]")
+
+
+class TradeIndex:
+    def __init__(self, path=INDEX_PATH, journal_path=None):
+        self.path = path
+        self.journal_path = journal_path
+        self._sync_lock = threading.Lock()
+        self._synced_version = None
+        conn = self._connect()
+        try:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS trades (
+                    id INTEGER PRIMARY KEY,
+                    {", ".join(f"{c} {'REAL' if c in NUMERIC else 'TEXT'}" for c in COLUMNS.values())},
+                    time TEXT
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS trades_time ON trades (time, id)")
+            for column in FILTERS.values():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS trades_{column} ON trades ({column} COLLATE NOCASE, id)")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # One short-lived connection per call: Flask serves requests from many threads
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _journal(self):
+        return self.journal_path or performance_tracker.file_path
+
+    # --- ingest ---
+
+    def sync(self):
+        """Ingest rows appended to the journal since the last sync; returns rows added."""
+        journal = self._journal()
+        try:
+            st = os.stat(journal)
+        except OSError:
+            return 0
+        version = (st.st_mtime_ns, st.st_size)
+        if version == self._synced_version:
+            return 0
+
+        with self._sync_lock:
+            if version == self._synced_version:
+                return 0
+            conn = self._connect()
+            try:
+                added = self._ingest(conn, journal, st.st_size)
+            finally:
+                conn.close()
+            self._synced_version = version
+            return added
+
+    def _ingest(self, conn, journal, size):
+        meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        offset = int(meta.get("offset", 0))
+        header = json.loads(meta["header"]) if "header" in meta else None
+
+        with open(journal, "rb") as f:
+            first = f.readline()
+            current_header = next(csv.reader([first.decode("utf-8")]), [])
+            if header != current_header or offset > size:
+                # Journal replaced or rewritten: start over
+                conn.execute("DELETE FROM trades")
+                header, offset = current_header, len(first)
+            f.seek(offset)
+            chunk = f.read()
+
+        # Only ingest complete lines; a half-written row is picked up next time
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return 0
+        positions = [header.index(name) if name in header else None for name in COLUMNS]
+        rows = []
+        for values in csv.reader(io.StringIO(chunk[:end].decode("utf-8"), newline="")):
+            if not values:
+                continue
+            record = {}
+            for column, pos in zip(COLUMNS.values(), positions):
+                raw = values[pos] if pos is not None and pos < len(values) else None
+                record[column] = _number(raw) if column in NUMERIC else _text(raw)
+            record["time"] = record["exit_time"] or record["timestamp"]
+            rows.append(record)
+
+        columns = tuple(COLUMNS.values()) + ("time",)
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                f"INSERT INTO trades ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [tuple(r[c] for c in columns) for r in rows]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("offset", str(offset + end)), ("header", json.dumps(header))]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    # --- queries ---
+
+    @staticmethod
+    def _where(filters, cursor, order):
+        clauses, params = [], []
+        for name, column in FILTERS.items():
+            values = filters.get(name)
+            if values:
+                values = [values] if isinstance(values, str) else list(values)
+                clauses.append(f"{column} COLLATE NOCASE IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if filters.get("start"):
+            clauses.append("time >= ?")
+            params.append(_bound(filters["start"]))
+        if filters.get("end"):
+            end = _bound(filters["end"])
+            if len(end) == 10:
+                # A bare date includes the whole day
+                clauses.append("time < ?")
+                params.append((datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d"))
+            else:
+                clauses.append("time <= ?")
+                params.append(end)
+        if cursor is not None:
+            clauses.append("id < ?" if order == "desc" else "id > ?")
+            params.append(cursor)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _select(self, filters, cursor, order, limit=None):
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+        where, params = self._where(filters, cursor, order)
+        sql = f"SELECT {', '.join(FIELDS)} FROM trades{where} ORDER BY id {order.upper()}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def page(self, filters=None, cursor=None, limit=PAGE_LIMIT, order="desc"):
+        """One page of matching trades: (rows, next_cursor); next_cursor is None on the last page."""
+        self.sync()
+        limit = max(1, min(int(limit), MAX_PAGE_LIMIT))
+        sql, params = self._select(filters or {}, cursor, order, limit + 1)
+        conn = self._connect()
+        try:
+            rows = [dict(zip(FIELDS, r)) for r in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+        next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def stream(self, filters=None, cursor=None, order="desc", limit=None):
+        """Yield matching trades as dicts, fetching STREAM_BATCH rows at a time."""
+        self.sync()
+        sql, params = self._select(filters or {}, cursor, order, limit)
+        conn = self._connect()
+        try:
+            cur = conn.execute(sql, params)
+            while True:
+                batch = cur.fetchmany(STREAM_BATCH)
+                if not batch:
+                    break
+                for r in batch:
+                    yield dict(zip(FIELDS, r))
+        finally:
+            conn.close()
+
+    def count(self):
+        self.sync()
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+        finally:
+            conn.close()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Process-wide index, created on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TradeIndex()
+        return _index
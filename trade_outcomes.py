@@ -0,0 +1,155 @@
+# === trade_outcomes.py (Vectorized First-Touch SL/TP Resolution) ===
+#
+#     out = first_touch(high, low, entry_idx, is_buy, sl, tp, open_=open_, close=close)
+#     out["exit_idx"], out["exit_price"], out["reason"]   # reason codes: REASONS
+#
+# The first bar after entry whose low reaches a level (or whose high does) is
+# found for all trades at once with a sparse table. Row k holds the running
+# min of lows (max of highs) over windows of 2**k bars, built from shifted
+# min/max scans. Each trade then descends from the largest window to the
+# smallest and skips a window whenever it can't contain a touch. That is
+# log2(bars) vectorized steps no matter how long trades stay open, so the cost
+# doesn't depend on SL/TP distance.
+#
+# A standalone utility for studying fixed entry sets (signal lists, SL/TP
+# grids). The backtester and sweep don't use it: the strategy's next entry
+# depends on what is still open, so SimBroker settles exits bar by bar. Both
+# apply the same fills by default: stop first when a bar touches both levels,
+# and a bar that gaps past a level fills at its open.
+
+import numpy as np
+
+# Reason codes
+OPEN, SL, TP, TIMEOUT = 0, 1, 2, 3
+REASONS = ("open", "sl", "tp", "timeout")
+
+SAME_BAR_POLICIES = ("sl", "tp", "open")
+
+
+def _sparse_table(values, reduce):
+    """table[k][i] = reduce(values[i:i + 2**k]) for every i where the window fits."""
+    table = [values]
+    width = 1
+    while width * 2 <= len(values):
+        prev = table[-1]
+        table.append(reduce(prev[:-width], prev[width:]))
+        width *= 2
+    return table
+
+
+def _first_touch_index(table, start, last, level, below):
+    """
+    First index j in [start, last] with values[j] <= level (below=True) or >= level,
+    else last + 1. All arguments except table are arrays over trades.
+    """
+    pos = start.copy()
+    for k in range(len(table) - 1, -1, -1):
+        width = 1 << k
+        row = table[k]
+        fits = pos + width - 1 <= last
+        block = row[np.minimum(pos, len(row) - 1)]
+        clear = block > level if below else block < level
+        pos = np.where(fits & clear, pos + width, pos)
+    values = table[0]
+    found = pos <= last
+    at = values[np.minimum(pos, len(values) - 1)]
+    found &= (at <= level) if below else (at >= level)
+    return np.where(found, pos, last + 1)
+
+
+def build_tables(high, low):
+    """Sparse tables (min of lows, max of highs) for repeated first_touch() calls on the same bars."""
+    return (_sparse_table(np.asarray(low, dtype=float), np.minimum),
+            _sparse_table(np.asarray(high, dtype=float), np.maximum))
+
+
+def first_touch(high, low, entry_idx, is_buy, sl, tp, open_=None, close=None,
+                max_bars=None, same_bar="sl", gap_fills=True, tables=None):
+    """
+    Resolve each trade to its first stop/target touch after its entry bar.
+
+    same_bar: which level wins when one bar touches both. "sl" is conservative,
+    "tp" optimistic, and "open" picks the level nearer the bar's open (needs open_).
+    gap_fills: a bar that opens beyond a level fills at the open, not at the level.
+    Trades never touched exit at the close of their last bar with reason OPEN,
+    or TIMEOUT if max_bars cut them off. `tables` reuses build_tables() output
+    across calls on the same bars.
+    Returns dict of arrays: exit_idx, exit_price, reason (int8 codes), bars_held.
+    """
+    if same_bar not in SAME_BAR_POLICIES:
+        raise ValueError(f"same_bar must be one of {SAME_BAR_POLICIES}")
+    if same_bar == "open" and open_ is None:
+        raise ValueError("same_bar='open' needs open_ prices")
+    if open_ is None:
+        gap_fills = False
+
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    n = len(high)
+    min_low, max_high = tables or build_tables(high, low)
+
+    entry_idx = np.asarray(entry_idx, dtype=np.int64)
+    is_buy = np.asarray(is_buy, dtype=bool)
+    sl = np.asarray(sl, dtype=float)
+    tp = np.asarray(tp, dtype=float)
+    m = len(entry_idx)
+
+    last = np.full(m, n - 1, dtype=np.int64)
+    if max_bars is not None:
+        last = np.minimum(last, entry_idx + max_bars)
+    start = entry_idx + 1
+
+    sl_bar = np.empty(m, dtype=np.int64)
+    tp_bar = np.empty(m, dtype=np.int64)
+    for side, mask in ((True, is_buy), (False, ~is_buy)):
+        if not mask.any():
+            continue
+        s, e = start[mask], last[mask]
+        # Buys stop out on lows and take profit on highs; sells the other way round
+        sl_bar[mask] = _first_touch_index(min_low if side else max_high, s, e, sl[mask], below=side)
+        tp_bar[mask] = _first_touch_index(max_high if side else min_low, s, e, tp[mask], below=not side)
+
+    exit_idx = np.minimum(sl_bar, tp_bar)
+    touched = exit_idx <= last
+    stop_first = touched & (sl_bar < tp_bar)
+    both = touched & (sl_bar == tp_bar)
+    if same_bar == "sl":
+        stop_first |= both
+    elif same_bar == "open":
+        o = np.asarray(open_, dtype=float)[np.minimum(exit_idx, n - 1)]
+        stop_first |= both & (np.abs(o - sl) <= np.abs(tp - o))
+
+    exit_price = np.where(stop_first, sl, tp)
+    if gap_fills:
+        o = np.asarray(open_, dtype=float)[np.minimum(exit_idx, n - 1)]
+        # Opening beyond the level fills at the open: worse for stops, better for targets
+        worse = np.where(is_buy, np.minimum(exit_price, o), np.maximum(exit_price, o))
+        better = np.where(is_buy, np.maximum(exit_price, o), np.minimum(exit_price, o))
+        exit_price = np.where(stop_first, worse, better)
+
+    reason = np.where(stop_first, SL, TP).astype(np.int8)
+    exit_idx = np.where(touched, exit_idx, last)
+    if not touched.all():
+        reason[~touched] = np.where(last[~touched] < n - 1, TIMEOUT, OPEN)
+        fallback = np.asarray(close if close is not None else (high + low) / 2, dtype=float)
+        exit_price[~touched] = fallback[exit_idx[~touched]]
+    return {
+        "exit_idx": exit_idx,
+        "exit_price": exit_price,
+        "reason": reason,
+        "bars_held": exit_idx - entry_idx,
+    }
+
+
+def pnl(entry_price, exit_price, is_buy, lot=1.0, contract_size=1.0):
+    """Profit per trade in account currency."""
+    sign = np.where(np.asarray(is_buy, dtype=bool), 1.0, -1.0)
+    return (np.asarray(exit_price) - np.asarray(entry_price)) * sign * lot * contract_size
+
+
+def resolve(feed, entry_idx, is_buy, entry_price, sl, tp, lot=1.0, contract_size=1.0, **kwargs):
+    """first_touch() over a backtest feed (anything with open/high/low/close sequences), plus P&L."""
+    out = first_touch(feed.high, feed.low, entry_idx, is_buy, sl, tp,
+                      open_=feed.open, close=feed.close, **kwargs)
+    out["pnl"] = pnl(entry_price, out["exit_price"], is_buy, lot, contract_size)
+    return out
@@ -1,28 +1,34 @@
 # === trend_filter.py (Precision Scalping Version) ===
 
-import MetaTrader5 as mt5
-import pandas as pd
 import numpy as np
 
-def get_trend(symbol, timeframe=mt5.TIMEFRAME_M15, num_candles=100, sma_period=44):
+def get_trend(symbol, timeframe=None, num_candles=100, sma_period=44):
+    # Imported here: the backtester uses classify_trend without the MT5 package
+    from mt5_gateway import mt5
+    if timeframe is None:
+        timeframe = mt5.TIMEFRAME_M15
     if not mt5.initialize():
         raise Exception("Failed to initialize MT5")
 
     rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, num_candles)
     if rates is None or len(rates) < sma_period + 5:
         return "neutral"
+    return classify_trend(rates['close'], rates['high'], rates['low'], sma_period)
 
-    df = pd.DataFrame(rates)
-    df['time'] = pd.to_datetime(df['time'], unit='s')
-    df['sma'] = df['close'].rolling(sma_period).mean()
+def classify_trend(close, high, low, sma_period=44):
+    """Trend from the latest bars (oldest first); shared by the live bot and the backtester."""
+    close = np.asarray(close, dtype=float)
+    if len(close) < sma_period + 4:
+        return "neutral"
 
-    recent_sma = df['sma'].iloc[-5:]
-    sma_slope = (recent_sma.iloc[-1] - recent_sma.iloc[0]) / sma_period
+    # SMA at the last bar and 4 bars earlier (the ends of the 5-bar slope window)
+    last_sma = close[-sma_period:].mean()
+    first_sma = close[-sma_period - 4:-4].mean()
+    sma_slope = (last_sma - first_sma) / sma_period
 
-    highs = df['high'].iloc[-5:].tolist()
-    lows = df['low'].iloc[-5:].tolist()
-    last_price = df['close'].iloc[-1]
-    last_sma = df['sma'].iloc[-1]
+    highs = list(high[-5:])
+    lows = list(low[-5:])
+    last_price = close[-1]
 
     # Structure check
     higher_highs = all(x < y for x, y in zip(highs, highs[1:]))
@@ -0,0 +1,180 @@
+# === walk_forward.py (Walk-Forward Optimization) ===
+#
+#     python walk_forward.py --param sl_buffer=50000,75000,100000 --param tp_ratio=1.0,1.2,1.5
+#     python walk_forward.py --data H1_data.csv --anchored --train-days 120 --test-days 30
+#
+# Splits the history into train/test windows. Rolling mode uses a fixed-length
+# train window; anchored mode starts every train window at the first bar. The
+# parameter grid is swept on each train window, the best combination by
+# --objective runs on the test window that follows, and the test equity curves
+# are chained into one out-of-sample curve. Every window is a bar range over
+# the same full-history feed, so zones and trend values are keyed by absolute
+# bar and share one sweep cache. Overlapping windows reuse them, and only the
+# decision engine and broker rerun. All train windows go to the pool as one batch.
+
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from backtest_engine import CsvFeed, TRADE_COLUMNS
+from performance_analytics import compute_metrics
+from sweep import CACHE_DIR, combinations, parse_param, sweep
+
+OBJECTIVES = ("total_profit", "sharpe", "sortino", "profit_factor", "expectancy", "win_rate")
+
+
+def windows(times, train_days, test_days, step_days=None, anchored=False):
+    """[{"train": (start, end), "test": (start, end)}] as bar index ranges over `times`."""
+    times = np.asarray(times, dtype="datetime64[s]")
+    if not len(times):
+        return []
+    train = np.timedelta64(int(train_days * 86400), "s")
+    test = np.timedelta64(int(test_days * 86400), "s")
+    step = np.timedelta64(int((step_days or test_days) * 86400), "s")
+    out = []
+    while True:
+        test_start = times[0] + train + step * len(out)
+        if test_start >= times[-1]:
+            break
+        train_start = times[0] if anchored else test_start - train
+        bounds = np.searchsorted(times, [train_start, test_start, test_start + test])
+        if bounds[1] >= bounds[2]:
+            break
+        out.append({"train": (int(bounds[0]), int(bounds[1])), "test": (int(bounds[1]), int(bounds[2]))})
+    return out
+
+
+def _score(row, objective, min_trades):
+    if row["total_trades"] < min_trades:
+        return -np.inf
+    value = row.get(objective)
+    if value is None:
+        # Only profit_factor is undefined (no losing trade): unbeatable if anything was won
+        return np.inf if row["wins"] > 0 else 0.0
+    return value
+
+
+def pick_best(rows, objective="total_profit", min_trades=1):
+    """
+    Row with the best objective (ties go to the higher total profit); runs with fewer
+    than min_trades only win if nothing qualifies.
+    """
+    ranked = sorted(rows, key=lambda r: r["run_id"])
+    best = max(ranked, key=lambda r: (_score(r, objective, min_trades), r["total_profit"]))
+    if _score(best, objective, min_trades) == -np.inf:
+        best = max(ranked, key=lambda r: (r["total_profit"], -r["run_id"]))
+    return best
+
+
+def walk_forward(feed, grid_runs, splits, objective="total_profit", min_trades=1, workers=None,
+                 cache_dir=CACHE_DIR, signature=None, slippage=0, seed=0):
+    """
+    Optimize on every train window, run the winner on its test window and chain the results.
+    Returns windows (one summary row each), out-of-sample trades, equity and times.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+    if not splits or not grid_runs:
+        raise ValueError("walk_forward() needs at least one window and one parameter set")
+
+    # Every (window, combination) pair in one batch so the pool stays busy across windows
+    train_runs = [params for _ in splits for params in grid_runs]
+    train_spans = [split["train"] for split in splits for _ in grid_runs]
+    rows = sweep(feed, train_runs, workers, cache_dir, signature, slippage, seed,
+                 progress=False, spans=train_spans)
+    by_window = {}
+    for row in rows:
+        by_window.setdefault(row["run_id"] // len(grid_runs), []).append(row)
+    best = [pick_best(by_window[k], objective, min_trades) for k in range(len(splits))]
+
+    chosen = [{name: row[name] for name in grid_runs[0]} for row in best]
+    tests = sweep(feed, chosen, workers, cache_dir, signature, slippage, seed,
+                  progress=False, spans=[split["test"] for split in splits], detail=True)
+    tests.sort(key=lambda r: r["run_id"])
+
+    summary, trades, curves, offset = [], [], [], 0.0
+    for split, train, test in zip(splits, best, tests):
+        (train_start, train_end), (test_start, test_end) = split["train"], split["test"]
+        train_rate = train["total_profit"] / max(train_end - train_start, 1)
+        test_rate = test["total_profit"] / max(test_end - test_start, 1)
+        summary.append({
+            "train_start": feed.time[train_start], "train_end": feed.time[train_end - 1],
+            "test_start": feed.time[test_start], "test_end": feed.time[test_end - 1],
+            **{name: train[name] for name in grid_runs[0]},
+            f"train_{objective}": train.get(objective),
+            "train_trades": train["total_trades"],
+            "test_profit": test["total_profit"],
+            "test_trades": test["total_trades"],
+            "test_win_rate": test["win_rate"],
+            "test_max_drawdown": test["max_drawdown"],
+            # Out-of-sample profit per bar relative to in-sample; near 1 means the edge held up
+            "efficiency": round(test_rate / train_rate, 3) if train_rate > 0 else None,
+        })
+        trades.extend(test["trades"])
+        curves.append(test["equity"] + offset)
+        offset += test["equity"][-1] if len(test["equity"]) else 0.0
+
+    spans = [split["test"] for split in splits]
+    return {
+        "windows": pd.DataFrame(summary),
+        "trades": pd.DataFrame(trades, columns=TRADE_COLUMNS),
+        "equity": np.concatenate(curves),
+        "times": [t for start, end in spans for t in feed.time[start:end]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward optimization of the zone strategy")
+    parser.add_argument("--data", default="M15_data.csv", help="MT5 export (M15_data.csv or H1_data.csv)")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--grid", help="JSON file mapping parameter name -> list of values")
+    parser.add_argument("--param", action="append", default=[], help="name=v1,v2,... (repeatable)")
+    parser.add_argument("--samples", type=int, help="random sample of this many combinations")
+    parser.add_argument("--train-days", type=float, default=60)
+    parser.add_argument("--test-days", type=float, default=15)
+    parser.add_argument("--step-days", type=float, help="defaults to --test-days")
+    parser.add_argument("--anchored", action="store_true", help="train windows all start at the first bar")
+    parser.add_argument("--objective", default="total_profit", choices=OBJECTIVES)
+    parser.add_argument("--min-trades", type=int, default=5, help="train runs with fewer trades can't win")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--slippage", type=int, default=1000, help="max random slippage in points")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--out", default="walk_forward", help="prefix for the _windows/_trades/_equity CSVs")
+    args = parser.parse_args()
+
+    # Backtests never message Telegram (read by telegram_notifier's sink selection)
+    os.environ["DISABLE_TELEGRAM"] = "True"
+
+    grid = {}
+    if args.grid:
+        with open(args.grid) as f:
+            grid.update(json.load(f))
+    grid.update(parse_param(spec) for spec in args.param)
+    runs = combinations(grid, args.samples, args.seed)
+
+    feed = CsvFeed(args.data, args.start, args.end)
+    splits = windows(feed.time, args.train_days, args.test_days, args.step_days, args.anchored)
+    print(f"[🧪 WALK-FORWARD] {len(splits)} windows x {len(runs)} parameter sets over {len(feed)} bars")
+
+    result = walk_forward(feed, runs, splits, args.objective, args.min_trades, args.workers,
+                          args.cache_dir, slippage=args.slippage, seed=args.seed)
+    result["windows"].to_csv(f"{args.out}_windows.csv", index=False)
+    result["trades"].to_csv(f"{args.out}_trades.csv", index=False)
+    pd.DataFrame({"time": result["times"], "equity": result["equity"]}).to_csv(f"{args.out}_equity.csv", index=False)
+
+    trades = result["trades"]
+    times = trades["exit_time"].to_numpy(dtype="datetime64[s]") if len(trades) else None
+    m = compute_metrics(trades["profit"].to_numpy(dtype=float), times)
+    print(result["windows"].to_string(index=False))
+    print("\n=== 📊 OUT-OF-SAMPLE ===")
+    print(f"Trades: {m['total_trades']} | Win rate: {m['win_rate']}% | Net: {m['total_profit']:.2f}")
+    print(f"Profit factor: {m['profit_factor']} | Max drawdown: {m['max_drawdown']:.2f} | Sharpe: {m['sharpe']}")
+    print(f"Saved {args.out}_windows.csv, {args.out}_trades.csv, {args.out}_equity.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -161,30 +161,24 @@ def scan_zones(get_data_func, symbol, timeframe, lookback):
 
     demand_raw, demand_stats = detect_zones(df, zone_type='demand')
     supply_raw, supply_stats = detect_zones(df, zone_type='supply')
-
-    demand_zones = []
-    supply_zones = []
-
-    for z in demand_raw:
-        price = (z['zone_low'] + z['zone_high']) / 2
-        demand_zones.append({
-            'price': price,
-            'type': "strict_demand",
-            'time': z['timestamp'],
-            'strength': z['strength'],
-            'zone_low': z['zone_low'],
-            'zone_high': z['zone_high']
-        })
-
-    for z in supply_raw:
-        price = (z['zone_low'] + z['zone_high']) / 2
-        supply_zones.append({
-            'price': price,
-            'type': "strict_supply",
-            'time': z['timestamp'],
-            'strength': z['strength'],
-            'zone_low': z['zone_low'],
-            'zone_high': z['zone_high']
-        })
-
-    return demand_zones, supply_zones
+    return format_zones(demand_raw, 'demand'), format_zones(supply_raw, 'supply')
+
+def format_zones(raw_zones, zone_type):
+    """detect_zones() output -> the zone dicts trade_decision_engine expects (live and backtest)"""
+    return [{
+        'price': (z['zone_low'] + z['zone_high']) / 2,
+        'type': f"strict_{zone_type}",
+        'time': z['timestamp'],
+        'strength': z['strength'],
+        'zone_low': z['zone_low'],
+        'zone_high': z['zone_high']
+    } for z in raw_zones]
+
+def select_zones(demand_zones, supply_zones, strategy_mode, strength_threshold):
+    """Zones the decision engine sees: strongest 3 in aggressive mode, first 2 otherwise"""
+    if strategy_mode == "aggressive":
+        return (
+            [z for z in demand_zones if z['strength'] >= strength_threshold][:3],
+            [z for z in supply_zones if z['strength'] >= strength_threshold][:3],
+        )
+    return demand_zones[:2], supply_zones[:2]